@@ -10,12 +10,54 @@ import sys
 import argparse
 from pathlib import Path
 
-# 导入Phone Agent和Computer Agent
-from dual_agent.phone_agent import (
-    PhoneAgent, LLMProvider, TTSProvider
+# 命令行参数定义：(参数名, add_argument关键字参数)
+_ARGSPEC = (
+    # 会话参数
+    ("--session-id", dict(type=str, default=None,
+                          help="会话ID，用于关联两个Agent")),
+    
+    # VAD参数
+    ("--vad-threshold", dict(type=float, default=0.5,
+                             help="VAD检测阈值 (0.0-1.0)")),
+    ("--device-index", dict(type=int, default=0,
+                            help="麦克风设备索引")),
+    
+    # ASR参数
+    ("--local-asr", dict(action="store_true",
+                         help="使用本地ASR模型而非API")),
+    ("--asr-model", dict(type=str, default="whisper-1",
+                         help="ASR模型名称")),
+    ("--language", dict(type=str, default="zh",
+                        help="语言代码")),
+    
+    # LLM参数
+    ("--fast-model", dict(type=str, default="gpt-4o-mini",
+                          help="快思考模型名称")),
+    ("--deep-model", dict(type=str, default="gpt-4o",
+                          help="深度思考模型名称")),
+    
+    # TTS参数
+    ("--tts", dict(type=str, default="openai",
+                   choices=["openai", "elevenlabs", "azure", "dummy"],
+                   help="TTS提供商")),
+    ("--tts-voice", dict(type=str, default="alloy",
+                         help="TTS语音音色")),
+    
+    # 浏览器参数（待实现）
+    ("--url", dict(type=str, default=None,
+                   help="要打开的网页URL")),
+    ("--browser-type", dict(type=str, default="chromium",
+                            choices=["chromium", "firefox", "webkit"],
+                            help="浏览器类型")),
+    
+    # 其他参数
+    ("--disable-thinking-while-listening", dict(action="store_true",
+                                                help="禁用边听边想功能")),
+    ("--debug", dict(action="store_true",
+                     help="启用调试模式")),
+    ("--dummy", dict(action="store_true",
+                     help="使用模拟模式，不调用实际API")),
 )
-from dual_agent.phone_agent.thinking_engine import LLMProvider
-# from dual_agent.computer_agent import ComputerAgent  # 待实现
 
 
 async def main(args):
@@ -25,6 +67,11 @@ async def main(args):
     参数:
         args: 命令行参数
     """
+    # 延迟导入Phone Agent，使--help等简单调用无需加载完整的语音处理依赖
+    from dual_agent.phone_agent import PhoneAgent, TTSProvider
+    from dual_agent.phone_agent.thinking_engine import LLMProvider
+    # from dual_agent.computer_agent import ComputerAgent  # 待实现
+    
     print("初始化Dual Agent系统...")
     
     # 配置快慢思考提供商和模型
@@ -132,52 +179,8 @@ async def main(args):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="运行Dual Agent系统")
-    
-    # 会话参数
-    parser.add_argument("--session-id", type=str, default=None,
-                       help="会话ID，用于关联两个Agent")
-    
-    # VAD参数
-    parser.add_argument("--vad-threshold", type=float, default=0.5,
-                        help="VAD检测阈值 (0.0-1.0)")
-    parser.add_argument("--device-index", type=int, default=0,
-                        help="麦克风设备索引")
-    
-    # ASR参数
-    parser.add_argument("--local-asr", action="store_true",
-                        help="使用本地ASR模型而非API")
-    parser.add_argument("--asr-model", type=str, default="whisper-1",
-                        help="ASR模型名称")
-    parser.add_argument("--language", type=str, default="zh",
-                        help="语言代码")
-    
-    # LLM参数
-    parser.add_argument("--fast-model", type=str, default="gpt-4o-mini",
-                        help="快思考模型名称")
-    parser.add_argument("--deep-model", type=str, default="gpt-4o",
-                        help="深度思考模型名称")
-    
-    # TTS参数
-    parser.add_argument("--tts", type=str, default="openai",
-                        choices=["openai", "elevenlabs", "azure", "dummy"],
-                        help="TTS提供商")
-    parser.add_argument("--tts-voice", type=str, default="alloy",
-                        help="TTS语音音色")
-    
-    # 浏览器参数（待实现）
-    parser.add_argument("--url", type=str, default=None,
-                        help="要打开的网页URL")
-    parser.add_argument("--browser-type", type=str, default="chromium",
-                        choices=["chromium", "firefox", "webkit"],
-                        help="浏览器类型")
-    
-    # 其他参数
-    parser.add_argument("--disable-thinking-while-listening", action="store_true",
-                        help="禁用边听边想功能")
-    parser.add_argument("--debug", action="store_true",
-                        help="启用调试模式")
-    parser.add_argument("--dummy", action="store_true",
-                        help="使用模拟模式，不调用实际API")
+    for flags, kwargs in _ARGSPEC:
+        parser.add_argument(*((flags,) if isinstance(flags, str) else flags), **kwargs)
     
     args = parser.parse_args()
     
@@ -8,19 +8,16 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def check_audio_devices():
-    """检测音频设备"""
-    print("🔍 检测音频设备...")
+def check_audio_devices(p):
+    """
+    检测音频设备
     
-    try:
-        import pyaudio
-        print("✅ PyAudio 已安装")
-    except ImportError:
-        print("❌ PyAudio 未安装，请运行: pip install pyaudio")
-        return
+    参数:
+        p: 共享的PyAudio实例
+    """
+    import pyaudio
     
-    # 初始化PyAudio
-    p = pyaudio.PyAudio()
+    print("🔍 检测音频设备...")
     
     print(f"\n📊 系统音频信息:")
     print(f"PyAudio版本: {pyaudio.__version__}")
@@ -51,18 +48,24 @@ def check_audio_devices():
     except Exception as e:
         print(f"\n❌ 无法获取默认输入设备: {e}")
     
-    p.terminate()
-    
     return input_devices
 
-def test_microphone(device_index=None, duration=3):
-    """测试麦克风录音"""
+def test_microphone(p, device_index=None, duration=3):
+    """
+    测试麦克风录音
+    
+    参数:
+        p: 共享的PyAudio实例
+        device_index: 麦克风设备索引，None表示默认设备
+        duration: 录音时长(秒)
+    """
     print(f"\n🎤 测试麦克风录音 (时长: {duration}秒)...")
     
     try:
         import pyaudio
         import numpy as np
         import time
+        from collections import deque
     except ImportError as e:
         print(f"❌ 缺少依赖: {e}")
         return
@@ -73,8 +76,6 @@ def test_microphone(device_index=None, duration=3):
     channels = 1
     rate = 16000
     
-    p = pyaudio.PyAudio()
-    
     try:
         # 打开音频流
         if device_index is not None:
@@ -82,37 +83,43 @@ def test_microphone(device_index=None, duration=3):
         else:
             print("使用默认设备")
             
+        # 回调模式：PortAudio线程只计算每个块的峰值并放入deque，主循环按自己的节奏读取，
+        # 避免阻塞读取和打印输出导致的缓冲区溢出
+        amplitudes = deque()
+        
+        def _audio_callback(in_data, frame_count, time_info, status):
+            # 计算音频幅度（max/-min代替abs，避免额外分配临时数组）
+            audio_np = np.frombuffer(in_data, dtype=np.int16, count=frame_count)
+            amplitudes.append(max(int(audio_np.max()), -int(audio_np.min())))
+            return (None, pyaudio.paContinue)
+        
         stream = p.open(
             format=format,
             channels=channels,
             rate=rate,
             input=True,
             input_device_index=device_index,
-            frames_per_buffer=chunk_size
+            frames_per_buffer=chunk_size,
+            stream_callback=_audio_callback
         )
         
         print("🔴 开始录音，请说话...")
+        stream.start_stream()
         
-        frames = []
         max_amplitude = 0
+        deadline = time.monotonic() + duration
         
-        for i in range(int(rate / chunk_size * duration)):
-            try:
-                data = stream.read(chunk_size, exception_on_overflow=False)
-                frames.append(data)
-                
-                # 计算音频幅度
-                audio_np = np.frombuffer(data, dtype=np.int16)
-                amplitude = np.max(np.abs(audio_np))
-                max_amplitude = max(max_amplitude, amplitude)
-                
-                # 显示音量条
-                volume_bar = "█" * int(amplitude / 3276.8)  # 0-10的音量条
-                print(f"\r音量: {volume_bar:<10} ({amplitude:5d})", end="", flush=True)
-                
-            except Exception as e:
-                print(f"\n录音错误: {e}")
-                break
+        # 每0.25秒(约4Hz)读取一次峰值并刷新音量条
+        while time.monotonic() < deadline and stream.is_active():
+            time.sleep(0.25)
+            
+            amplitude = 0
+            while amplitudes:
+                amplitude = max(amplitude, amplitudes.popleft())
+            max_amplitude = max(max_amplitude, amplitude)
+            
+            volume_bar = "█" * int(amplitude / 3276.8)  # 0-10的音量条
+            print(f"\r音量: {volume_bar:<10} ({amplitude:5d})", end="", flush=True)
         
         print(f"\n🛑 录音结束")
         print(f"最大音量: {max_amplitude}")
@@ -127,8 +134,6 @@ def test_microphone(device_index=None, duration=3):
         
     except Exception as e:
         print(f"❌ 麦克风测试失败: {e}")
-    finally:
-        p.terminate()
 
 def test_vad():
     """测试VAD模型"""
@@ -139,18 +144,24 @@ def test_vad():
         from dual_agent.phone_agent.vad import SileroVAD
         
         print("✅ 正在加载Silero VAD模型...")
-        vad = SileroVAD(threshold=0.5, sampling_rate=16000)
+        vad = SileroVAD(threshold=0.5, sampling_rate=16000, compile_model=True)
+        vad.warmup(iterations=2)
         print("✅ VAD模型加载成功")
         
-        # 创建测试音频（静音）
-        test_audio = torch.zeros(16000)  # 1秒静音
-        speech_prob = vad.model(test_audio, 16000).item()
-        print(f"静音测试 - 语音概率: {speech_prob:.3f}")
+        # 创建测试音频：静音和随机噪声各1秒，合并为一个批次只做一次前向推理
+        test_batch = torch.stack([
+            torch.zeros(16000),         # 1秒静音
+            torch.randn(16000) * 0.1,   # 1秒随机噪声
+        ])
+        with torch.inference_mode():
+            speech_probs = vad.model(test_batch, 16000)
         
-        # 创建测试音频（随机噪声）
-        noise_audio = torch.randn(16000) * 0.1
-        speech_prob = vad.model(noise_audio, 16000).item()
-        print(f"噪声测试 - 语音概率: {speech_prob:.3f}")
+        print(f"静音测试 - 语音概率: {speech_probs[0].item():.3f}")
+        print(f"噪声测试 - 语音概率: {speech_probs[1].item():.3f}")
+        
+        # 量化/编译后的模型不应把静音判为语音
+        if speech_probs[0].item() >= vad.threshold:
+            print("⚠️ 静音被判定为语音，请检查VAD模型的量化或编译配置")
         
         print("✅ VAD模型测试完成")
         
@@ -164,31 +175,45 @@ if __name__ == "__main__":
     print("🔧 Phone Agent 音频诊断工具")
     print("=" * 60)
     
-    # 1. 检测音频设备
-    input_devices = check_audio_devices()
+    # 只初始化一次PyAudio，避免重复枚举音频设备
+    try:
+        import pyaudio
+        print("✅ PyAudio 已安装")
+    except ImportError:
+        print("❌ PyAudio 未安装，请运行: pip install pyaudio")
+        pyaudio = None
     
-    # 2. 测试VAD
-    test_vad()
+    p = pyaudio.PyAudio() if pyaudio else None
     
-    # 3. 测试麦克风
-    if input_devices:
-        print(f"\n请选择要测试的麦克风设备:")
-        for i, (device_index, device_info) in enumerate(input_devices):
-            print(f"  {i}: 设备{device_index} - {device_info['name']}")
+    try:
+        # 1. 检测音频设备
+        input_devices = check_audio_devices(p) if p else None
         
-        try:
-            choice = input(f"\n输入设备编号 (0-{len(input_devices)-1}) 或按Enter使用默认: ")
-            if choice.strip():
-                device_idx = input_devices[int(choice)][0]
-            else:
-                device_idx = None
-            
-            test_microphone(device_idx, duration=5)
+        # 2. 测试VAD
+        test_vad()
+        
+        # 3. 测试麦克风
+        if input_devices:
+            print(f"\n请选择要测试的麦克风设备:")
+            for i, (device_index, device_info) in enumerate(input_devices):
+                print(f"  {i}: 设备{device_index} - {device_info['name']}")
             
-        except (ValueError, IndexError):
-            print("无效输入，使用默认设备")
-            test_microphone(None, duration=5)
-        except KeyboardInterrupt:
-            print("\n测试被中断")
+            try:
+                choice = input(f"\n输入设备编号 (0-{len(input_devices)-1}) 或按Enter使用默认: ")
+                if choice.strip():
+                    device_idx = input_devices[int(choice)][0]
+                else:
+                    device_idx = None
+                
+                test_microphone(p, device_idx, duration=5)
+                
+            except (ValueError, IndexError):
+                print("无效输入，使用默认设备")
+                test_microphone(p, None, duration=5)
+            except KeyboardInterrupt:
+                print("\n测试被中断")
+    finally:
+        if p:
+            p.terminate()
     
     print(f"\n✅ 诊断完成")
\ No newline at end of file
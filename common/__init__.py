@@ -6,29 +6,6 @@
 - 通用工具和辅助函数
 """
 
-# 导出消息通信相关的核心类和函数
-from .messaging import (
-    # 枚举类
-    MessageType,
-    MessageSource,
-    PartType,
-    
-    # 核心类
-    Part,
-    A2AMessage,
-    A2AMessageQueue,
-    
-    # 全局实例
-    message_queue,
-    
-    # 消息构建辅助函数
-    create_info_message,
-    create_error_message,
-    create_request_message,
-    create_status_message,
-    create_action_message,
-)
-
 # 定义公开的API
 __all__ = [
     # 枚举类
@@ -50,4 +27,24 @@ __all__ = [
     "create_request_message", 
     "create_status_message",
     "create_action_message",
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """
+    按需导入消息通信模块中的公开对象(PEP 562)
+    
+    首次访问时导入messaging并将结果缓存到模块全局变量中，
+    之后的访问不再经过此函数
+    """
+    if name in __all__:
+        from . import messaging
+        value = getattr(messaging, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """列出模块属性，包含尚未导入的公开对象"""
+    return sorted(set(globals()) | set(__all__))
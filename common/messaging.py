@@ -5,13 +5,24 @@ Agent-to-Agent(A2A)通信模块
 """
 
 import asyncio
+import inspect
+import itertools
 import json
+import os
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Any, Dict, List, Optional, Union, Callable
 
+# 尝试导入orjson，加速消息序列化
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class MessageType(Enum):
     """消息类型枚举"""
@@ -36,7 +47,74 @@ class PartType(Enum):
     IMAGE = auto()     # 图像内容
 
 
-@dataclass
+# 枚举成员与序列化名称的映射表（导入时构建一次，避免每条消息重复计算）
+_SOURCE_NAME = {m: m.name.lower() for m in MessageSource}
+_TYPE_NAME = {m: m.name.lower() for m in MessageType}
+_PART_TYPE_NAME = {m: m.name.lower() for m in PartType}
+_SOURCE_BY_NAME = {name: m for m, name in _SOURCE_NAME.items()}
+_TYPE_BY_NAME = {name: m for m, name in _TYPE_NAME.items()}
+_PART_TYPE_BY_NAME = {name: m for m, name in _PART_TYPE_NAME.items()}
+
+# 消息优先级（数值越小越先被处理），错误和操作指令可越过积压的状态消息
+MESSAGE_PRIORITY = {
+    MessageType.ERROR: 0,
+    MessageType.ACTION: 1,
+    MessageType.REQUEST: 2,
+    MessageType.STATUS: 3,
+    MessageType.INFO: 4,
+}
+
+
+def _lookup_enum(by_name: Dict[str, Enum], name: str) -> Enum:
+    """
+    按序列化名称查找枚举成员
+    
+    常见的小写名称直接命中映射表，其他大小写形式才做一次lower()转换
+    
+    参数:
+        by_name: 小写名称到枚举成员的映射表
+        name: 序列化名称
+        
+    返回:
+        枚举成员
+    """
+    member = by_name.get(name)
+    if member is None:
+        member = by_name[name.lower()]
+    return member
+
+
+# 预读的随机字节池，批量读取os.urandom以摊薄每条消息生成ID的开销
+_UUID_POOL_SIZE = 1024
+_rand_buf = bytearray()
+
+
+def _reset_rand_buf() -> None:
+    """丢弃随机字节池（fork后的子进程不能复用父进程的随机数）"""
+    global _rand_buf
+    _rand_buf = bytearray()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_rand_buf)
+
+
+def _fast_uuid() -> str:
+    """
+    生成随机UUID(version 4)的十六进制字符串
+    
+    返回:
+        32位十六进制字符串（不含连字符）
+    """
+    global _rand_buf
+    if len(_rand_buf) < 16:
+        _rand_buf = bytearray(os.urandom(16 * _UUID_POOL_SIZE))
+    raw = bytes(_rand_buf[-16:])
+    del _rand_buf[-16:]
+    return uuid.UUID(bytes=raw, version=4).hex
+
+
+@dataclass(slots=True)
 class Part:
     """消息内容部分，基于Google A2A协议设计"""
     part_type: PartType
@@ -45,7 +123,7 @@ class Part:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class A2AMessage:
     """
     Agent-to-Agent(A2A)消息，基于Google A2A协议设计
@@ -61,7 +139,7 @@ class A2AMessage:
     type: MessageType
     content: Dict[str, Any]
     task_id: str
-    message_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    message_id: str = field(default_factory=_fast_uuid)
     timestamp: float = field(default_factory=time.time)
     parts: List[Part] = field(default_factory=list)
     
@@ -69,14 +147,14 @@ class A2AMessage:
         """将消息转换为字典形式"""
         return {
             "message_id": self.message_id,
-            "source": self.source.name.lower(),
-            "type": self.type.name.lower(),
+            "source": _SOURCE_NAME[self.source],
+            "type": _TYPE_NAME[self.type],
             "content": self.content,
             "task_id": self.task_id,
             "timestamp": self.timestamp,
             "parts": [
                 {
-                    "part_type": part.part_type.name.lower(),
+                    "part_type": _PART_TYPE_NAME[part.part_type],
                     "content": part.content,
                     "mime_type": part.mime_type,
                     "metadata": part.metadata
@@ -88,12 +166,12 @@ class A2AMessage:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "A2AMessage":
         """从字典创建消息对象"""
-        source = MessageSource[data["source"].upper()]
-        msg_type = MessageType[data["type"].upper()]
+        source = _lookup_enum(_SOURCE_BY_NAME, data["source"])
+        msg_type = _lookup_enum(_TYPE_BY_NAME, data["type"])
         
         parts = []
         for part_data in data.get("parts", []):
-            part_type = PartType[part_data["part_type"].upper()]
+            part_type = _lookup_enum(_PART_TYPE_BY_NAME, part_data["part_type"])
             parts.append(Part(
                 part_type=part_type,
                 content=part_data["content"],
@@ -101,8 +179,12 @@ class A2AMessage:
                 metadata=part_data.get("metadata", {})
             ))
         
+        message_id = data.get("message_id")
+        if message_id is None:
+            message_id = _fast_uuid()
+        
         return cls(
-            message_id=data.get("message_id", str(uuid.uuid4())),
+            message_id=message_id,
             source=source,
             type=msg_type,
             content=data["content"],
@@ -111,14 +193,25 @@ class A2AMessage:
             parts=parts
         )
     
+    def to_bytes(self) -> bytes:
+        """将消息序列化为UTF-8编码的JSON字节串"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict()).encode("utf-8")
+    
     def to_json(self) -> str:
         """将消息序列化为JSON"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self.to_dict()).decode("utf-8")
         return json.dumps(self.to_dict())
     
     @classmethod
-    def from_json(cls, json_str: str) -> "A2AMessage":
-        """从JSON创建消息对象"""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> "A2AMessage":
+        """从JSON（字符串或字节串）创建消息对象"""
+        if ORJSON_AVAILABLE:
+            data = orjson.loads(json_str)
+        else:
+            data = json.loads(json_str)
         return cls.from_dict(data)
 
 
@@ -126,27 +219,43 @@ class A2AMessageQueue:
     """
     Agent-to-Agent消息队列
     
-    管理Phone Agent和Computer Agent之间的消息传递
+    管理Phone Agent和Computer Agent之间的消息传递。
+    
+    队列按MESSAGE_PRIORITY排序，同一优先级内保持发送顺序。
+    两个Agent处于同一进程时，队列中直接传递A2AMessage对象，不做任何序列化；
+    跨进程的传输层应只在socket边界调用to_json/from_json（或to_bytes）。
     """
     
-    def __init__(self):
+    def __init__(self, serialize_on_send: bool = False, history_maxlen: int = 4096):
+        """
+        初始化消息队列
+        
+        参数:
+            serialize_on_send: 是否在发送时序列化消息（挂接远程传输层时使用）
+            history_maxlen: 消息历史保留的最大条数，超出后丢弃最早的消息
+        """
+        self.serialize_on_send = serialize_on_send
+        
         # 延迟初始化队列，避免事件循环问题
         self.phone_to_computer = None
         self.computer_to_phone = None
         
-        # 消息处理回调
-        self._phone_message_handlers = []
-        self._computer_message_handlers = []
+        # 同优先级消息的先后序号，保证FIFO且避免比较消息对象
+        self._sequence = itertools.count()
         
-        # 消息历史
-        self.message_history = []
+        # 消息处理回调：(handler, 是否为协程函数) 元组，注册时构建
+        self._phone_message_handlers = ()
+        self._computer_message_handlers = ()
+        
+        # 消息历史（有界，避免长时间会话内存持续增长）
+        self.message_history = deque(maxlen=history_maxlen)
         
     def _ensure_queues_initialized(self):
         """确保队列已初始化"""
         if self.phone_to_computer is None:
-            self.phone_to_computer = asyncio.Queue()
+            self.phone_to_computer = asyncio.PriorityQueue()
         if self.computer_to_phone is None:
-            self.computer_to_phone = asyncio.Queue()
+            self.computer_to_phone = asyncio.PriorityQueue()
         
     async def send_to_computer(self, message: A2AMessage) -> None:
         """
@@ -164,8 +273,9 @@ class A2AMessageQueue:
         # 记录消息
         self.message_history.append(message)
         
-        # 放入队列
-        await self.phone_to_computer.put(message)
+        # 放入队列（仅在需要跨进程传输时序列化）
+        payload = message.to_bytes() if self.serialize_on_send else message
+        await self.phone_to_computer.put((MESSAGE_PRIORITY[message.type], next(self._sequence), payload))
         
     async def send_to_phone(self, message: A2AMessage) -> None:
         """
@@ -183,8 +293,53 @@ class A2AMessageQueue:
         # 记录消息
         self.message_history.append(message)
         
-        # 放入队列
-        await self.computer_to_phone.put(message)
+        # 放入队列（仅在需要跨进程传输时序列化）
+        payload = message.to_bytes() if self.serialize_on_send else message
+        await self.computer_to_phone.put((MESSAGE_PRIORITY[message.type], next(self._sequence), payload))
+        
+    async def send_many_to_computer(self, messages: List[A2AMessage]) -> None:
+        """
+        批量发送消息到Computer Agent
+        
+        所有消息直接放入无界队列，不逐条await，减少事件循环唤醒次数
+        
+        参数:
+            messages: 要发送的消息列表
+        """
+        # 确保队列已初始化
+        self._ensure_queues_initialized()
+        
+        for message in messages:
+            message.source = MessageSource.PHONE
+            self._put_nowait(self.phone_to_computer, message)
+    
+    async def send_many_to_phone(self, messages: List[A2AMessage]) -> None:
+        """
+        批量发送消息到Phone Agent
+        
+        所有消息直接放入无界队列，不逐条await，减少事件循环唤醒次数
+        
+        参数:
+            messages: 要发送的消息列表
+        """
+        # 确保队列已初始化
+        self._ensure_queues_initialized()
+        
+        for message in messages:
+            message.source = MessageSource.COMPUTER
+            self._put_nowait(self.computer_to_phone, message)
+    
+    def _put_nowait(self, queue: asyncio.PriorityQueue, message: A2AMessage) -> None:
+        """
+        记录消息并立即放入队列
+        
+        参数:
+            queue: 目标队列
+            message: 要发送的消息
+        """
+        self.message_history.append(message)
+        payload = message.to_bytes() if self.serialize_on_send else message
+        queue.put_nowait((MESSAGE_PRIORITY[message.type], next(self._sequence), payload))
         
     async def receive_from_computer(self) -> A2AMessage:
         """
@@ -196,11 +351,14 @@ class A2AMessageQueue:
         # 确保队列已初始化
         self._ensure_queues_initialized()
         
-        message = await self.computer_to_phone.get()
+        _, _, message = await self.computer_to_phone.get()
+        if isinstance(message, bytes):
+            message = A2AMessage.from_json(message)
         
-        # 触发消息处理回调
-        for handler in self._phone_message_handlers:
-            asyncio.create_task(handler(message))
+        # 触发消息处理回调（无回调时不做任何调度）
+        handlers = self._phone_message_handlers
+        if handlers:
+            asyncio.get_running_loop().call_soon(_dispatch_handlers, handlers, message)
             
         return message
         
@@ -214,14 +372,32 @@ class A2AMessageQueue:
         # 确保队列已初始化
         self._ensure_queues_initialized()
         
-        message = await self.phone_to_computer.get()
+        _, _, message = await self.phone_to_computer.get()
+        if isinstance(message, bytes):
+            message = A2AMessage.from_json(message)
         
-        # 触发消息处理回调
-        for handler in self._computer_message_handlers:
-            asyncio.create_task(handler(message))
+        # 触发消息处理回调（无回调时不做任何调度）
+        handlers = self._computer_message_handlers
+        if handlers:
+            asyncio.get_running_loop().call_soon(_dispatch_handlers, handlers, message)
             
         return message
     
+    def history_snapshot(self, n: Optional[int] = None) -> List[A2AMessage]:
+        """
+        获取消息历史的列表副本
+        
+        参数:
+            n: 只返回最近的n条消息，None表示返回全部
+            
+        返回:
+            消息列表，按发送顺序排列
+        """
+        if n is None:
+            return list(self.message_history)
+        start = max(len(self.message_history) - n, 0)
+        return list(itertools.islice(self.message_history, start, None))
+    
     def register_phone_message_handler(self, handler: Callable[[A2AMessage], None]) -> None:
         """
         注册Phone消息处理回调
@@ -229,7 +405,7 @@ class A2AMessageQueue:
         参数:
             handler: 消息处理回调函数
         """
-        self._phone_message_handlers.append(handler)
+        self._phone_message_handlers += ((handler, inspect.iscoroutinefunction(handler)),)
         
     def register_computer_message_handler(self, handler: Callable[[A2AMessage], None]) -> None:
         """
@@ -238,24 +414,55 @@ class A2AMessageQueue:
         参数:
             handler: 消息处理回调函数
         """
-        self._computer_message_handlers.append(handler)
+        self._computer_message_handlers += ((handler, inspect.iscoroutinefunction(handler)),)
     
     def clear_queues(self) -> None:
         """清空所有消息队列"""
         # 确保队列已初始化
         self._ensure_queues_initialized()
         
-        while not self.phone_to_computer.empty():
-            try:
-                self.phone_to_computer.get_nowait()
-            except asyncio.QueueEmpty:
-                break
-                
-        while not self.computer_to_phone.empty():
-            try:
-                self.computer_to_phone.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        for queue in (self.phone_to_computer, self.computer_to_phone):
+            self._drain_queue(queue)
+    
+    @staticmethod
+    def _drain_queue(queue: asyncio.PriorityQueue) -> None:
+        """
+        清空单个队列
+        
+        直接清空asyncio.Queue内部的容器，并重置未完成任务计数；
+        若CPython内部实现变化导致属性不存在，则回退到逐条出队。
+        
+        参数:
+            queue: 要清空的队列
+        """
+        try:
+            queue._queue.clear()
+            queue._unfinished_tasks = 0
+            queue._finished.set()
+        except AttributeError:
+            while not queue.empty():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+
+
+def _dispatch_handlers(handlers: tuple, message: A2AMessage) -> None:
+    """
+    依次调用消息处理回调，仅为协程回调创建任务
+    
+    参数:
+        handlers: (handler, 是否为协程函数) 元组序列
+        message: 要分发的消息
+    """
+    for handler, is_coroutine in handlers:
+        if is_coroutine:
+            asyncio.create_task(handler(message))
+        else:
+            result = handler(message)
+            # 兼容返回可等待对象的普通回调（如functools.partial包装的协程函数）
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
 
 
 # 全局消息队列实例
@@ -263,6 +470,27 @@ message_queue = A2AMessageQueue()
 
 
 # 消息构建辅助函数
+def _build_message(
+    msg_type: MessageType,
+    content: Dict[str, Any],
+    task_id: str,
+    source: MessageSource
+) -> A2AMessage:
+    """
+    构建消息对象的统一入口，以位置参数调用构造函数
+    
+    参数:
+        msg_type: 消息类型
+        content: 消息内容
+        task_id: 任务ID
+        source: 消息来源
+        
+    返回:
+        A2AMessage对象
+    """
+    return A2AMessage(source, msg_type, content, task_id, _fast_uuid(), time.time(), [])
+
+
 def create_info_message(
     text: str,
     task_id: str,
@@ -285,12 +513,7 @@ def create_info_message(
     if data:
         content["data"] = data
         
-    return A2AMessage(
-        source=source,
-        type=MessageType.INFO,
-        content=content,
-        task_id=task_id
-    )
+    return _build_message(MessageType.INFO, content, task_id, source)
 
 
 def create_error_message(
@@ -319,12 +542,7 @@ def create_error_message(
     if details:
         content["details"] = details
         
-    return A2AMessage(
-        source=source,
-        type=MessageType.ERROR,
-        content=content,
-        task_id=task_id
-    )
+    return _build_message(MessageType.ERROR, content, task_id, source)
 
 
 def create_request_message(
@@ -354,12 +572,7 @@ def create_request_message(
     if required_fields:
         content["required_fields"] = required_fields
         
-    return A2AMessage(
-        source=source,
-        type=MessageType.REQUEST,
-        content=content,
-        task_id=task_id
-    )
+    return _build_message(MessageType.REQUEST, content, task_id, source)
 
 
 def create_status_message(
@@ -388,12 +601,7 @@ def create_status_message(
     if details:
         content["details"] = details
         
-    return A2AMessage(
-        source=source,
-        type=MessageType.STATUS,
-        content=content,
-        task_id=task_id
-    )
+    return _build_message(MessageType.STATUS, content, task_id, source)
 
 
 def create_action_message(
@@ -418,9 +626,4 @@ def create_action_message(
     if parameters:
         content["parameters"] = parameters
         
-    return A2AMessage(
-        source=source,
-        type=MessageType.ACTION,
-        content=content,
-        task_id=task_id
-    ) 
\ No newline at end of file
+    return _build_message(MessageType.ACTION, content, task_id, source) 
\ No newline at end of file
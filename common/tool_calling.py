@@ -5,13 +5,24 @@
 """
 
 import asyncio
+import itertools
 import json
+import logging
+import sys
 import time
-import uuid
-from typing import Dict, Any, Optional, Callable, List
+from typing import Dict, Any, Optional, Callable, List, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum, auto
 
+# 尝试导入orjson，加速消息序列化
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 
 class MessageType(Enum):
     """消息类型枚举"""
@@ -24,7 +35,11 @@ class MessageType(Enum):
     TASK_COMPLETION = "task_completion" # 任务完成通知消息
 
 
-@dataclass
+# 消息类型值到枚举成员的映射，模块加载时构建一次
+_MESSAGE_TYPE_BY_VALUE: Dict[str, MessageType] = {mt.value: mt for mt in MessageType}
+
+
+@dataclass(slots=True)
 class ToolMessage:
     """工具调用消息格式"""
     message_id: str
@@ -34,33 +49,106 @@ class ToolMessage:
     content: Dict[str, Any]
     timestamp: float
     task_id: Optional[str] = None
+    
+    def to_bytes(self) -> bytes:
+        """将消息序列化为UTF-8编码的JSON字节串"""
+        if ORJSON_AVAILABLE:
+            # orjson原生支持dataclass和Enum，无需先转换为字典
+            return orjson.dumps(self)
+        data = asdict(self)
+        data["message_type"] = self.message_type.value
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+# 消息环形缓冲区的初始容量（必须是2的幂，下标用位掩码计算）
+_RING_CAPACITY = 256
 
 
 class ToolCallHandler:
-    """工具调用处理器"""
+    """
+    工具调用处理器
+    
+    每个处理器只有一个生产者（对端Agent）和一个消费者（start_listening），
+    因此用预分配的单生产者单消费者(SPSC)环形缓冲区代替asyncio.Queue：
+    生产者只推进_tail，消费者只推进_head，新消息通过一个asyncio.Event唤醒消费者。
+    """
     
     def __init__(self, agent_name: str):
-        self.agent_name = agent_name
+        # Agent名称驻留，消息的sender/recipient比较可退化为指针比较
+        self.agent_name = sys.intern(agent_name)
         self.message_handlers: Dict[MessageType, Callable] = {}
-        self.message_queue: asyncio.Queue = asyncio.Queue()
         self.running = False
         
+        # SPSC环形缓冲区
+        self._ring: List[Optional["ToolMessage"]] = [None] * _RING_CAPACITY
+        self._mask = _RING_CAPACITY - 1
+        self._head = 0
+        self._tail = 0
+        self._event = asyncio.Event()
+        
+        # 停止事件：stop()置位后立即唤醒监听循环
+        self._stop_event = asyncio.Event()
+        
+        # 消息ID计数器：以毫秒时间戳为种子，保证进程重启后ID也不重复
+        self._id_counter = itertools.count(int(time.time() * 1000) << 20)
+        
+        # 快速路径状态：_busy表示有消息正在处理，_fast_task为直接派发的处理任务
+        self._busy = False
+        self._fast_task: Optional[asyncio.Future] = None
+        
     def register_handler(self, message_type: MessageType, handler: Callable):
         """注册消息处理器"""
         self.message_handlers[message_type] = handler
         
+    def pending_count(self) -> int:
+        """返回尚未处理的消息数量"""
+        return self._tail - self._head
+        
     async def start_listening(self):
-        """开始监听消息"""
+        """
+        开始监听消息
+        
+        同时等待"有新消息"和"停止"两个事件，空闲时不会定时唤醒；
+        两个等待任务在迭代之间复用，只有被消费的那个才会重新创建。
+        """
         self.running = True
-        while self.running:
-            try:
-                # 等待消息
-                message = await asyncio.wait_for(self.message_queue.get(), timeout=1.0)
-                await self._handle_message(message)
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                print(f"❌ {self.agent_name} 处理消息时出错: {e}")
+        self._stop_event.clear()
+        stop_task = asyncio.ensure_future(self._stop_event.wait())
+        data_task = None
+        try:
+            while self.running:
+                # 先清除事件再检查缓冲区（双重检查），避免错过清除前到达的消息
+                self._event.clear()
+                # 快速路径派发的消息先于缓冲区中的消息到达，等它处理完再继续，保持顺序
+                if self._fast_task is not None and not self._fast_task.done():
+                    await asyncio.wait({self._fast_task})
+                while self._head != self._tail:
+                    index = self._head & self._mask
+                    message = self._ring[index]
+                    self._ring[index] = None
+                    self._head += 1
+                    self._busy = True
+                    try:
+                        await self._handle_message(message)
+                    except Exception as e:
+                        logger.error("❌ %s 处理消息时出错: %s", self.agent_name, e)
+                    finally:
+                        self._busy = False
+                    if not self.running:
+                        return
+                
+                if data_task is None:
+                    data_task = asyncio.ensure_future(self._event.wait())
+                done, _ = await asyncio.wait(
+                    {data_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if stop_task in done:
+                    return
+                data_task = None
+        finally:
+            for task in (data_task, stop_task):
+                if task is not None and not task.done():
+                    task.cancel()
                 
     async def _handle_message(self, message: ToolMessage):
         """处理接收到的消息"""
@@ -69,18 +157,18 @@ class ToolCallHandler:
             try:
                 await handler(message)
             except Exception as e:
-                print(f"❌ {self.agent_name} 消息处理器执行失败: {e}")
+                logger.error("❌ %s 消息处理器执行失败: %s", self.agent_name, e)
         else:
-            print(f"⚠️ {self.agent_name} 没有找到 {message.message_type.value} 类型的处理器")
+            logger.warning("⚠️ %s 没有找到 %s 类型的处理器", self.agent_name, message.message_type.value)
             
     async def send_message(self, recipient: str, message_type: MessageType, 
                           content: Dict[str, Any], task_id: Optional[str] = None) -> ToolMessage:
         """发送消息到另一个Agent"""
         message = ToolMessage(
-            message_id=str(uuid.uuid4()),
+            message_id=f"{self.agent_name}-{next(self._id_counter):x}",
             message_type=message_type,
             sender=self.agent_name,
-            recipient=recipient,
+            recipient=sys.intern(recipient),
             content=content,
             timestamp=time.time(),
             task_id=task_id
@@ -90,19 +178,99 @@ class ToolCallHandler:
         target_handler = get_agent_handler(recipient)
         if target_handler:
             await target_handler.receive_message(message)
-            print(f"📤 {self.agent_name} -> {recipient}: {message_type.value}")
+            logger.debug("📤 %s -> %s: %s", self.agent_name, recipient, message_type.value)
             return message
         else:
             raise Exception(f"找不到目标Agent: {recipient}")
             
+    async def send_many(self, recipient: str, messages: List[Tuple[MessageType, Dict[str, Any]]],
+                        task_id: Optional[str] = None) -> List[ToolMessage]:
+        """
+        批量发送消息到另一个Agent
+        
+        只查找一次目标处理器，整批消息按顺序放入对端缓冲区，对端监听循环只被唤醒一次
+        
+        参数:
+            recipient: 接收方Agent名称
+            messages: (消息类型, 消息内容)列表
+            task_id: 任务ID（可选）
+            
+        返回:
+            已发送的消息列表
+        """
+        target_handler = get_agent_handler(recipient)
+        if not target_handler:
+            raise Exception(f"找不到目标Agent: {recipient}")
+        
+        recipient = sys.intern(recipient)
+        timestamp = time.time()
+        batch = [
+            ToolMessage(
+                message_id=f"{self.agent_name}-{next(self._id_counter):x}",
+                message_type=message_type,
+                sender=self.agent_name,
+                recipient=recipient,
+                content=content,
+                timestamp=timestamp,
+                task_id=task_id
+            )
+            for message_type, content in messages
+        ]
+        await target_handler.receive_many(batch)
+        logger.debug("📤 %s -> %s: %d条消息", self.agent_name, recipient, len(batch))
+        return batch
+            
     async def receive_message(self, message: ToolMessage):
-        """接收来自另一个Agent的消息"""
-        await self.message_queue.put(message)
-        print(f"📥 {self.agent_name} <- {message.sender}: {message.message_type.value}")
+        """
+        接收来自另一个Agent的消息
+        
+        监听中且空闲（缓冲区为空、没有正在处理的消息）时，如果已注册对应的处理器，
+        直接派发处理任务而不经过缓冲区和监听循环；否则放入缓冲区，保证积压时的顺序
+        """
+        if (self.running and not self._busy and self._head == self._tail
+                and message.message_type in self.message_handlers):
+            self._busy = True
+            self._fast_task = asyncio.ensure_future(self._handle_message_fast(message))
+            logger.debug("📥 %s <- %s: %s", self.agent_name, message.sender, message.message_type.value)
+            return
+        
+        if self._tail - self._head > self._mask:
+            self._grow_ring()
+        self._ring[self._tail & self._mask] = message
+        self._tail += 1
+        self._event.set()
+        logger.debug("📥 %s <- %s: %s", self.agent_name, message.sender, message.message_type.value)
+        
+    async def receive_many(self, messages: List[ToolMessage]):
+        """批量接收消息：整批按顺序放入缓冲区后只唤醒一次监听循环"""
+        for message in messages:
+            if self._tail - self._head > self._mask:
+                self._grow_ring()
+            self._ring[self._tail & self._mask] = message
+            self._tail += 1
+        self._event.set()
+        logger.debug("📥 %s <- 批量消息: %d条", self.agent_name, len(messages))
+        
+    async def _handle_message_fast(self, message: ToolMessage):
+        """快速路径：处理直接派发的消息，完成后恢复空闲状态"""
+        try:
+            await self._handle_message(message)
+        finally:
+            self._busy = False
+        
+    def _grow_ring(self):
+        """缓冲区已满时容量翻倍（同一事件循环内执行，无需加锁）"""
+        pending = [self._ring[i & self._mask] for i in range(self._head, self._tail)]
+        capacity = len(self._ring) * 2
+        self._ring = pending + [None] * (capacity - len(pending))
+        self._mask = capacity - 1
+        self._head = 0
+        self._tail = len(pending)
         
     def stop(self):
         """停止监听"""
         self.running = False
+        self._stop_event.set()
 
 
 # 全局Agent处理器注册表
@@ -112,8 +280,8 @@ _agent_handlers: Dict[str, ToolCallHandler] = {}
 def register_agent_handler(agent_name: str, handler: ToolCallHandler):
     """注册Agent处理器"""
     _agent_handlers[agent_name] = handler
-    print(f"✅ 注册Agent处理器: {agent_name}")
-    print(f"   当前已注册的处理器: {list(_agent_handlers.keys())}")
+    logger.info("✅ 注册Agent处理器: %s", agent_name)
+    logger.debug("   当前已注册的处理器: %s", list(_agent_handlers))
 
 
 def get_agent_handler(agent_name: str) -> Optional[ToolCallHandler]:
@@ -163,7 +331,7 @@ async def send_message_to_computer_agent(
             content.update(additional_data)
             
         # 发送消息
-        msg_type = MessageType(message_type) if message_type in [t.value for t in MessageType] else MessageType.USER_INPUT
+        msg_type = _MESSAGE_TYPE_BY_VALUE.get(message_type, MessageType.USER_INPUT)
         sent_message = await phone_handler.send_message(
             recipient="computer_agent",
             message_type=msg_type,
@@ -215,7 +383,7 @@ async def send_message_to_phone_agent(
             content.update(additional_data)
             
         # 发送消息
-        msg_type = MessageType(message_type) if message_type in [t.value for t in MessageType] else MessageType.TASK_RESULT
+        msg_type = _MESSAGE_TYPE_BY_VALUE.get(message_type, MessageType.TASK_RESULT)
         sent_message = await computer_handler.send_message(
             recipient="phone_agent",
             message_type=msg_type,
@@ -233,6 +401,57 @@ async def send_message_to_phone_agent(
         return {"success": False, "error": str(e)}
 
 
+async def send_messages_to_phone_agent(
+    messages: List[Dict[str, Any]],
+    task_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Computer Agent调用此工具批量发送消息给Phone Agent
+    
+    Args:
+        messages: 消息列表，每项包含message、message_type（可选）和additional_data（可选）
+        task_id: 任务ID（可选）
+        
+    Returns:
+        发送结果
+    """
+    try:
+        # 获取Computer Agent的处理器
+        computer_handler = get_agent_handler("computer_agent")
+        if not computer_handler:
+            return {"success": False, "error": "Computer Agent处理器未注册"}
+        
+        # 构建消息内容，整批共用一个时间戳
+        timestamp = time.time()
+        batch = []
+        for item in messages:
+            content = {
+                "text": item["message"],
+                "timestamp": timestamp
+            }
+            additional_data = item.get("additional_data")
+            if additional_data:
+                content.update(additional_data)
+            msg_type = _MESSAGE_TYPE_BY_VALUE.get(item.get("message_type", "task_result"), MessageType.TASK_RESULT)
+            batch.append((msg_type, content))
+        
+        # 批量发送消息
+        sent_messages = await computer_handler.send_many(
+            recipient="phone_agent",
+            messages=batch,
+            task_id=task_id
+        )
+        
+        return {
+            "success": True,
+            "message_ids": [sent_message.message_id for sent_message in sent_messages],
+            "sent_at": timestamp
+        }
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
 # 工具定义（用于LLM调用）
 PHONE_AGENT_TOOLS = [
     {
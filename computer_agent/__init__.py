@@ -4,16 +4,24 @@ Computer Agent包
 提供基于浏览器自动化的Agent，能够执行网页操作和表单填写
 """
 
-from dual_agent.computer_agent.browser_automation import (
-    BrowserAutomation, BrowserType, ActionType, ActionResult
-)
-from dual_agent.computer_agent.page_analyzer import (
-    PageAnalyzer, LLMProvider, ElementType, PageElement, 
-    FormInfo, PageAnalysis
-)
-# from dual_agent.computer_agent.computer_agent import (
-#     ComputerAgent, ComputerAgentState, TaskContext
-# )
+import importlib
+
+# 公开对象到所在模块的映射：Playwright和LLM客户端只在首次访问对应对象时才导入(PEP 562)
+_LAZY = {
+    'BrowserAutomation': 'dual_agent.computer_agent.browser_automation',
+    'BrowserType': 'dual_agent.computer_agent.browser_automation',
+    'ActionType': 'dual_agent.computer_agent.browser_automation',
+    'ActionResult': 'dual_agent.computer_agent.browser_automation',
+    'PageAnalyzer': 'dual_agent.computer_agent.page_analyzer',
+    'LLMProvider': 'dual_agent.computer_agent.page_analyzer',
+    'ElementType': 'dual_agent.computer_agent.page_analyzer',
+    'PageElement': 'dual_agent.computer_agent.page_analyzer',
+    'FormInfo': 'dual_agent.computer_agent.page_analyzer',
+    'PageAnalysis': 'dual_agent.computer_agent.page_analyzer',
+    # 'ComputerAgent': 'dual_agent.computer_agent.computer_agent',
+    # 'ComputerAgentState': 'dual_agent.computer_agent.computer_agent',
+    # 'TaskContext': 'dual_agent.computer_agent.computer_agent',
+}
 
 __all__ = [
     'BrowserAutomation',
@@ -29,4 +37,24 @@ __all__ = [
     'ComputerAgent',
     'ComputerAgentState',
     'TaskContext',
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """
+    按需导入公开对象(PEP 562)
+    
+    首次访问时导入所在模块并将结果缓存到模块全局变量中，
+    之后的访问不再经过此函数
+    """
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """列出模块属性，包含尚未导入的公开对象"""
+    return sorted(set(globals()) | set(__all__))
@@ -8,8 +8,10 @@ import asyncio
 import base64
 import json
 import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
 from enum import Enum, auto
 
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, ElementHandle
@@ -31,21 +33,183 @@ class ActionType(Enum):
     PRESS_KEY = auto()
     WAIT = auto()
 
+# 各操作类型附加信息(meta)的字段名，用于把操作记录还原为字典
+_ACTION_META_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "navigate": ("url",),
+    "click": ("selector",),
+    "type": ("selector", "text"),
+    "scroll": ("direction", "pixels"),
+}
+
+class ActionRecord(NamedTuple):
+    """操作历史记录（轻量元组，需要时再转换为字典）"""
+    type: str
+    timestamp: float
+    success: bool
+    meta: Tuple[Any, ...] = ()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为与旧版操作历史一致的字典格式"""
+        record = {"type": self.type}
+        record.update(zip(_ACTION_META_FIELDS.get(self.type, ()), self.meta))
+        record["timestamp"] = self.timestamp
+        record["success"] = self.success
+        return record
+
 class ActionResult:
     """操作结果类"""
-    def __init__(self, success: bool, message: str = "", data: Optional[Dict[str, Any]] = None):
+    __slots__ = ("success", "message", "data", "timestamp", "_dict_view")
+    
+    def __init__(self, success: bool, message: str = "", data: Optional[Dict[str, Any]] = None,
+                 timestamp: Optional[float] = None):
         self.success = success
         self.message = message
         self.data = data or {}
-        self.timestamp = time.time()
+        # 调用方已取得时间戳时直接复用，避免重复调用time.time()
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._dict_view = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "message": self.message,
-            "data": self.data,
-            "timestamp": self.timestamp
+    def to_dict(self) -> Mapping[str, Any]:
+        """
+        转换为只读字典视图
+        
+        操作结果创建后不再修改，因此视图只构建一次并缓存，重复调用不再复制
+        
+        返回:
+            包含success/message/data/timestamp的只读映射
+        """
+        if self._dict_view is None:
+            self._dict_view = MappingProxyType({
+                "success": self.success,
+                "message": self.message,
+                "data": self.data,
+                "timestamp": self.timestamp
+            })
+        return self._dict_view
+
+# 页面内容提取脚本：用一次TreeWalker遍历DOM，同时收集表单字段和可点击元素，
+# 并把文本(以及按需的HTML)一起返回，只需一次CDP往返
+_EXTRACT_PAGE_JS = """
+(includeHtml) => {
+    const forms = [];
+    const formByNode = new Map();
+    const clickables = [];
+    let clickableIndex = 0;
+    
+    const walker = document.createTreeWalker(document.documentElement, NodeFilter.SHOW_ELEMENT);
+    for (let element = walker.currentNode; element; element = walker.nextNode()) {
+        const tag = element.tagName.toLowerCase();
+        
+        if (tag === 'form') {
+            const formData = {
+                id: element.id || `form_${forms.length}`,
+                action: element.action,
+                method: element.method,
+                elements: []
+            };
+            forms.push(formData);
+            formByNode.set(element, formData);
+        } else if (tag === 'input' || tag === 'textarea' || tag === 'select') {
+            const formData = formByNode.get(element.closest('form'));
+            if (formData) {
+                const elementIndex = formData.elements.length;
+                formData.elements.push({
+                    tag: tag,
+                    type: element.type || 'text',
+                    name: element.name || `element_${elementIndex}`,
+                    id: element.id || `element_${elementIndex}`,
+                    placeholder: element.placeholder || '',
+                    value: element.value || '',
+                    required: element.required || false,
+                    label: element.labels && element.labels[0] ? element.labels[0].innerText : ''
+                });
+            }
+        }
+        
+        if (element.matches('button, a, [onclick], [role="button"]')) {
+            const index = clickableIndex++;
+            const rect = element.getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) {
+                clickables.push({
+                    tag: tag,
+                    text: element.innerText || element.textContent || '',
+                    id: element.id || `clickable_${index}`,
+                    class: element.className || '',
+                    href: element.href || '',
+                    x: rect.x,
+                    y: rect.y,
+                    width: rect.width,
+                    height: rect.height
+                });
+            }
         }
+    }
+    
+    return {
+        html: includeHtml ? document.documentElement.outerHTML : null,
+        text: document.body ? document.body.innerText : '',
+        forms: forms,
+        clickables: clickables
+    };
+}
+"""
+
+# 初始化脚本：把提取函数注册为window.__da_extract，每个新文档加载时由浏览器自动注入，
+# 之后每次提取只需发送一个很短的调用表达式，V8也可以复用已编译的函数
+_EXTRACT_PAGE_INIT_JS = f"window.__da_extract = {_EXTRACT_PAGE_JS.strip()};"
+
+# 调用已注入的提取函数；未注入时(如初始化前已打开的页面)返回null，由调用方回退到完整脚本
+_CALL_EXTRACT_PAGE_JS = "(includeHtml) => window.__da_extract ? window.__da_extract(includeHtml) : null"
+
+# 滚动脚本：滚动后等待下一帧渲染完成再返回
+_SCROLL_JS = """
+([dx, dy]) => new Promise(resolve => {
+    window.scrollBy(dx, dy);
+    requestAnimationFrame(() => resolve());
+})
+"""
+
+# CSS字符串中需要转义的字符（反斜杠、双引号和换行）
+_CSS_STRING_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\a ', '\r': '\\d '})
+
+def css_string(value: str) -> str:
+    """
+    把任意文本转换为带双引号的CSS字符串字面量，用于属性选择器
+    
+    含引号或反斜杠的字段名、选项值不会破坏选择器，避免查找失败后的重试往返
+    
+    参数:
+        value: 原始文本
+        
+    返回:
+        可直接放入[attr=...]中的CSS字符串
+    """
+    return f'"{value.translate(_CSS_STRING_ESCAPES)}"'
+
+def _locator_selector(selector: str) -> str:
+    """将以//开头的XPath选择器转换为Playwright locator可识别的xpath=形式"""
+    return f"xpath={selector}" if selector.startswith('//') else selector
+
+def ensure_b64(result_data: Dict[str, Any]) -> Optional[str]:
+    """
+    获取截图的base64编码，按需计算并缓存
+    
+    截图在进程内以原始PNG字节传递，只有在需要序列化给LLM时才调用本函数编码
+    
+    参数:
+        result_data: take_screenshot返回结果中的data字典
+        
+    返回:
+        base64编码的截图，没有截图时返回None
+    """
+    screenshot_b64 = result_data.get("screenshot_b64")
+    if screenshot_b64 is None:
+        screenshot = result_data.get("screenshot")
+        if screenshot is None:
+            return None
+        screenshot_b64 = base64.b64encode(screenshot).decode('ascii')
+        result_data["screenshot_b64"] = screenshot_b64
+    return screenshot_b64
 
 class BrowserAutomation:
     """
@@ -60,7 +224,8 @@ class BrowserAutomation:
         headless: bool = False,
         debug: bool = False,
         user_data_dir: Optional[str] = None,
-        viewport_size: Tuple[int, int] = (1280, 720)
+        viewport_size: Tuple[int, int] = (1280, 720),
+        action_history_size: int = 1024
     ):
         """
         初始化浏览器自动化
@@ -71,6 +236,7 @@ class BrowserAutomation:
             debug: 是否调试模式
             user_data_dir: 用户数据目录(保持会话)
             viewport_size: 视窗大小
+            action_history_size: 保留的最近操作历史条数
         """
         self.browser_type = browser_type
         self.headless = headless
@@ -89,8 +255,8 @@ class BrowserAutomation:
         self.current_url = ""
         self.page_title = ""
         
-        # 操作历史
-        self.action_history = []
+        # 操作历史（有界环形缓冲区，只保留最近的操作）
+        self.action_history = deque(maxlen=action_history_size)
         
     async def initialize(self) -> ActionResult:
         """
@@ -127,6 +293,9 @@ class BrowserAutomation:
                 
             self.context = await self.browser.new_context(**context_options)
             
+            # 注册页面内容提取函数，上下文中的每个页面和每次导航都会自动注入
+            await self.context.add_init_script(_EXTRACT_PAGE_INIT_JS)
+            
             # 创建页面
             self.page = await self.context.new_page()
             
@@ -157,7 +326,7 @@ class BrowserAutomation:
             return ActionResult(False, "浏览器未初始化")
         
         try:
-            self.log(f"导航到URL: {url}")
+            self.log("导航到URL: %s", url)
             
             # 导航到页面
             response = await self.page.goto(url, wait_until="networkidle")
@@ -166,14 +335,9 @@ class BrowserAutomation:
             self.current_url = self.page.url
             self.page_title = await self.page.title()
             
-            # 记录操作
-            action = {
-                "type": "navigate",
-                "url": url,
-                "timestamp": time.time(),
-                "success": True
-            }
-            self.action_history.append(action)
+            # 记录操作（操作记录和返回结果共用同一个时间戳）
+            ts = time.time()
+            self.action_history.append(ActionRecord("navigate", ts, True, (url,)))
             
             result_data = {
                 "url": self.current_url,
@@ -181,8 +345,8 @@ class BrowserAutomation:
                 "status": response.status if response else None
             }
             
-            self.log(f"导航成功: {self.page_title}")
-            return ActionResult(True, f"成功导航到 {self.page_title}", result_data)
+            self.log("导航成功: %s", self.page_title)
+            return ActionResult(True, f"成功导航到 {self.page_title}", result_data, timestamp=ts)
             
         except Exception as e:
             error_msg = f"导航失败: {str(e)}"
@@ -197,7 +361,7 @@ class BrowserAutomation:
             full_page: 是否截取完整页面
             
         返回:
-            操作结果，包含base64编码的截图
+            操作结果，包含PNG原始字节的截图（base64编码请使用ensure_b64按需获取）
         """
         if not self.is_initialized:
             return ActionResult(False, "浏览器未初始化")
@@ -211,11 +375,10 @@ class BrowserAutomation:
                 type="png"
             )
             
-            # 转换为base64
-            screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
-            
+            # 进程内直接传递原始字节，base64编码推迟到序列化给LLM时(ensure_b64)
             result_data = {
-                "screenshot": screenshot_base64,
+                "screenshot": screenshot_bytes,
+                "screenshot_b64": None,
                 "url": self.current_url,
                 "title": self.page_title,
                 "full_page": full_page
@@ -229,12 +392,15 @@ class BrowserAutomation:
             self.log(error_msg)
             return ActionResult(False, error_msg)
     
-    async def extract_page_content(self) -> ActionResult:
+    async def extract_page_content(self, include_html: bool = False) -> ActionResult:
         """
         提取页面内容
         
+        参数:
+            include_html: 是否返回完整HTML（大页面的HTML可能有数MB，默认不传输）
+            
         返回:
-            操作结果，包含DOM结构和文本内容
+            操作结果，包含DOM结构和文本内容（未请求HTML时html字段为None）
         """
         if not self.is_initialized:
             return ActionResult(False, "浏览器未初始化")
@@ -242,66 +408,14 @@ class BrowserAutomation:
         try:
             self.log("提取页面内容")
             
-            # 获取页面HTML
-            html_content = await self.page.content()
-            
-            # 获取页面文本
-            text_content = await self.page.evaluate("() => document.body.innerText")
-            
-            # 获取所有表单元素
-            form_elements = await self.page.evaluate("""
-                () => {
-                    const forms = [];
-                    document.querySelectorAll('form').forEach((form, formIndex) => {
-                        const formData = {
-                            id: form.id || `form_${formIndex}`,
-                            action: form.action,
-                            method: form.method,
-                            elements: []
-                        };
-                        
-                        form.querySelectorAll('input, textarea, select').forEach((element, elementIndex) => {
-                            formData.elements.push({
-                                tag: element.tagName.toLowerCase(),
-                                type: element.type || 'text',
-                                name: element.name || `element_${elementIndex}`,
-                                id: element.id || `element_${elementIndex}`,
-                                placeholder: element.placeholder || '',
-                                value: element.value || '',
-                                required: element.required || false,
-                                label: element.labels && element.labels[0] ? element.labels[0].innerText : ''
-                            });
-                        });
-                        
-                        forms.push(formData);
-                    });
-                    return forms;
-                }
-            """)
-            
-            # 获取所有可点击元素
-            clickable_elements = await self.page.evaluate("""
-                () => {
-                    const elements = [];
-                    document.querySelectorAll('button, a, [onclick], [role="button"]').forEach((element, index) => {
-                        const rect = element.getBoundingClientRect();
-                        if (rect.width > 0 && rect.height > 0) {
-                            elements.push({
-                                tag: element.tagName.toLowerCase(),
-                                text: element.innerText || element.textContent || '',
-                                id: element.id || `clickable_${index}`,
-                                class: element.className || '',
-                                href: element.href || '',
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            });
-                        }
-                    });
-                    return elements;
-                }
-            """)
+            # 一次page.evaluate往返同时获取文本、表单、可点击元素和按需的HTML
+            page_content = await self.page.evaluate(_CALL_EXTRACT_PAGE_JS, include_html)
+            if page_content is None:
+                page_content = await self.page.evaluate(_EXTRACT_PAGE_JS, include_html)
+            html_content = page_content["html"]
+            text_content = page_content["text"]
+            form_elements = page_content["forms"]
+            clickable_elements = page_content["clickables"]
             
             result_data = {
                 "url": self.current_url,
@@ -312,7 +426,7 @@ class BrowserAutomation:
                 "clickable_elements": clickable_elements
             }
             
-            self.log(f"页面内容提取完成，发现 {len(form_elements)} 个表单，{len(clickable_elements)} 个可点击元素")
+            self.log("页面内容提取完成，发现 %d 个表单，%d 个可点击元素", len(form_elements), len(clickable_elements))
             return ActionResult(True, "页面内容提取成功", result_data)
             
         except Exception as e:
@@ -346,10 +460,10 @@ class BrowserAutomation:
             return element
             
         except PlaywrightTimeoutError:
-            self.log(f"元素未找到: {selector}")
+            self.log("元素未找到: %s", selector)
             return None
         except Exception as e:
-            self.log(f"查找元素失败: {str(e)}")
+            self.log("查找元素失败: %s", e)
             return None
     
     async def click_element(self, selector: str, timeout: int = 5000) -> ActionResult:
@@ -367,29 +481,22 @@ class BrowserAutomation:
             return ActionResult(False, "浏览器未初始化")
         
         try:
-            self.log(f"点击元素: {selector}")
-            
-            # 查找并点击元素
-            element = await self.find_element(selector, timeout)
-            if not element:
+            self.log("点击元素: %s", selector)
+            
+            # locator.click会自动等待元素可见、可点击（支持CSS和XPath选择器）；
+            # 取.first避免选择器匹配多个元素时触发严格模式错误
+            try:
+                await self.page.locator(_locator_selector(selector)).first.click(timeout=timeout)
+            except PlaywrightTimeoutError:
+                self.log("元素未找到: %s", selector)
                 return ActionResult(False, f"未找到元素: {selector}")
             
-            await element.click()
+            # 记录操作（操作记录和返回结果共用同一个时间戳）
+            ts = time.time()
+            self.action_history.append(ActionRecord("click", ts, True, (selector,)))
             
-            # 等待页面稳定
-            await asyncio.sleep(0.5)
-            
-            # 记录操作
-            action = {
-                "type": "click",
-                "selector": selector,
-                "timestamp": time.time(),
-                "success": True
-            }
-            self.action_history.append(action)
-            
-            self.log(f"点击成功: {selector}")
-            return ActionResult(True, f"成功点击元素: {selector}")
+            self.log("点击成功: %s", selector)
+            return ActionResult(True, f"成功点击元素: {selector}", timestamp=ts)
             
         except Exception as e:
             error_msg = f"点击失败: {str(e)}"
@@ -413,7 +520,7 @@ class BrowserAutomation:
             return ActionResult(False, "浏览器未初始化")
         
         try:
-            self.log(f"输入文字到 {selector}: {text}")
+            self.log("输入文字到 %s: %s", selector, text)
             
             # 查找元素
             element = await self.find_element(selector, timeout)
@@ -425,18 +532,12 @@ class BrowserAutomation:
                 await element.fill("")
             await element.type(text)
             
-            # 记录操作
-            action = {
-                "type": "type",
-                "selector": selector,
-                "text": text,
-                "timestamp": time.time(),
-                "success": True
-            }
-            self.action_history.append(action)
+            # 记录操作（操作记录和返回结果共用同一个时间戳）
+            ts = time.time()
+            self.action_history.append(ActionRecord("type", ts, True, (selector, text)))
             
-            self.log(f"输入成功: {text}")
-            return ActionResult(True, f"成功输入文字: {text}")
+            self.log("输入成功: %s", text)
+            return ActionResult(True, f"成功输入文字: {text}", timestamp=ts)
             
         except Exception as e:
             error_msg = f"输入失败: {str(e)}"
@@ -458,34 +559,28 @@ class BrowserAutomation:
             return ActionResult(False, "浏览器未初始化")
         
         try:
-            self.log(f"滚动页面: {direction} {pixels}px")
+            self.log("滚动页面: %s %spx", direction, pixels)
             
-            # 执行滚动
+            # 计算滚动偏移
             if direction == "down":
-                await self.page.evaluate(f"window.scrollBy(0, {pixels})")
+                dx, dy = 0, pixels
             elif direction == "up":
-                await self.page.evaluate(f"window.scrollBy(0, -{pixels})")
+                dx, dy = 0, -pixels
             elif direction == "right":
-                await self.page.evaluate(f"window.scrollBy({pixels}, 0)")
+                dx, dy = pixels, 0
             elif direction == "left":
-                await self.page.evaluate(f"window.scrollBy(-{pixels}, 0)")
+                dx, dy = -pixels, 0
             else:
                 return ActionResult(False, f"不支持的滚动方向: {direction}")
             
-            # 等待滚动完成
-            await asyncio.sleep(0.5)
+            # 执行滚动，并在同一次调用中等待下一帧渲染完成，代替固定的0.5秒等待
+            await self.page.evaluate(_SCROLL_JS, [dx, dy])
             
-            # 记录操作
-            action = {
-                "type": "scroll",
-                "direction": direction,
-                "pixels": pixels,
-                "timestamp": time.time(),
-                "success": True
-            }
-            self.action_history.append(action)
+            # 记录操作（操作记录和返回结果共用同一个时间戳）
+            ts = time.time()
+            self.action_history.append(ActionRecord("scroll", ts, True, (direction, pixels)))
             
-            return ActionResult(True, f"页面滚动成功: {direction} {pixels}px")
+            return ActionResult(True, f"页面滚动成功: {direction} {pixels}px", timestamp=ts)
             
         except Exception as e:
             error_msg = f"滚动失败: {str(e)}"
@@ -507,7 +602,7 @@ class BrowserAutomation:
             return ActionResult(False, "浏览器未初始化")
         
         try:
-            self.log(f"等待元素出现: {selector}")
+            self.log("等待元素出现: %s", selector)
             
             element = await self.find_element(selector, timeout)
             if element:
@@ -534,11 +629,13 @@ class BrowserAutomation:
             return ActionResult(False, "浏览器未初始化")
         
         try:
-            element = await self.find_element(selector)
-            if not element:
+            # page.inner_text自动等待元素出现并直接返回文本，无需先取得元素句柄
+            try:
+                text = await self.page.inner_text(_locator_selector(selector), timeout=5000)
+            except PlaywrightTimeoutError:
+                self.log("元素未找到: %s", selector)
                 return ActionResult(False, f"未找到元素: {selector}")
             
-            text = await element.inner_text()
             return ActionResult(True, "获取文本成功", {"text": text})
             
         except Exception as e:
@@ -546,12 +643,14 @@ class BrowserAutomation:
             self.log(error_msg)
             return ActionResult(False, error_msg)
     
-    async def execute_javascript(self, script: str) -> ActionResult:
+    async def execute_javascript(self, script: str, arg: Any = None) -> ActionResult:
         """
         执行JavaScript代码
         
         参数:
             script: JavaScript代码
+            arg: 传给脚本函数的参数（可序列化的值），
+                 选择器、用户输入等数据应通过参数传入而不是拼接进脚本
             
         返回:
             操作结果
@@ -560,9 +659,9 @@ class BrowserAutomation:
             return ActionResult(False, "浏览器未初始化")
         
         try:
-            self.log(f"执行JavaScript: {script[:100]}...")
+            self.log("执行JavaScript: %.100s...", script)
             
-            result = await self.page.evaluate(script)
+            result = await self.page.evaluate(script, arg)
             
             return ActionResult(True, "JavaScript执行成功", {"result": result})
             
@@ -604,21 +703,24 @@ class BrowserAutomation:
         获取操作历史
         
         返回:
-            操作历史列表
+            最近的操作历史列表
         """
-        return self.action_history.copy()
+        return [record.to_dict() for record in self.action_history]
     
     def clear_action_history(self) -> None:
         """清空操作历史"""
-        self.action_history = []
+        self.action_history.clear()
     
-    def log(self, message: str) -> None:
+    def log(self, message: str, *args: Any) -> None:
         """
         记录日志
         
         参数:
-            message: 日志消息
+            message: 日志消息，可包含%格式占位符
+            args: 占位符参数，只有在调试模式下才会格式化
         """
         if self.debug:
+            if args:
+                message = message % args
             timestamp = time.strftime("%H:%M:%S")
             print(f"[BrowserAutomation {timestamp}] {message}")
\ No newline at end of file
@@ -9,10 +9,10 @@ import time
 import uuid
 import json
 import os
-from typing import Dict, List, Optional, Any, Union
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum, auto
-from dataclasses import dataclass, field
-import logging
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -21,7 +21,7 @@ load_dotenv()
 # 导入工具调用系统
 from dual_agent.common.tool_calling import (
     ToolCallHandler, MessageType, register_agent_handler,
-    send_message_to_phone_agent, ToolMessage, COMPUTER_AGENT_TOOLS
+    send_message_to_phone_agent, send_messages_to_phone_agent, ToolMessage, COMPUTER_AGENT_TOOLS
 )
 
 # 尝试导入browser-use
@@ -38,6 +38,44 @@ except ImportError as e:
     print(f"⚠️ browser-use 未安装，将使用fallback模式: {e}")
 
 
+# 中文字段名到网页英文字段名的映射
+_CHINESE_TO_ENGLISH_FIELD = {
+    "姓名": "customer name",
+    "名字": "customer name",
+    "name": "customer name",
+    "电话": "telephone",
+    "手机": "telephone",
+    "手机号": "telephone",
+    "phone": "telephone",
+    "邮箱": "email",
+    "邮件": "email",
+    "email": "email",
+    "地址": "address",
+    "address": "address"
+}
+
+# 基础页面分析中的默认输入字段，内容固定，各次发送共享同一份（只读）
+_BASIC_INPUT_FIELDS = (
+    {"field_name": "姓名", "field_type": "text", "description": "用户姓名", "required": False},
+    {"field_name": "电话", "field_type": "tel", "description": "联系电话", "required": False},
+    {"field_name": "邮箱", "field_type": "email", "description": "电子邮箱", "required": False}
+)
+
+# 表单数据中的元数据键，不作为表单字段填写
+_FORM_META_KEYS = frozenset(('original_user_input', 'from_fast_thinking'))
+
+# 表示关闭浏览器请求的关键词
+_CLOSE_BROWSER_KEYWORDS = ("关闭网页", "关闭浏览器", "关闭页面", "close browser", "close page")
+
+# 基础表单填写任务中的单字段指令模板
+_FILL_INSTRUCTION_TEMPLATE = "- Fill the {} field with: {}"
+
+
+def _format_filled_fields(form_fields: Dict[str, Any]) -> str:
+    """将已填写的字段格式化为"字段: 值"的逗号分隔摘要"""
+    return ', '.join(f"{k}: {v}" for k, v in form_fields.items())
+
+
 class ComputerAgentState(Enum):
     """Computer Agent状态"""
     IDLE = auto()           # 空闲
@@ -53,6 +91,7 @@ class ComputerAgentConfig:
     headless: bool = False
     debug: bool = False
     max_retries: int = 3
+    extraction_cache_size: int = 512  # 表单数据提取结果的LRU缓存条数，0表示不缓存
 
 
 class IntelligentComputerAgent:
@@ -86,6 +125,11 @@ class IntelligentComputerAgent:
         self.tool_handler.register_handler(MessageType.FORM_DATA, self._handle_form_data)
         self.tool_handler.register_handler(MessageType.SYSTEM_STATUS, self._handle_system_status)
         
+        # LLM意图类型到处理方法的映射（处理方法接收意图分析结果），未登记的意图直接回复LLM建议的响应
+        self._intent_handlers = {
+            "navigation": self._handle_navigation_request,
+        }
+        
         # 注册全局处理器
         register_agent_handler("computer_agent", self.tool_handler)
         
@@ -97,11 +141,14 @@ class IntelligentComputerAgent:
         # 用户表单数据缓存
         self.user_form_data = {}
         
+        # LLM表单数据提取结果缓存：规范化文本 -> 提取结果，重复的语句（确认、重试）不再调用LLM
+        self._extraction_cache: "OrderedDict[str, dict]" = OrderedDict()
+        
         # 表单填写状态管理 - 防止重复执行
         self.current_filling_task = None
         self.last_filled_fields = {}
         
-        self.log(f"IntelligentComputerAgent初始化完成")
+        self.log("IntelligentComputerAgent初始化完成")
     
     def _initialize_browser_agent(self):
         """初始化单一browser-use agent"""
@@ -120,7 +167,7 @@ class IntelligentComputerAgent:
             self.log("Browser-Use LLM客户端准备就绪，将在需要时创建单一浏览器实例")
             
         except Exception as e:
-            self.log(f"初始化browser-use失败: {e}")
+            self.log("初始化browser-use失败: %s", e)
             self.browser_agent = None
     
     def _create_single_browser_agent(self, initial_task: str):
@@ -143,13 +190,13 @@ class IntelligentComputerAgent:
                 save_recording_path=None,
             )
             
-            self.log(f"创建单一browser-use agent成功: {initial_task[:50]}...")
+            self.log("创建单一browser-use agent成功: %s...", initial_task[:50])
             
             # 重要：不要让任务执行到completion，保持浏览器活跃
             return self.browser_agent
             
         except Exception as e:
-            self.log(f"创建browser-use agent失败: {e}")
+            self.log("创建browser-use agent失败: %s", e)
             return None
     
     def _create_llm_client(self):
@@ -182,7 +229,7 @@ class IntelligentComputerAgent:
             return None
             
         except Exception as e:
-            self.log(f"创建LLM客户端失败: {e}")
+            self.log("创建LLM客户端失败: %s", e)
             return None
     
     def _create_browser_agent(self, task: str):
@@ -201,21 +248,21 @@ class IntelligentComputerAgent:
                 save_recording_path=None,  # 不保存录制以提高性能
             )
             
-            self.log(f"创建browser-use agent成功: {task[:50]}...")
+            self.log("创建browser-use agent成功: %s...", task[:50])
             return agent
             
         except Exception as e:
-            self.log(f"创建browser-use agent失败: {e}")
+            self.log("创建browser-use agent失败: %s", e)
             # 如果高级配置失败，尝试基础配置
             try:
                 agent = BrowserUseAgent(
                     task=task,
                     llm=self.llm_client
                 )
-                self.log(f"使用基础配置创建browser-use agent成功")
+                self.log("使用基础配置创建browser-use agent成功")
                 return agent
             except Exception as e2:
-                self.log(f"基础配置也失败: {e2}")
+                self.log("基础配置也失败: %s", e2)
                 return None
 
     async def start(self):
@@ -240,7 +287,7 @@ class IntelligentComputerAgent:
             
             # 如果设置了目标URL，自动导航
             if self.target_url:
-                self.log(f"检测到目标URL，开始自动导航: {self.target_url}")
+                self.log("检测到目标URL，开始自动导航: %s", self.target_url)
                 await asyncio.sleep(3)  # 稍等确保Phone Agent已准备好
                 await self._auto_navigate_to_target_url()
             
@@ -248,7 +295,7 @@ class IntelligentComputerAgent:
             self.log("✅ Computer Agent初始化完成，工具调用处理器已在后台运行")
             
         except Exception as e:
-            self.log(f"启动失败: {e}")
+            self.log("启动失败: %s", e)
             self.state = ComputerAgentState.ERROR
     
     async def _auto_navigate_to_target_url(self):
@@ -257,7 +304,7 @@ class IntelligentComputerAgent:
             if not self.target_url:
                 return
             
-            self.log(f"开始导航到目标URL: {self.target_url}")
+            self.log("开始导航到目标URL: %s", self.target_url)
             
             # 使用async_playwright创建持久浏览器会话
             from browser_use.browser.types import async_playwright
@@ -310,7 +357,7 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
             try:
                 # 执行导航和分析任务
                 result = await asyncio.wait_for(self.browser_agent.run(), timeout=90.0)
-                self.log(f"✅ 导航任务执行完成: {result}")
+                self.log("✅ 导航任务执行完成: %s", result)
                 
                 # playwright浏览器会话会自动保持活跃，不需要额外的保持任务
                 
@@ -325,20 +372,21 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
                     
                     # 解析browser-use的分析结果
                     page_info = await self._parse_browser_use_result(str(result))
-                    self.log(f"📊 页面分析结果: {page_info}")
+                    self.log("📊 页面分析结果: %s", page_info)
                     
                     # 构建用户友好的描述
                     description = self._build_page_description(page_info)
-                    self.log(f"📝 构建的页面描述: {description}")
+                    self.log("📝 构建的页面描述: %s", description)
                     
                     # 发送消息给Phone Agent
                     message_text = f"我已经打开了{self.target_url}页面。{description}"
-                    self.log(f"📤 准备发送给Phone Agent的消息: {message_text}")
+                    self.log("📤 准备发送给Phone Agent的消息: %s", message_text)
                     
-                    await self._send_to_phone_agent(
+                    # 页面分析结果和任务完成通知一起发送
+                    await self._send_with_completion(
                         message_text,
-                        message_type="page_analysis",
-                        additional_data={
+                        "page_analysis",
+                        {
                             "url": self.target_url,
                             "page_type": page_info.get('page_type', 'form'),
                             "page_purpose": page_info.get('purpose', '表单填写'),
@@ -347,16 +395,14 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
                             "detected_fields": page_info.get('form_fields', []),
                             "form_analysis": page_info.get('analysis', ''),
                             "task_completed": True  # 重要：标记任务已完成
-                        }
+                        },
+                        "page_navigation", True, "页面导航和分析已完成"
                     )
                     self.log("✅ 页面分析结果已发送给Phone Agent")
-                    
-                    # 发送任务完成通知
-                    await self._notify_task_completion("page_navigation", True, "页面导航和分析已完成")
                 except Exception as send_error:
-                    self.log(f"❌ 发送导航结果失败: {send_error}")
+                    self.log("❌ 发送导航结果失败: %s", send_error)
                     import traceback
-                    self.log(f"错误详情: {traceback.format_exc()}")
+                    self.log("错误详情: %s", traceback.format_exc())
                     
                     # 即使失败也通知任务完成
                     await self._notify_task_completion("page_navigation", False, f"页面分析失败: {send_error}")
@@ -366,14 +412,14 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
                 self.page_ready = True
                 await self._send_basic_page_analysis()
             except Exception as nav_error:
-                self.log(f"导航出错: {nav_error}")
+                self.log("导航出错: %s", nav_error)
                 self.page_ready = True
                 await self._send_basic_page_analysis()
             
         except Exception as e:
-            self.log(f"自动导航失败: {e}")
+            self.log("自动导航失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
+            self.log("错误详情: %s", traceback.format_exc())
             
             # 即使创建失败，也要确保系统继续运行
             self.page_ready = True
@@ -388,7 +434,7 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
                     }
                 )
             except Exception as send_error:
-                self.log(f"发送错误消息也失败: {send_error}")
+                self.log("发送错误消息也失败: %s", send_error)
     
     def _build_page_description(self, page_info: dict) -> str:
         """基于页面信息构建用户友好的描述"""
@@ -398,13 +444,12 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
             analysis = page_info.get('analysis', '')
             
             if page_type == 'form' and form_fields:
-                # 构建表单字段的描述
-                field_descriptions = []
-                for field in form_fields[:5]:  # 只显示前5个字段
-                    field_name = field.get('name', field.get('id', ''))
-                    field_type = field.get('type', '')
-                    if field_name:
-                        field_descriptions.append(f"{field_name}({field_type})")
+                # 构建表单字段的描述（只显示前5个字段）
+                field_descriptions = [
+                    f"{field_name}({field.get('type', '')})"
+                    for field in form_fields[:5]
+                    if (field_name := field.get('name', field.get('id', '')))
+                ]
                 
                 if field_descriptions:
                     description = f"这是一个表单页面，包含以下字段：{', '.join(field_descriptions)}。您可以告诉我需要填写的信息。"
@@ -416,7 +461,7 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
             return description
             
         except Exception as e:
-            self.log(f"构建页面描述失败: {e}")
+            self.log("构建页面描述失败: %s", e)
             return "页面已打开，您可以告诉我需要进行什么操作。"
     
     async def _analyze_current_page(self) -> dict:
@@ -479,11 +524,11 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
                     result_text = result_text.replace('```', '').strip()
                 
                 analysis = json.loads(result_text)
-                self.log(f"页面分析结果: {analysis}")
+                self.log("页面分析结果: %s", analysis)
                 return analysis
                 
             except Exception as llm_error:
-                self.log(f"LLM页面分析失败: {llm_error}")
+                self.log("LLM页面分析失败: %s", llm_error)
                 return {
                     "description": "页面已准备就绪，您可以告诉我需要填写什么信息。",
                     "page_type": "form",
@@ -492,7 +537,7 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
                 }
                 
         except Exception as e:
-            self.log(f"页面分析失败: {e}")
+            self.log("页面分析失败: %s", e)
             return {
                 "description": "页面已准备就绪，您可以告诉我需要填写什么信息。",
                 "page_type": "form", 
@@ -503,7 +548,7 @@ The goal is to analyze the page structure and prepare for subsequent form fillin
     async def _parse_browser_use_result(self, browser_result: str) -> dict:
         """完全使用LLM解析browser-use结果，无任何硬编码"""
         try:
-            self.log(f"使用LLM解析browser-use结果: {browser_result[:200]}...")
+            self.log("使用LLM解析browser-use结果: %s...", browser_result[:200])
             
             # 完全依赖LLM处理browser-use结果，不做任何硬编码判断或预处理
             if not self.llm_client:
@@ -587,7 +632,7 @@ Browser-use完整执行结果:
                     )
                     result_text = response.choices[0].message.content.strip()
                 
-                self.log(f"🤖 LLM分析完成，结果长度: {len(result_text)}")
+                self.log("🤖 LLM分析完成，结果长度: %s", len(result_text))
                 
                 # 解析LLM返回的JSON结果
                 if result_text.startswith('```json'):
@@ -596,7 +641,7 @@ Browser-use完整执行结果:
                     result_text = result_text.replace('```', '').strip()
                 
                 parsed_data = json.loads(result_text)
-                self.log(f"✅ 成功解析LLM结果: {parsed_data.get('business_context', 'unknown')}")
+                self.log("✅ 成功解析LLM结果: %s", parsed_data.get('business_context', 'unknown'))
                 
                 # 检查是否有错误
                 if parsed_data.get("error_detected", False):
@@ -626,18 +671,18 @@ Browser-use完整执行结果:
                 }
                 
             except json.JSONDecodeError as json_error:
-                self.log(f"❌ LLM返回的JSON格式无效: {json_error}")
-                self.log(f"原始LLM回复: {result_text[:500]}...")
+                self.log("❌ LLM返回的JSON格式无效: %s", json_error)
+                self.log("原始LLM回复: %s...", result_text[:500])
                 return await self._get_fallback_page_analysis()
                 
             except Exception as llm_error:
-                self.log(f"❌ LLM解析browser-use结果失败: {llm_error}")
+                self.log("❌ LLM解析browser-use结果失败: %s", llm_error)
                 import traceback
-                self.log(f"错误详情: {traceback.format_exc()}")
+                self.log("错误详情: %s", traceback.format_exc())
                 return await self._get_fallback_page_analysis()
                 
         except Exception as e:
-            self.log(f"解析browser-use结果失败: {e}")
+            self.log("解析browser-use结果失败: %s", e)
             return await self._get_fallback_page_analysis()
     
     async def _send_basic_page_analysis(self):
@@ -652,18 +697,14 @@ Browser-use完整执行结果:
                     "page_purpose": "表单填写",
                     "business_context": "网页表单",
                     "available_actions": ["填写表单信息"],
-                    "input_fields": [
-                        {"field_name": "姓名", "field_type": "text", "description": "用户姓名", "required": False},
-                        {"field_name": "电话", "field_type": "tel", "description": "联系电话", "required": False},
-                        {"field_name": "邮箱", "field_type": "email", "description": "电子邮箱", "required": False}
-                    ],
+                    "input_fields": _BASIC_INPUT_FIELDS,
                     "user_workflow": "请提供您要填写的信息",
                     "interaction_guidance": "您可以说：'我的姓名是张三'、'我的电话是12345'等",
                     "ready_for_user_input": True
                 }
             )
         except Exception as e:
-            self.log(f"发送基础页面分析失败（可能没有Phone Agent）: {e}")
+            self.log("发送基础页面分析失败（可能没有Phone Agent）: %s", e)
     
     async def _get_fallback_page_analysis(self) -> dict:
         """获取备选页面分析数据"""
@@ -713,7 +754,7 @@ Browser-use完整执行结果:
             return page_info
             
         except Exception as e:
-            self.log(f"直接页面分析失败: {e}")
+            self.log("直接页面分析失败: %s", e)
             return {
                 "success": False,
                 "message": f"页面分析遇到问题: {str(e)}",
@@ -748,14 +789,14 @@ Browser-use完整执行结果:
                     try:
                         # 尝试直接使用现有会话进行数据提取
                         analysis_result = await self.browser_agent.controller.extract_structured_data(analysis_query)
-                        self.log(f"使用现有会话提取数据成功: {analysis_result}")
+                        self.log("使用现有会话提取数据成功: %s", analysis_result)
                         
                         # 使用LLM解析browser-use的分析结果并生成结构化信息
                         parsed_result = await self._parse_general_webpage_analysis(str(analysis_result))
                         return parsed_result
                         
                     except Exception as extract_error:
-                        self.log(f"现有会话数据提取失败: {extract_error}")
+                        self.log("现有会话数据提取失败: %s", extract_error)
                         # 降级到基础分析
                         return await self._basic_page_analysis()
                 else:
@@ -763,7 +804,7 @@ Browser-use完整执行结果:
                     return await self._basic_page_analysis()
                 
             except Exception as inner_e:
-                self.log(f"分析失败，使用基础分析: {inner_e}")
+                self.log("分析失败，使用基础分析: %s", inner_e)
                 return await self._basic_page_analysis()
             
         except asyncio.TimeoutError:
@@ -773,7 +814,7 @@ Browser-use完整执行结果:
                 "data": {"url": self.target_url, "error": "analysis_timeout"}
             }
         except Exception as e:
-            self.log(f"通用页面分析失败: {e}")
+            self.log("通用页面分析失败: %s", e)
             return {
                 "success": False,
                 "message": f"页面分析失败: {str(e)}",
@@ -806,7 +847,7 @@ Browser-use完整执行结果:
             return basic_info
             
         except Exception as e:
-            self.log(f"基础页面分析也失败: {e}")
+            self.log("基础页面分析也失败: %s", e)
             return {
                 "success": False,
                 "message": f"页面分析遇到问题: {str(e)}",
@@ -816,7 +857,7 @@ Browser-use完整执行结果:
     async def _parse_general_webpage_analysis(self, browser_result: str):
         """解析browser-use的通用页面分析结果，生成结构化信息供Phone Agent使用"""
         try:
-            self.log(f"开始解析browser-use通用页面分析结果: {browser_result[:200]}...")
+            self.log("开始解析browser-use通用页面分析结果: %s...", browser_result[:200])
             
             if not self.llm_client:
                 # 如果没有LLM，返回基础信息
@@ -933,7 +974,7 @@ Browser-use分析结果:
                     }
                 
             except json.JSONDecodeError:
-                self.log(f"LLM返回非JSON格式: {result_text}")
+                self.log("LLM返回非JSON格式: %s", result_text)
                 return {
                     "success": True,
                     "message": f"已打开页面 {self.target_url}，请告诉我您想要做什么",
@@ -941,7 +982,7 @@ Browser-use分析结果:
                 }
                 
         except Exception as e:
-            self.log(f"解析通用页面分析结果失败: {e}")
+            self.log("解析通用页面分析结果失败: %s", e)
             return {
                 "success": True,
                 "message": f"已打开页面 {self.target_url}，请告诉我您想要做什么",
@@ -957,13 +998,13 @@ Browser-use分析结果:
             user_text = message.content.get("text", "")
             session_id = message.content.get("session_id")
             
-            self.log(f"收到用户输入: {user_text}")
+            self.log("收到用户输入: %s", user_text)
             
             # 使用browser-use处理用户输入
             await self._process_with_browser_use(user_text)
                 
         except Exception as e:
-            self.log(f"处理用户输入失败: {e}")
+            self.log("处理用户输入失败: %s", e)
             await self._send_to_phone_agent(
                 f"处理您的请求时出现错误：{str(e)}",
                 message_type="error"
@@ -976,7 +1017,8 @@ Browser-use分析结果:
             self.state = ComputerAgentState.OPERATING
             
             # 检查是否是关闭网页的请求
-            if any(keyword in user_text.lower() for keyword in ["关闭网页", "关闭浏览器", "关闭页面", "close browser", "close page"]):
+            user_text_lower = user_text.lower()
+            if any(keyword in user_text_lower for keyword in _CLOSE_BROWSER_KEYWORDS):
                 await self._handle_close_browser_request()
                 self.state = ComputerAgentState.IDLE
                 return
@@ -998,7 +1040,7 @@ Browser-use分析结果:
             self.state = ComputerAgentState.IDLE
             
         except Exception as e:
-            self.log(f"处理用户输入失败: {e}")
+            self.log("处理用户输入失败: %s", e)
             await self._fallback_response(user_text)
     
     async def _handle_close_browser_request(self):
@@ -1012,21 +1054,21 @@ Browser-use分析结果:
                     await self.browser_context.close()
                     self.log("✅ 浏览器上下文已关闭")
                 except Exception as e:
-                    self.log(f"关闭浏览器上下文失败: {e}")
+                    self.log("关闭浏览器上下文失败: %s", e)
             
             if hasattr(self, 'browser') and self.browser:
                 try:
                     await self.browser.close()
                     self.log("✅ 浏览器已关闭")
                 except Exception as e:
-                    self.log(f"关闭浏览器失败: {e}")
+                    self.log("关闭浏览器失败: %s", e)
             
             if hasattr(self, 'playwright') and self.playwright:
                 try:
                     await self.playwright.stop()
                     self.log("✅ Playwright已停止")
                 except Exception as e:
-                    self.log(f"停止playwright失败: {e}")
+                    self.log("停止playwright失败: %s", e)
             
             # 清理状态
             self.browser_agent = None
@@ -1043,7 +1085,7 @@ Browser-use分析结果:
             )
                 
         except Exception as e:
-            self.log(f"处理关闭浏览器请求失败: {e}")
+            self.log("处理关闭浏览器请求失败: %s", e)
             # 确保状态清理
             self.browser_agent = None
             self.browser_context = None
@@ -1056,13 +1098,47 @@ Browser-use分析结果:
             )
     
     async def _extract_form_data_from_text(self, user_text: str) -> dict:
-        """从用户文本中提取表单数据 - 严格按照设计文档，完全依赖LLM"""
+        """
+        从用户文本中提取表单数据，相同的语句复用之前的提取结果
+        
+        文本只做空白规范化后作为缓存键：不做模糊匹配，也不去除标点或转换大小写，
+        因为一个字符的差异（电话号码中的一位数字、邮箱中的点）就可能改变提取结果
+        
+        参数:
+            user_text: 用户输入文本
+            
+        返回:
+            提取的表单数据（副本，调用方可以修改）
+        """
+        cache_key = " ".join(user_text.split())
+        cached = self._extraction_cache.get(cache_key)
+        if cached is not None:
+            self._extraction_cache.move_to_end(cache_key)
+            self.log("命中表单数据提取缓存: %s", cached)
+            return dict(cached)
+        
+        form_data, from_llm = await self._extract_form_data_with_llm(user_text)
+        
+        # 只缓存LLM给出的非空结果：LLM暂时不可用时降级到基础提取的结果不缓存，下次仍会重试LLM
+        if from_llm and form_data and self.config.extraction_cache_size > 0:
+            self._extraction_cache[cache_key] = dict(form_data)
+            if len(self._extraction_cache) > self.config.extraction_cache_size:
+                self._extraction_cache.popitem(last=False)
+        return form_data
+    
+    async def _extract_form_data_with_llm(self, user_text: str) -> Tuple[dict, bool]:
+        """
+        从用户文本中提取表单数据 - 严格按照设计文档，完全依赖LLM
+        
+        返回:
+            (提取的表单数据, 是否由LLM提取)，降级到基础提取时第二项为False
+        """
         try:
-            self.log(f"开始LLM驱动的表单数据提取，输入文本: {user_text}")
+            self.log("开始LLM驱动的表单数据提取，输入文本: %s", user_text)
             
             if not self.llm_client:
                 self.log("❌ LLM客户端未初始化，使用基础提取模式")
-                return await self._basic_text_extraction(user_text)
+                return await self._basic_text_extraction(user_text), False
             
             # 设计文档要求：完全依赖LLM的理解能力，不使用任何硬编码
             extraction_prompt = f"""
@@ -1143,11 +1219,11 @@ Browser-use分析结果:
                     )
                     result_text = response.choices[0].message.content.strip()
                 except Exception as openai_error:
-                    self.log(f"直接OpenAI调用失败: {openai_error}")
+                    self.log("直接OpenAI调用失败: %s", openai_error)
                     # 降级到基础提取
-                    return await self._basic_text_extraction(user_text)
+                    return await self._basic_text_extraction(user_text), False
             
-            self.log(f"LLM智能提取结果: {result_text}")
+            self.log("LLM智能提取结果: %s", result_text)
             
             # 解析JSON结果
             try:
@@ -1165,25 +1241,25 @@ Browser-use分析结果:
                     if v and v != "null" and v != "None" and str(v).strip():
                         filtered_data[k] = str(v).strip()
                 
-                self.log(f"LLM提取并过滤后的表单数据: {filtered_data}")
+                self.log("LLM提取并过滤后的表单数据: %s", filtered_data)
                 
                 if filtered_data:
-                    self.log(f"✅ LLM成功提取表单数据: {filtered_data}")
-                    return filtered_data
+                    self.log("✅ LLM成功提取表单数据: %s", filtered_data)
+                    return filtered_data, True
                 else:
                     self.log("⚠️ LLM未提取到有效的表单数据，使用基础提取")
-                    return await self._basic_text_extraction(user_text)
+                    return await self._basic_text_extraction(user_text), False
                 
             except json.JSONDecodeError as json_error:
-                self.log(f"❌ JSON解析失败: {json_error}")
-                self.log(f"原始LLM回复: {result_text}")
-                return await self._basic_text_extraction(user_text)
+                self.log("❌ JSON解析失败: %s", json_error)
+                self.log("原始LLM回复: %s", result_text)
+                return await self._basic_text_extraction(user_text), False
                 
         except Exception as e:
-            self.log(f"❌ LLM驱动的表单数据提取失败: {e}")
+            self.log("❌ LLM驱动的表单数据提取失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
-            return await self._basic_text_extraction(user_text)
+            self.log("错误详情: %s", traceback.format_exc())
+            return await self._basic_text_extraction(user_text), False
     
     async def _basic_text_extraction(self, user_text: str) -> dict:
         """LLM驱动的文本提取（完全移除硬编码模式）"""
@@ -1255,15 +1331,15 @@ Browser-use分析结果:
                     if v and v != "null" and v != "None" and str(v).strip():
                         filtered[k] = str(v).strip()
                 
-                self.log(f"LLM基础提取结果: {filtered}")
+                self.log("LLM基础提取结果: %s", filtered)
                 return filtered
                 
             except Exception as llm_error:
-                self.log(f"LLM基础提取失败: {llm_error}")
+                self.log("LLM基础提取失败: %s", llm_error)
                 return {}
                 
         except Exception as e:
-            self.log(f"基础文本提取失败: {e}")
+            self.log("基础文本提取失败: %s", e)
             return {}
     
     async def _fill_form_with_extracted_data(self, form_data: dict):
@@ -1273,79 +1349,76 @@ Browser-use分析结果:
                 await self._send_to_phone_agent("没有找到有效的表单数据", message_type="error")
                 return
             
-            self.log(f"准备填写表单数据: {form_data}")
+            self.log("准备填写表单数据: %s", form_data)
             
             # 从form_data中提取实际的表单字段（过滤掉元数据）
-            actual_form_fields = {}
-            for key, value in form_data.items():
-                if key not in ['original_user_input', 'from_fast_thinking'] and value:
-                    actual_form_fields[key] = value
+            actual_form_fields = {
+                key: value for key, value in form_data.items()
+                if key not in _FORM_META_KEYS and value
+            }
+            original_input = form_data.get('original_user_input', '')
             
             # 如果没有实际字段，强制从original_user_input中提取
-            if not actual_form_fields:
-                original_input = form_data.get('original_user_input', '')
-                if original_input:
-                    self.log(f"🔍 强制从原始输入提取表单数据: {original_input}")
-                    # 使用LLM从原始输入中提取表单数据
-                    extracted_fields = await self._extract_form_data_from_text(original_input)
-                    actual_form_fields.update(extracted_fields)
-                    self.log(f"🔍 LLM提取结果: {extracted_fields}")
-            
-            # 如果仍然没有字段，使用基础正则提取作为最后手段
-            if not actual_form_fields:
-                original_input = form_data.get('original_user_input', '')
-                if original_input:
-                    self.log(f"🔍 使用基础正则提取作为最后手段")
+            if not actual_form_fields and original_input:
+                self.log("🔍 强制从原始输入提取表单数据: %s", original_input)
+                # 使用LLM从原始输入中提取表单数据
+                extracted_fields = await self._extract_form_data_from_text(original_input)
+                actual_form_fields.update(extracted_fields)
+                self.log("🔍 LLM提取结果: %s", extracted_fields)
+                
+                # 如果仍然没有字段，使用基础正则提取作为最后手段
+                if not actual_form_fields:
+                    self.log("🔍 使用基础正则提取作为最后手段")
                     basic_fields = await self._basic_text_extraction(original_input)
                     actual_form_fields.update(basic_fields)
-                    self.log(f"🔍 基础提取结果: {basic_fields}")
+                    self.log("🔍 基础提取结果: %s", basic_fields)
             
-            if actual_form_fields:
-                self.log(f"🚀 开始实际的browser-use表单填写: {actual_form_fields}")
-                
-                # 立即发送开始处理的通知
-                filled_info = [f"{k}: {v}" for k, v in actual_form_fields.items()]
-                start_message = f"正在填写表单信息: {', '.join(filled_info)}..."
-                await self._send_to_phone_agent(
-                    start_message,
-                    message_type="task_result",
-                    additional_data={"status": "filling_started", "filled_fields": actual_form_fields}
-                )
-                
-                # 启动异步表单填写任务，不等待完成
-                asyncio.create_task(self._execute_form_filling_async(actual_form_fields))
-                
-            else:
+            if not actual_form_fields:
                 # 如果确实没有提取到字段，给用户反馈
-                original_input = form_data.get('original_user_input', '')
                 if original_input:
                     request_message = f"我已收到您说的：'{original_input}'。请提供更具体的表单信息，如姓名、邮箱、电话等。"
-                    self.log(f"📤 立即请求Phone Agent提供更多信息: {request_message}")
-                    await self._send_to_phone_agent(
-                        request_message,
-                        message_type="task_result"
-                    )
                 else:
-                    general_request = "请提供需要填写的具体信息，如姓名、邮箱、电话号码等。"
-                    self.log(f"📤 立即请求Phone Agent提供信息: {general_request}")
-                    await self._send_to_phone_agent(
-                        general_request,
-                        message_type="task_result"
-                    )
-                
+                    request_message = "请提供需要填写的具体信息，如姓名、邮箱、电话号码等。"
+                self.log("📤 立即请求Phone Agent提供更多信息: %s", request_message)
                 # 即使没有提取到字段也要发送任务完成通知让Phone Agent恢复录音
-                await self._notify_task_completion("form_filling", False, "未能提取到有效的表单数据")
+                await self._send_with_completion(
+                    request_message,
+                    "task_result",
+                    None,
+                    "form_filling", False, "未能提取到有效的表单数据"
+                )
+                return
+            
+            self.log("🚀 开始实际的browser-use表单填写: %s", actual_form_fields)
+            
+            # 立即发送开始处理的通知
+            filled_info = _format_filled_fields(actual_form_fields)
+            start_message = f"正在填写表单信息: {filled_info}..."
+            await self._send_to_phone_agent(
+                start_message,
+                message_type="task_result",
+                additional_data={"status": "filling_started", "filled_fields": actual_form_fields}
+            )
+            
+            # 启动异步表单填写任务，不等待完成
+            asyncio.create_task(self._execute_form_filling_async(actual_form_fields))
             
         except Exception as e:
-            self.log(f"处理表单数据失败: {e}")
-            await self._send_to_phone_agent(f"处理您的信息时遇到问题: {str(e)}", message_type="error")
+            self.log("处理表单数据失败: %s", e)
             # 异常情况也要发送任务完成通知让Phone Agent恢复录音
-            await self._notify_task_completion("form_filling", False, f"表单填写出现异常: {str(e)}")
+            await self._send_with_completion(
+                f"处理您的信息时遇到问题: {str(e)}",
+                "error",
+                None,
+                "form_filling", False, f"表单填写出现异常: {str(e)}"
+            )
     
     async def _execute_form_filling_async(self, form_fields: dict):
         """异步执行表单填写，避免阻塞主线程"""
+        # 已填写字段的摘要在各分支的消息中共用，只拼接一次
+        filled_info = _format_filled_fields(form_fields)
         try:
-            self.log(f"🔄 异步执行表单填写: {form_fields}")
+            self.log("🔄 异步执行表单填写: %s", form_fields)
             
             # 执行实际的表单填写，设置较短的超时时间
             try:
@@ -1354,64 +1427,56 @@ Browser-use分析结果:
                     timeout=30.0  # 减少超时时间到30秒
                 )
                 
-                filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
-                
                 if success:
-                    success_message = f"✅ 已成功在网页中填写: {', '.join(filled_info)}。"
-                    self.log(f"📤 通知Phone Agent填写成功: {success_message}")
-                    await self._send_to_phone_agent(
+                    success_message = f"✅ 已成功在网页中填写: {filled_info}。"
+                    self.log("📤 通知Phone Agent填写成功: %s", success_message)
+                    # 发送结果并附带任务完成通知让Phone Agent恢复录音
+                    await self._send_with_completion(
                         success_message,
-                        message_type="task_result",
-                        additional_data={"filled_fields": form_fields, "status": "browser_filled"}
+                        "task_result",
+                        {"filled_fields": form_fields, "status": "browser_filled"},
+                        "form_filling", True, f"表单填写已完成: {filled_info}"
                     )
-                    
-                    # 发送任务完成通知让Phone Agent恢复录音
-                    await self._notify_task_completion("form_filling", True, f"表单填写已完成: {', '.join(filled_info)}")
                 else:
                     # 填写失败但至少记录信息
-                    fallback_message = f"⚠️ 网页填写遇到技术问题，但已记录您的信息: {', '.join(filled_info)}。"
-                    self.log(f"📤 通知Phone Agent填写问题: {fallback_message}")
-                    await self._send_to_phone_agent(
+                    fallback_message = f"⚠️ 网页填写遇到技术问题，但已记录您的信息: {filled_info}。"
+                    self.log("📤 通知Phone Agent填写问题: %s", fallback_message)
+                    # 即使填写失败也发送任务完成通知让Phone Agent恢复录音
+                    await self._send_with_completion(
                         fallback_message,
-                        message_type="task_result",
-                        additional_data={"filled_fields": form_fields, "status": "recorded_fallback"}
+                        "task_result",
+                        {"filled_fields": form_fields, "status": "recorded_fallback"},
+                        "form_filling", False, f"表单填写遇到问题: {filled_info}"
                     )
                     
-                    # 即使填写失败也发送任务完成通知让Phone Agent恢复录音
-                    await self._notify_task_completion("form_filling", False, f"表单填写遇到问题: {', '.join(filled_info)}")
-                    
             except asyncio.TimeoutError:
                 # 超时处理
-                filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
-                timeout_message = f"⚠️ 表单填写超时，但已记录您的信息: {', '.join(filled_info)}。"
-                self.log(f"📤 通知Phone Agent填写超时: {timeout_message}")
-                await self._send_to_phone_agent(
+                timeout_message = f"⚠️ 表单填写超时，但已记录您的信息: {filled_info}。"
+                self.log("📤 通知Phone Agent填写超时: %s", timeout_message)
+                # 超时也要发送任务完成通知让Phone Agent恢复录音
+                await self._send_with_completion(
                     timeout_message,
-                    message_type="task_result",
-                    additional_data={"filled_fields": form_fields, "status": "timeout"}
+                    "task_result",
+                    {"filled_fields": form_fields, "status": "timeout"},
+                    "form_filling", False, f"表单填写超时: {filled_info}"
                 )
                 
-                # 超时也要发送任务完成通知让Phone Agent恢复录音
-                await self._notify_task_completion("form_filling", False, f"表单填写超时: {', '.join(filled_info)}")
-                
         except Exception as e:
-            self.log(f"异步表单填写失败: {e}")
+            self.log("异步表单填写失败: %s", e)
             # 发生异常也要通知Phone Agent恢复录音
-            filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
-            error_message = f"❌ 表单填写遇到错误，但已记录您的信息: {', '.join(filled_info)}。"
-            await self._send_to_phone_agent(
+            error_message = f"❌ 表单填写遇到错误，但已记录您的信息: {filled_info}。"
+            # 异常情况也要发送任务完成通知让Phone Agent恢复录音
+            await self._send_with_completion(
                 error_message,
-                message_type="task_result",
-                additional_data={"filled_fields": form_fields, "status": "error"}
+                "task_result",
+                {"filled_fields": form_fields, "status": "error"},
+                "form_filling", False, f"表单填写异常: {str(e)}"
             )
-            
-            # 异常情况也要发送任务完成通知让Phone Agent恢复录音
-            await self._notify_task_completion("form_filling", False, f"表单填写异常: {str(e)}")
 
     async def _execute_actual_form_filling(self, form_fields: dict) -> bool:
         """使用现有的浏览器会话执行表单填写"""
         try:
-            self.log(f"🚀 请求表单填写: {form_fields}")
+            self.log("🚀 请求表单填写: %s", form_fields)
             
             # 确保我们有实际的用户数据
             if not form_fields:
@@ -1420,7 +1485,7 @@ Browser-use分析结果:
             
             # 检查是否与上次填写的字段重复
             if form_fields == self.last_filled_fields:
-                self.log(f"⚠️ 检测到重复的表单填写请求，跳过: {form_fields}")
+                self.log("⚠️ 检测到重复的表单填写请求，跳过: %s", form_fields)
                 await self._send_to_phone_agent(
                     f"已经填写过相同的信息了。如需修改，请告诉我新的信息。",
                     message_type="task_result"
@@ -1437,15 +1502,15 @@ Browser-use分析结果:
             return await self._fill_form_with_existing_session(form_fields)
             
         except Exception as e:
-            self.log(f"❌ 表单填写失败: {e}")
+            self.log("❌ 表单填写失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
+            self.log("错误详情: %s", traceback.format_exc())
             return False
     
     async def _fill_form_with_existing_session(self, form_fields: dict) -> bool:
         """使用现有的持久playwright浏览器会话执行表单填写"""
         try:
-            self.log(f"使用现有playwright浏览器会话填写表单: {form_fields}")
+            self.log("使用现有playwright浏览器会话填写表单: %s", form_fields)
             
             if not hasattr(self, 'browser_context') or not self.browser_context:
                 self.log("没有可用的playwright会话，创建新的")
@@ -1473,11 +1538,11 @@ Browser-use分析结果:
                 )
                 
                 self.log("开始使用现有playwright会话填写表单...")
-                self.log(f"🔍 调试信息 - 浏览器上下文: {self.browser_context}")
-                self.log(f"🔍 调试信息 - 当前页面: {self.current_page}")
+                self.log("🔍 调试信息 - 浏览器上下文: %s", self.browser_context)
+                self.log("🔍 调试信息 - 当前页面: %s", self.current_page)
                 
                 result = await asyncio.wait_for(fill_agent.run(), timeout=120.0)
-                self.log(f"表单填写完成: {result}")
+                self.log("表单填写完成: %s", result)
                 
                 # 更新last_filled_fields
                 self.last_filled_fields = form_fields.copy()
@@ -1489,15 +1554,15 @@ Browser-use分析结果:
                 return False
                 
         except Exception as e:
-            self.log(f"使用现有playwright会话填写表单失败: {e}")
+            self.log("使用现有playwright会话填写表单失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
+            self.log("错误详情: %s", traceback.format_exc())
             return False
     
     async def _create_new_form_filling_session(self, form_fields: dict) -> bool:
         """创建新的playwright表单填写会话（当没有持久会话时）"""
         try:
-            self.log(f"创建新的playwright表单填写会话: {form_fields}")
+            self.log("创建新的playwright表单填写会话: %s", form_fields)
             
             # 如果还没有playwright会话，创建一个
             if not hasattr(self, 'browser_context') or not self.browser_context:
@@ -1544,7 +1609,7 @@ Browser-use分析结果:
             
             self.log("开始新的playwright表单填写会话...")
             result = await asyncio.wait_for(fill_agent.run(), timeout=120.0)
-            self.log(f"新playwright会话表单填写完成: {result}")
+            self.log("新playwright会话表单填写完成: %s", result)
             
             # 更新last_filled_fields
             self.last_filled_fields = form_fields.copy()
@@ -1555,22 +1620,22 @@ Browser-use分析结果:
             self.log("新playwright会话表单填写超时")
             return False
         except Exception as e:
-            self.log(f"创建新playwright填写会话失败: {e}")
+            self.log("创建新playwright填写会话失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
+            self.log("错误详情: %s", traceback.format_exc())
             return False
     
     async def _do_form_filling(self, form_fields: dict) -> bool:
         """实际执行表单填写的内部方法"""
         try:
-            self.log(f"🚀 开始执行表单填写: {form_fields}")
+            self.log("🚀 开始执行表单填写: %s", form_fields)
             
             # 使用LLM智能优化表单填写任务，但不自动关闭浏览器
             optimized_task = await self._create_persistent_form_filling_task(form_fields)
             
-            self.log(f"创建持久表单填写任务: {optimized_task[:200]}...")
+            self.log("创建持久表单填写任务: %s...", optimized_task[:200])
             
-            print(f"🔍 开始表单填写（持久浏览器会话），使用用户数据: {form_fields}")
+            self.log("🔍 开始表单填写（持久浏览器会话），使用用户数据: %s", form_fields)
             
             # 创建专门的表单填写agent - 不使用keep_alive，用特殊的任务设计
             try:
@@ -1600,25 +1665,24 @@ This approach allows the form to be filled while keeping the browser session ava
                 # 启动填写任务但不等待完全结束
                 self.log("启动表单填写任务...")
                 result = await asyncio.wait_for(fill_agent.run(), timeout=120.0)
-                self.log(f"✅ Browser-use表单填写完成: {result}")
+                self.log("✅ Browser-use表单填写完成: %s", result)
                 
                 # 更新为当前活跃的浏览器agent
                 self.browser_agent = fill_agent
                 self.last_filled_fields = form_fields.copy()
                 
                 # 立即向Phone Agent发送成功消息
-                filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
-                success_message = f"✅ 已成功填写: {', '.join(filled_info)}。网页保持打开状态，您可以继续填写其他信息或说'关闭网页'。"
-                self.log(f"📤 立即发送成功消息给Phone Agent: {success_message}")
-                await self._send_to_phone_agent(
+                filled_info = _format_filled_fields(form_fields)
+                success_message = f"✅ 已成功填写: {filled_info}。网页保持打开状态，您可以继续填写其他信息或说'关闭网页'。"
+                self.log("📤 立即发送成功消息给Phone Agent: %s", success_message)
+                # 成功消息和表单填写任务完成通知一起发送
+                await self._send_with_completion(
                     success_message,
-                    message_type="task_result",
-                    additional_data={"filled_fields": form_fields, "status": "success", "browser_active": True, "task_completed": True}
+                    "task_result",
+                    {"filled_fields": form_fields, "status": "success", "browser_active": True, "task_completed": True},
+                    "form_filling", True, f"表单填写已完成: {filled_info}"
                 )
                 
-                # 发送表单填写任务完成通知
-                await self._notify_task_completion("form_filling", True, f"表单填写已完成: {', '.join(filled_info)}")
-                
                 # 检查结果是否表明成功
                 result_str = str(result).lower()
                 success_indicators = ["filled", "completed", "entered", "success", "screenshot"]
@@ -1636,9 +1700,9 @@ This approach allows the form to be filled while keeping the browser session ava
                 return False
                 
         except Exception as e:
-            self.log(f"❌ 表单填写失败: {e}")
+            self.log("❌ 表单填写失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
+            self.log("错误详情: %s", traceback.format_exc())
             return False
     
     async def _create_persistent_form_filling_task(self, form_fields: dict) -> str:
@@ -1706,28 +1770,42 @@ Please return the complete task instruction in English, suitable for browser-use
                     )
                     optimized_task = response.choices[0].message.content.strip()
                 
-                self.log(f"LLM持久任务优化完成: {optimized_task[:100]}...")
+                self.log("LLM持久任务优化完成: %s...", optimized_task[:100])
                 return optimized_task
                 
             except Exception as llm_error:
-                self.log(f"LLM任务优化失败，使用基础任务: {llm_error}")
+                self.log("LLM任务优化失败，使用基础任务: %s", llm_error)
                 return self._create_basic_persistent_form_filling_task(form_fields)
                 
         except Exception as e:
-            self.log(f"创建持久表单任务失败: {e}")
+            self.log("创建持久表单任务失败: %s", e)
             return self._create_basic_persistent_form_filling_task(form_fields)
     
+    @staticmethod
+    def _build_fill_instructions(form_fields: dict) -> List[str]:
+        """
+        生成基础表单填写任务中的逐字段指令行
+        
+        参数:
+            form_fields: 字段名到值的映射，空值会被跳过
+            
+        返回:
+            形如"- Fill the xxx field with: yyy"的指令行列表
+        """
+        return [
+            _FILL_INSTRUCTION_TEMPLATE.format(field_name, value)
+            for field_name, value in form_fields.items()
+            if value
+        ]
+    
     def _create_basic_persistent_form_filling_task(self, form_fields: dict) -> str:
         """创建基础持久表单填写任务（备选方案）"""
-        instructions = []
-        for field_name, value in form_fields.items():
-            if value:
-                instructions.append(f"Fill the {field_name} field with: {value}")
+        instructions = self._build_fill_instructions(form_fields)
         
         return f"""
 Navigate to {self.target_url} and fill ONLY the user-provided form fields:
 
-{chr(10).join(f"- {instruction}" for instruction in instructions)}
+{chr(10).join(instructions)}
 
 CRITICAL REQUIREMENTS:
 1. Navigate to the page first if not already there
@@ -1813,28 +1891,25 @@ Please return the complete task instruction in English, suitable for browser-use
                     )
                     optimized_task = response.choices[0].message.content.strip()
                 
-                self.log(f"LLM智能任务优化完成: {optimized_task[:100]}...")
+                self.log("LLM智能任务优化完成: %s...", optimized_task[:100])
                 return optimized_task
                 
             except Exception as llm_error:
-                self.log(f"LLM任务优化失败，使用基础任务: {llm_error}")
+                self.log("LLM任务优化失败，使用基础任务: %s", llm_error)
                 return self._create_basic_form_filling_task(form_fields)
                 
         except Exception as e:
-            self.log(f"创建智能表单任务失败: {e}")
+            self.log("创建智能表单任务失败: %s", e)
             return self._create_basic_form_filling_task(form_fields)
     
     def _create_basic_form_filling_task(self, form_fields: dict) -> str:
         """创建基础表单填写任务（备选方案）"""
-        instructions = []
-        for field_name, value in form_fields.items():
-            if value:
-                instructions.append(f"Fill the {field_name} field with: {value}")
+        instructions = self._build_fill_instructions(form_fields)
         
         return f"""
 Navigate to {self.target_url} and fill ONLY the user-provided form fields:
 
-{chr(10).join(f"- {instruction}" for instruction in instructions)}
+{chr(10).join(instructions)}
 
 CRITICAL REQUIREMENTS:
 1. Navigate to the page first if not already there
@@ -1852,93 +1927,77 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
     
     async def _execute_browser_form_filling(self, form_fields: dict):
         """使用现有browser-use session执行表单填写"""
+        # 已填写字段的摘要在各分支的消息中共用，只拼接一次
+        filled_info = _format_filled_fields(form_fields)
         try:
-            self.log(f"使用现有browser session填写表单: {form_fields}")
+            self.log("使用现有browser session填写表单: %s", form_fields)
             
             # 直接调用强制填写方法，而不是创建新的复杂逻辑
             success = await self._execute_actual_form_filling(form_fields)
             
             if success:
                 # 通知用户填写成功
-                filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
                 await self._send_to_phone_agent(
-                    f"✅ 已成功在网页中填写: {', '.join(filled_info)}。请继续提供其他信息或说'提交表单'。",
+                    f"✅ 已成功在网页中填写: {filled_info}。请继续提供其他信息或说'提交表单'。",
                     message_type="task_result",
                     additional_data={"filled_fields": form_fields, "status": "browser_filled"}
                 )
             else:
                 # 填写失败，记录信息
-                filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
                 await self._send_to_phone_agent(
-                    f"⚠️ 网页填写遇到技术问题，但已记录您的信息: {', '.join(filled_info)}。",
+                    f"⚠️ 网页填写遇到技术问题，但已记录您的信息: {filled_info}。",
                     message_type="task_result",
                     additional_data={"filled_fields": form_fields, "status": "timeout_recorded"}
                 )
                 
         except Exception as e:
-            self.log(f"Browser-use填写出错: {e}")
+            self.log("Browser-use填写出错: %s", e)
             # 降级：记录用户信息
-            filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
             await self._send_to_phone_agent(
-                f"⚠️ 网页填写遇到技术问题，但已记录您的信息: {', '.join(filled_info)}。",
+                f"⚠️ 网页填写遇到技术问题，但已记录您的信息: {filled_info}。",
                 message_type="task_result",
                 additional_data={"filled_fields": form_fields, "status": "error_recorded"}
             )
     
     async def _create_and_execute_form_filling(self, form_fields: dict):
         """创建新的browser-use agent执行表单填写"""
+        # 已填写字段的摘要在各分支的消息中共用，只拼接一次
+        filled_info = _format_filled_fields(form_fields)
         try:
-            self.log(f"创建新的browser agent填写表单: {form_fields}")
+            self.log("创建新的browser agent填写表单: %s", form_fields)
             
             # 直接调用强制填写方法
             success = await self._execute_actual_form_filling(form_fields)
             
             if success:
-                filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
                 await self._send_to_phone_agent(
-                    f"✅ 已成功在网页中填写: {', '.join(filled_info)}。",
+                    f"✅ 已成功在网页中填写: {filled_info}。",
                     message_type="task_result",
                     additional_data={"filled_fields": form_fields, "status": "new_agent_filled"}
                 )
             else:
-                filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
                 await self._send_to_phone_agent(
-                    f"⚠️ 填写超时，但已记录信息: {', '.join(filled_info)}。",
+                    f"⚠️ 填写超时，但已记录信息: {filled_info}。",
                     message_type="task_result",
                     additional_data={"filled_fields": form_fields, "status": "timeout"}
                 )
                 
         except Exception as e:
-            self.log(f"创建填写代理失败: {e}")
-            filled_info = [f"{k}: {v}" for k, v in form_fields.items()]
+            self.log("创建填写代理失败: %s", e)
             await self._send_to_phone_agent(
-                f"⚠️ 填写遇到问题，已记录信息: {', '.join(filled_info)}。",
+                f"⚠️ 填写遇到问题，已记录信息: {filled_info}。",
                 message_type="task_result",
                 additional_data={"filled_fields": form_fields, "status": "creation_error"}
             )
     
     def _map_chinese_to_english_field(self, chinese_field: str) -> str:
         """将中文字段名映射到英文字段名"""
-        mapping = {
-            "姓名": "customer name",
-            "名字": "customer name", 
-            "name": "customer name",
-            "电话": "telephone",
-            "手机": "telephone",
-            "手机号": "telephone", 
-            "phone": "telephone",
-            "邮箱": "email",
-            "邮件": "email",
-            "email": "email",
-            "地址": "address",
-            "address": "address"
-        }
-        return mapping.get(chinese_field.lower(), chinese_field)
+        return _CHINESE_TO_ENGLISH_FIELD.get(chinese_field.lower(), chinese_field)
     
     async def _handle_general_browser_request(self, user_text: str):
         """处理非表单数据的一般请求 - 按设计文档使用LLM智能分析"""
         try:
-            self.log(f"LLM智能分析一般浏览器请求: {user_text}")
+            self.log("LLM智能分析一般浏览器请求: %s", user_text)
             
             # 使用LLM分析用户意图，严格按照设计文档要求
             if not self.llm_client:
@@ -1997,20 +2056,20 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
                 intent_type = intent_analysis.get("intent_type", "other")
                 suggested_response = intent_analysis.get("suggested_response", "我正在分析您的请求，请稍等")
                 
-                self.log(f"LLM意图分析结果: {intent_analysis}")
-                self.log(f"意图类型: {intent_type}")
+                self.log("LLM意图分析结果: %s", intent_analysis)
+                self.log("意图类型: %s", intent_type)
                 
                 # 根据意图类型执行实际操作
-                if intent_type == "navigation":
-                    # 这是导航请求，执行实际的浏览器操作
-                    await self._handle_navigation_request(user_text, intent_analysis)
+                intent_handler = self._intent_handlers.get(intent_type)
+                if intent_handler is not None:
+                    await intent_handler(intent_analysis)
                 else:
                     # 其他类型的请求，发送分析结果
-                    self.log(f"发送给Phone Agent的响应: {suggested_response}")
+                    self.log("发送给Phone Agent的响应: %s", suggested_response)
                     await self._send_to_phone_agent(suggested_response, message_type="task_result")
                 
             except Exception as llm_error:
-                self.log(f"LLM意图分析失败: {llm_error}")
+                self.log("LLM意图分析失败: %s", llm_error)
                 # 如果LLM分析失败，给出通用回复
                 await self._send_to_phone_agent(
                     "我已收到您的指令，正在处理中。如需填写表单，请提供具体信息如姓名、邮箱等。",
@@ -2018,7 +2077,7 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
                 )
             
         except Exception as e:
-            self.log(f"处理一般请求失败: {e}")
+            self.log("处理一般请求失败: %s", e)
             await self._send_to_phone_agent("处理请求时出现错误", message_type="error")
     
     async def _analyze_user_intent_with_llm(self, user_text: str) -> dict:
@@ -2089,14 +2148,14 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
             import json
             try:
                 intent_result = json.loads(result_text)
-                self.log(f"LLM意图分析: {intent_result}")
+                self.log("LLM意图分析: %s", intent_result)
                 return intent_result
             except json.JSONDecodeError:
-                self.log(f"LLM返回非JSON格式，使用默认分析")
+                self.log("LLM返回非JSON格式，使用默认分析")
                 return {"type": "general", "data": {}}
                 
         except Exception as e:
-            self.log(f"LLM意图分析失败: {e}")
+            self.log("LLM意图分析失败: %s", e)
             return {"type": "general", "data": {}}
     
     async def _handle_navigation_request(self, intent: dict):
@@ -2115,14 +2174,14 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
                 await self._send_to_phone_agent("无法创建浏览器代理", message_type="error")
                 return
             
-            self.log(f"开始导航到: {url}")
+            self.log("开始导航到: %s", url)
             result = await agent.run()
             
             # 导航完成后，分析页面表单并通知Phone Agent
             await self._analyze_page_and_notify_phone_agent(url)
             
         except Exception as e:
-            self.log(f"导航处理失败: {e}")
+            self.log("导航处理失败: %s", e)
             await self._send_to_phone_agent(f"导航失败: {str(e)}", message_type="error")
     
     async def _analyze_page_and_notify_phone_agent(self, url: str):
@@ -2164,7 +2223,7 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
             )
             
         except Exception as e:
-            self.log(f"页面分析失败: {e}")
+            self.log("页面分析失败: %s", e)
             await self._send_to_phone_agent(
                 f"页面已打开: {url}，但分析表单时出现问题",
                 message_type="page_analysis",
@@ -2215,7 +2274,7 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
                 await self._send_to_phone_agent("无法创建表单填写代理", message_type="error")
                 return
             
-            self.log(f"开始精确填写表单字段: {form_fields}")
+            self.log("开始精确填写表单字段: %s", form_fields)
             result = await agent.run()
             
             # 通知Phone Agent填写结果
@@ -2230,7 +2289,7 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
             )
             
         except Exception as e:
-            self.log(f"表单填写失败: {e}")
+            self.log("表单填写失败: %s", e)
             await self._send_to_phone_agent(f"表单填写失败: {str(e)}", message_type="error")
     
     async def _handle_general_request(self, user_text: str):
@@ -2244,7 +2303,7 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
                 await self._fallback_response(user_text)
                 return
             
-            self.log(f"执行通用任务: {optimized_task}")
+            self.log("执行通用任务: %s", optimized_task)
             result = await agent.run()
             
             await self._send_to_phone_agent(
@@ -2258,7 +2317,7 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
             )
             
         except Exception as e:
-            self.log(f"通用请求处理失败: {e}")
+            self.log("通用请求处理失败: %s", e)
             await self._fallback_response(user_text)
     
     async def _optimize_task_with_llm(self, user_text: str) -> str:
@@ -2314,17 +2373,17 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
                     optimized_task = optimized_task['content']
                 optimized_task = str(optimized_task).strip()
             
-            self.log(f"LLM任务优化: '{user_text}' -> '{optimized_task}'")
+            self.log("LLM任务优化: '%s' -> '%s'", user_text, optimized_task)
             return optimized_task
             
         except Exception as e:
-            self.log(f"LLM任务优化失败，使用原始文本: {e}")
+            self.log("LLM任务优化失败，使用原始文本: %s", e)
             return user_text
     
     async def _fallback_response(self, user_text: str):
         """备选响应"""
         try:
-            self.log(f"使用备选响应: {user_text}")
+            self.log("使用备选响应: %s", user_text)
             
             await self._send_to_phone_agent(
                 "我已收到您的指令，正在处理中",
@@ -2338,7 +2397,7 @@ IMPORTANT: Only fill the {len(instructions)} fields listed above. Do not fill an
             self.state = ComputerAgentState.IDLE
             
         except Exception as e:
-            self.log(f"备选响应失败: {e}")
+            self.log("备选响应失败: %s", e)
     
     async def _analyze_page_content(self):
         """
@@ -2382,7 +2441,7 @@ Do NOT fill any forms or input any data. Only analyze and report the structure.
                 timeout=25.0
             )
             
-            self.log(f"Browser-use页面分析结果: {analysis_result}")
+            self.log("Browser-use页面分析结果: %s", analysis_result)
             
             # 使用LLM解析browser-use的分析结果
             parsed_result = await self._parse_analysis_result(analysis_result)
@@ -2396,7 +2455,7 @@ Do NOT fill any forms or input any data. Only analyze and report the structure.
                 "data": {"url": self.target_url, "error": "analysis_timeout"}
             }
         except Exception as e:
-            self.log(f"页面分析失败: {e}")
+            self.log("页面分析失败: %s", e)
             return {
                 "success": False,
                 "message": f"页面分析失败: {str(e)}",
@@ -2408,7 +2467,7 @@ Do NOT fill any forms or input any data. Only analyze and report the structure.
         使用LLM解析browser-use的分析结果，提取结构化的表单信息
         """
         try:
-            self.log(f"开始解析browser-use结果: {browser_result[:200]}...")
+            self.log("开始解析browser-use结果: %s...", browser_result[:200])
             
             # 首先进行基础错误检测（不依赖LLM的快速检测）
             basic_error_check = self._basic_error_detection(browser_result)
@@ -2525,7 +2584,7 @@ Browser-use分析结果:
                     }
                 
             except json.JSONDecodeError:
-                self.log(f"LLM返回非JSON格式: {result_text}")
+                self.log("LLM返回非JSON格式: %s", result_text)
                 return {
                     "success": True,
                     "message": f"已打开页面 {self.target_url}，但无法解析表单结构",
@@ -2533,7 +2592,7 @@ Browser-use分析结果:
                 }
                 
         except Exception as e:
-            self.log(f"解析分析结果失败: {e}")
+            self.log("解析分析结果失败: %s", e)
             return {
                 "success": True,
                 "message": f"已打开页面 {self.target_url}，但表单分析遇到技术问题",
@@ -2643,7 +2702,7 @@ Browser-use分析结果:
                     }
                 
             except json.JSONDecodeError:
-                self.log(f"LLM页面分析返回非JSON格式: {result_text}")
+                self.log("LLM页面分析返回非JSON格式: %s", result_text)
                 # JSON解析失败时的降级处理
                 return {
                     "success": True,
@@ -2656,7 +2715,7 @@ Browser-use分析结果:
                 }
                 
         except Exception as e:
-            self.log(f"LLM页面状态分析失败: {e}")
+            self.log("LLM页面状态分析失败: %s", e)
             # 异常时的降级处理
             return {
                 "success": True,
@@ -2708,7 +2767,7 @@ Browser-use分析结果:
             return None
             
         except Exception as e:
-            self.log(f"基础错误检测失败: {e}")
+            self.log("基础错误检测失败: %s", e)
             return None
     
     async def _execute_form_fill_task(self, task: str):
@@ -2718,7 +2777,7 @@ Browser-use分析结果:
             # 我们需要创建一个新的agent来处理表单填写
             # 但这个新agent应该连接到同一个浏览器会话（如果可能）
             
-            self.log(f"执行表单填写任务: {task}")
+            self.log("执行表单填写任务: %s", task)
             
             # 创建专门用于填写的agent
             fill_agent = self._create_browser_agent(task)
@@ -2727,11 +2786,11 @@ Browser-use分析结果:
             
             # 执行填写任务
             result = await fill_agent.run()
-            self.log(f"表单填写完成: {result}")
+            self.log("表单填写完成: %s", result)
             return result
             
         except Exception as e:
-            self.log(f"执行表单填写任务失败: {e}")
+            self.log("执行表单填写任务失败: %s", e)
             raise
     
     async def _create_persistent_browser_session(self):
@@ -2767,25 +2826,60 @@ Stay idle and ready to receive form filling commands."""
             self.log("✅ 创建持久浏览器会话，保持页面活跃")
             
         except Exception as e:
-            self.log(f"创建持久浏览器会话失败: {e}")
+            self.log("创建持久浏览器会话失败: %s", e)
 
+    def _task_completion_item(self, task_type: str, success: bool, message: str) -> Dict[str, Any]:
+        """构建任务完成通知消息"""
+        self.log("📤 发送任务完成通知: %s - %s", task_type, '成功' if success else '失败')
+        return {
+            "message": message,
+            "message_type": "task_completion",
+            "additional_data": {
+                "task_type": task_type,
+                "success": success,
+                "completion_time": time.time(),
+                "can_resume_recording": True  # 重要：告诉Phone Agent可以恢复录音
+            }
+        }
+    
     async def _notify_task_completion(self, task_type: str, success: bool, message: str):
         """通知任务完成状态"""
         try:
-            self.log(f"📤 发送任务完成通知: {task_type} - {'成功' if success else '失败'}")
-            
-            await self._send_to_phone_agent(
-                message,
-                message_type="task_completion",
-                additional_data={
-                    "task_type": task_type,
-                    "success": success,
-                    "completion_time": time.time(),
-                    "can_resume_recording": True  # 重要：告诉Phone Agent可以恢复录音
-                }
+            item = self._task_completion_item(task_type, success, message)
+            await self._send_to_phone_agent(**item)
+        except Exception as e:
+            self.log("发送任务完成通知失败: %s", e)
+    
+    async def _send_with_completion(self, message: str, message_type: str,
+                                    additional_data: Optional[Dict[str, Any]],
+                                    task_type: str, success: bool, completion_message: str):
+        """
+        发送结果消息并紧跟任务完成通知，两条消息合并为一次批量发送
+        
+        参数:
+            message: 结果消息内容
+            message_type: 结果消息类型
+            additional_data: 结果消息的额外数据
+            task_type: 完成的任务类型
+            success: 任务是否成功
+            completion_message: 任务完成通知内容
+        """
+        try:
+            result = await send_messages_to_phone_agent(
+                [
+                    {"message": message, "message_type": message_type, "additional_data": additional_data},
+                    self._task_completion_item(task_type, success, completion_message)
+                ],
+                task_id=self.current_task_id
             )
+            
+            if result.get("success"):
+                self.log("消息发送成功: %s", message)
+            else:
+                self.log("消息发送失败（可能没有Phone Agent）: %s", result.get('error'))
+                
         except Exception as e:
-            self.log(f"发送任务完成通知失败: {e}")
+            self.log("发送消息失败（可能在测试环境中，没有Phone Agent）: %s", e)
 
     async def _send_to_phone_agent(self, message: str, message_type: str = "task_result", 
                                   additional_data: Optional[Dict[str, Any]] = None):
@@ -2799,36 +2893,37 @@ Stay idle and ready to receive form filling commands."""
             )
             
             if result.get("success"):
-                self.log(f"消息发送成功: {message}")
+                self.log("消息发送成功: %s", message)
             else:
-                self.log(f"消息发送失败（可能没有Phone Agent）: {result.get('error')}")
+                self.log("消息发送失败（可能没有Phone Agent）: %s", result.get('error'))
                 
         except Exception as e:
-            self.log(f"发送消息失败（可能在测试环境中，没有Phone Agent）: {e}")
+            self.log("发送消息失败（可能在测试环境中，没有Phone Agent）: %s", e)
     
     async def _handle_system_status(self, message: ToolMessage):
         """处理来自Phone Agent的系统状态查询消息"""
         try:
-            print(f"📊 SYSTEM_STATUS handler called - processing status query")
-            self.log(f"处理SYSTEM_STATUS消息: {message.content}")
+            self.log("📊 处理SYSTEM_STATUS消息: %s", message.content)
             
             content = message.content
             text = content.get("text", "")
+            browser_agent = self.browser_agent
             
             if "分析" in text and "页面" in text:
                 # Phone Agent请求页面分析
-                print("🔍 Phone Agent请求页面分析...")
+                self.log("🔍 Phone Agent请求页面分析...")
                 
                 # 如果有browser_agent会话，尝试使用extract_structured_data
-                if self.browser_agent:
+                if browser_agent:
                     try:
                         # 直接使用browser-use的extract_structured_data功能
                         query = "Extract all form fields from this page including their names, types, labels, and any other attributes."
                         
                         # 尝试调用extract_structured_data
-                        if hasattr(self.browser_agent, 'controller') and self.browser_agent.controller:
-                            extract_result = await self.browser_agent.controller.extract_structured_data(query)
-                            self.log(f"Browser-use数据提取结果: {extract_result}")
+                        controller = getattr(browser_agent, 'controller', None)
+                        if controller:
+                            extract_result = await controller.extract_structured_data(query)
+                            self.log("Browser-use数据提取结果: %s", extract_result)
                             
                             # 解析提取结果并发送给Phone Agent
                             page_analysis = await self._parse_browser_use_result(str(extract_result))
@@ -2841,40 +2936,39 @@ Stay idle and ready to receive form filling commands."""
                         else:
                             self.log("Browser agent没有controller，使用备选分析")
                     except Exception as extract_error:
-                        self.log(f"Extract structured data失败: {extract_error}")
+                        self.log("Extract structured data失败: %s", extract_error)
                 
                 # 备选方案：发送基础页面分析
                 await self._send_basic_page_analysis()
                 
             else:
                 # 其他状态查询
-                status_msg = f"Computer Agent状态正常，浏览器{'已连接' if self.browser_agent else '未连接'}，页面{'已准备' if self.page_ready else '准备中'}。"
+                status_msg = f"Computer Agent状态正常，浏览器{'已连接' if browser_agent else '未连接'}，页面{'已准备' if self.page_ready else '准备中'}。"
                 await self._send_to_phone_agent(
                     status_msg,
                     message_type="system_status"
                 )
                 
         except Exception as e:
-            self.log(f"处理SYSTEM_STATUS失败: {e}")
+            self.log("处理SYSTEM_STATUS失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
+            self.log("错误详情: %s", traceback.format_exc())
             
             # 确保即使出错也发送页面分析数据
             try:
                 await self._send_basic_page_analysis()
             except Exception as fallback_error:
-                self.log(f"备选页面分析也失败: {fallback_error}")
+                self.log("备选页面分析也失败: %s", fallback_error)
                 await self._send_to_phone_agent("系统状态查询失败，请稍后再试。", message_type="error")
 
     async def _handle_form_data(self, message: ToolMessage):
         """处理表单数据消息"""
         try:
-            print(f"✅ FORM_DATA handler called - processing form data")
-            self.log(f"处理FORM_DATA消息: {message.content}")
+            self.log("✅ 处理FORM_DATA消息: %s", message.content)
             
             # 检查浏览器会话是否还活跃
             if not self.browser_agent:
-                print("❌ 浏览器会话不存在，无法填写表单")
+                self.log("❌ 浏览器会话不存在，无法填写表单")
                 await self._send_to_phone_agent(
                     "浏览器会话已关闭，无法填写表单。请重新打开页面。",
                     message_type="error"
@@ -2888,26 +2982,26 @@ Stay idle and ready to receive form filling commands."""
             additional_data = message.content.get("additional_data")
             if additional_data and isinstance(additional_data, dict):
                 form_data.update(additional_data)
-                print(f"📝 从additional_data提取表单字段: {additional_data}")
+                self.log("📝 从additional_data提取表单字段: %s", additional_data)
             
             # 方法2: 从message.content的顶级字段提取（工具调用系统合并后的结构）
             for key, value in message.content.items():
                 # 跳过系统字段，只保留可能的表单数据字段
                 if key not in ['text', 'timestamp', 'additional_data'] and not key.startswith('_'):
                     form_data[key] = value
-                    print(f"📝 从message.content提取表单字段: {key} = {value}")
+                    self.log("📝 从message.content提取表单字段: %s = %s", key, value)
             
             if form_data:
-                print(f"✅ 提取到表单数据: {form_data}")
+                self.log("✅ 提取到表单数据: %s", form_data)
                 await self._fill_form_with_extracted_data(form_data)
             else:
-                print("❌ 未找到有效的表单数据")
+                self.log("❌ 未找到有效的表单数据")
                 await self._send_to_phone_agent("未收到有效的表单数据，请重新提供。", message_type="error")
                 
         except Exception as e:
-            self.log(f"处理FORM_DATA失败: {e}")
+            self.log("处理FORM_DATA失败: %s", e)
             import traceback
-            self.log(f"错误详情: {traceback.format_exc()}")
+            self.log("错误详情: %s", traceback.format_exc())
             await self._send_to_phone_agent(f"处理表单信息时发生错误: {e}", message_type="error")
 
     def _convert_form_data_to_instruction(self, form_data: Dict[str, Any]) -> str:
@@ -2945,31 +3039,39 @@ Stay idle and ready to receive form filling commands."""
                     await self.browser_context.close()
                     self.log("✅ 浏览器上下文已清理")
                 except Exception as e:
-                    self.log(f"清理浏览器上下文失败: {e}")
+                    self.log("清理浏览器上下文失败: %s", e)
             
             if hasattr(self, 'browser') and self.browser:
                 try:
                     await self.browser.close()
                     self.log("✅ 浏览器已清理")
                 except Exception as e:
-                    self.log(f"清理浏览器失败: {e}")
+                    self.log("清理浏览器失败: %s", e)
             
             if hasattr(self, 'playwright') and self.playwright:
                 try:
                     await self.playwright.stop()
                     self.log("✅ Playwright已清理")
                 except Exception as e:
-                    self.log(f"清理playwright失败: {e}")
+                    self.log("清理playwright失败: %s", e)
             
             self.log("IntelligentComputerAgent已停止")
             
         except Exception as e:
-            self.log(f"停止过程中出现错误: {e}")
+            self.log("停止过程中出现错误: %s", e)
             raise
     
-    def log(self, message: str):
-        """记录日志"""
+    def log(self, message: str, *args: Any):
+        """
+        记录日志
+        
+        参数:
+            message: 日志消息，可包含%格式占位符
+            args: 占位符参数，只有在调试模式下才会格式化
+        """
         if self.debug:
+            if args:
+                message = message % args
             timestamp = time.strftime("%H:%M:%S")
             print(f"[{timestamp}][IntelligentComputerAgent] {message}")
 
@@ -6,9 +6,13 @@
 
 import asyncio
 import base64
+import hashlib
 import json
 import os
+import re
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 from enum import Enum, auto
 from dataclasses import dataclass, field
 
@@ -17,7 +21,7 @@ from bs4 import BeautifulSoup
 from PIL import Image
 import io
 
-from dual_agent.computer_agent.browser_automation import BrowserAutomation, ActionResult
+from dual_agent.computer_agent.browser_automation import BrowserAutomation, ActionResult, ensure_b64, css_string
 
 class LLMProvider(Enum):
     """LLM提供商枚举"""
@@ -43,7 +47,43 @@ class ElementType(Enum):
     RADIO = auto()
     UNKNOWN = auto()
 
-@dataclass
+# input元素type属性到元素类型的映射
+_INPUT_TYPE_MAPPING = {
+    "text": ElementType.INPUT_TEXT,
+    "email": ElementType.INPUT_EMAIL,
+    "password": ElementType.INPUT_PASSWORD,
+    "number": ElementType.INPUT_NUMBER,
+    "tel": ElementType.INPUT_PHONE,
+    "date": ElementType.INPUT_DATE,
+    "checkbox": ElementType.CHECKBOX,
+    "radio": ElementType.RADIO,
+}
+
+# 视觉分析字段类型到元素类型名称(小写)的映射
+_VISION_TYPE_MAPPING = {
+    "email": "input_email",
+    "password": "input_password",
+    "text": "input_text",
+    "number": "input_number",
+}
+
+# 常见字段映射：用户数据键 -> 元素文本中的关键词
+_FIELD_KEYWORDS = {
+    "name": ("name", "full_name", "full name", "姓名", "用户名"),
+    "first_name": ("first_name", "first name", "given name", "名"),
+    "last_name": ("last_name", "last name", "family name", "surname", "姓"),
+    "email": ("email", "e-mail", "mail", "邮箱", "电子邮件"),
+    "phone": ("phone", "telephone", "mobile", "手机", "电话"),
+    "address": ("address", "street", "地址"),
+    "city": ("city", "城市"),
+    "country": ("country", "国家"),
+    "company": ("company", "organization", "公司", "组织"),
+}
+
+# 可以直接写成#id选择器的CSS标识符
+_CSS_IDENT_RE = re.compile(r'-?[A-Za-z_][A-Za-z0-9_-]*\Z')
+
+@dataclass(slots=True)
 class PageElement:
     """页面元素信息"""
     id: str
@@ -61,7 +101,7 @@ class PageElement:
     confidence: float = 0.0
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class FormInfo:
     """表单信息"""
     id: str
@@ -70,7 +110,7 @@ class FormInfo:
     elements: List[PageElement] = field(default_factory=list)
     completion_rate: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class PageAnalysis:
     """页面分析结果"""
     url: str
@@ -95,7 +135,8 @@ class PageAnalyzer:
         model_name: str = "Doubao-1.5-Pro",
         api_key: Optional[str] = None,
         api_base: Optional[str] = None,
-        debug: bool = False
+        debug: bool = False,
+        vision_cache_size: int = 128
     ):
         """
         初始化页面分析器
@@ -105,12 +146,17 @@ class PageAnalyzer:
             model_name: 模型名称
             api_key: API密钥
             debug: 是否调试模式
+            vision_cache_size: 视觉分析结果的LRU缓存条数，0表示不缓存
         """
         self.llm_provider = llm_provider
         self.model_name = model_name
         self.api_key = api_key
         self.debug = debug
         
+        # 视觉分析结果缓存：页面指纹 -> 视觉分析结果，重复访问相同结构的页面时跳过多模态LLM调用
+        self.vision_cache_size = vision_cache_size
+        self._vision_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
         # 初始化LLM客户端
         self.api_base = api_base
         self.api_key = self._get_api_key()
@@ -165,8 +211,17 @@ class PageAnalyzer:
         """
         self.log("开始页面分析")
         
-        # 提取基础页面信息
-        content_result = await browser.extract_page_content()
+        # 提取基础页面信息；启用视觉缓存时先提取内容算出指纹，只有未命中缓存才截图，
+        # 不缓存时截图与内容提取两次CDP往返并行进行
+        use_vision = use_vision and bool(self.llm_client)
+        screenshot_result = None
+        if use_vision and self.vision_cache_size <= 0:
+            content_result, screenshot_result = await asyncio.gather(
+                browser.extract_page_content(),
+                browser.take_screenshot()
+            )
+        else:
+            content_result = await browser.extract_page_content()
         if not content_result.success:
             self.log("页面内容提取失败")
             return PageAnalysis(
@@ -180,16 +235,31 @@ class PageAnalyzer:
         # 解析DOM结构
         dom_analysis = self._analyze_dom_structure(page_data)
         
-        # 视觉分析(如果启用)
+        # 视觉分析(如果启用)，相同结构的页面直接复用缓存的结果
         vision_analysis = None
-        if use_vision and self.llm_client:
-            screenshot_result = await browser.take_screenshot()
-            if screenshot_result.success:
-                vision_analysis = await self._analyze_page_visually(
-                    screenshot_result.data["screenshot"],
-                    page_data,
-                    analysis_goals
-                )
+        if use_vision:
+            cache_key = None
+            if self.vision_cache_size > 0:
+                cache_key = self._page_fingerprint(page_data, browser.viewport_size, analysis_goals)
+                vision_analysis = self._vision_cache.get(cache_key)
+                if vision_analysis is not None:
+                    self._vision_cache.move_to_end(cache_key)
+                    self.log("命中视觉分析缓存")
+            if vision_analysis is None:
+                if screenshot_result is None:
+                    screenshot_result = await browser.take_screenshot()
+                if screenshot_result.success:
+                    vision_analysis = await self._analyze_page_visually(
+                        ensure_b64(screenshot_result.data),
+                        page_data,
+                        analysis_goals
+                    )
+                # JSON解析失败时返回的raw_response只是一次性的回复，不缓存，下次访问重新分析
+                if (cache_key is not None and vision_analysis is not None
+                        and "raw_response" not in vision_analysis):
+                    self._vision_cache[cache_key] = vision_analysis
+                    if len(self._vision_cache) > self.vision_cache_size:
+                        self._vision_cache.popitem(last=False)
         
         # 合并分析结果
         final_analysis = self._merge_analysis_results(
@@ -201,6 +271,51 @@ class PageAnalyzer:
         self.log(f"页面分析完成，发现 {len(final_analysis.forms)} 个表单")
         return final_analysis
     
+    @staticmethod
+    def _page_fingerprint(
+        page_data: Dict[str, Any],
+        viewport_size: Tuple[int, int],
+        analysis_goals: Optional[List[str]] = None
+    ) -> str:
+        """
+        计算页面的结构指纹，作为视觉分析缓存的键
+        
+        只包含URL的主机和路径、标题、视窗大小、分析目标以及表单和可点击元素的结构，
+        不包含输入框的当前值，用户填写表单不会使缓存失效
+        
+        参数:
+            page_data: 页面数据
+            viewport_size: 视窗大小
+            analysis_goals: 分析目标列表
+            
+        返回:
+            十六进制的指纹字符串
+        """
+        url = urlsplit(page_data.get("url", ""))
+        structure = [
+            url.netloc,
+            url.path,
+            page_data.get("title", ""),
+            list(viewport_size),
+            analysis_goals or [],
+            [
+                [
+                    form.get("id"), form.get("action"), form.get("method"),
+                    [
+                        [element.get(key) for key in ("tag", "type", "name", "id", "placeholder", "required", "label")]
+                        for element in form.get("elements", [])
+                    ]
+                ]
+                for form in page_data.get("forms", [])
+            ],
+            [
+                [element.get("tag"), element.get("id"), element.get("text")]
+                for element in page_data.get("clickable_elements", [])
+            ],
+        ]
+        payload = json.dumps(structure, ensure_ascii=False, default=str).encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
     def _analyze_dom_structure(self, page_data: Dict[str, Any]) -> PageAnalysis:
         """
         分析DOM结构
@@ -228,9 +343,8 @@ class PageAnalyzer:
             )
             
             # 分析表单元素
-            for element_data in form_data["elements"]:
-                element = self._parse_form_element(element_data)
-                form_info.elements.append(element)
+            parse_element = self._parse_form_element
+            form_info.elements.extend(parse_element(element_data) for element_data in form_data["elements"])
             
             # 计算表单完成率
             if form_info.elements:
@@ -270,22 +384,15 @@ class PageAnalyzer:
         返回:
             页面元素对象
         """
+        # 每个表单元素都会调用一次，把字典的get方法绑定为局部变量
+        get = element_data.get
+        
         # 确定元素类型
-        tag = element_data.get("tag", "").lower()
-        input_type = element_data.get("type", "").lower()
+        tag = get("tag", "").lower()
+        input_type = get("type", "").lower()
         
         if tag == "input":
-            type_mapping = {
-                "text": ElementType.INPUT_TEXT,
-                "email": ElementType.INPUT_EMAIL,
-                "password": ElementType.INPUT_PASSWORD,
-                "number": ElementType.INPUT_NUMBER,
-                "tel": ElementType.INPUT_PHONE,
-                "date": ElementType.INPUT_DATE,
-                "checkbox": ElementType.CHECKBOX,
-                "radio": ElementType.RADIO,
-            }
-            element_type = type_mapping.get(input_type, ElementType.INPUT_TEXT)
+            element_type = _INPUT_TYPE_MAPPING.get(input_type, ElementType.INPUT_TEXT)
         elif tag == "textarea":
             element_type = ElementType.TEXTAREA
         elif tag == "select":
@@ -294,25 +401,27 @@ class PageAnalyzer:
             element_type = ElementType.UNKNOWN
         
         # 生成选择器 - 优先使用name属性
-        element_id = element_data.get("id", "")
-        element_name = element_data.get("name", "")
+        element_id = get("id", "")
+        element_name = get("name", "")
         
         if element_name:
-            selector = f'[name="{element_name}"]'
+            selector = f'[name={css_string(element_name)}]'
         elif element_id:
-            selector = f'#{element_id}'
+            # 只有合法的CSS标识符才能写成#id，否则用属性选择器
+            selector = f'#{element_id}' if _CSS_IDENT_RE.match(element_id) else f'[id={css_string(element_id)}]'
         else:
             selector = f'{tag}[type="{input_type}"]' if input_type else tag
         
+        label = get("label", "")
         return PageElement(
             id=element_name or element_id or f"element_{hash(str(element_data))}",
             element_type=element_type,
             selector=selector,
-            text=element_data.get("label", ""),
-            placeholder=element_data.get("placeholder", ""),
-            value=element_data.get("value", ""),
-            required=element_data.get("required", False),
-            label=element_data.get("label", ""),
+            text=label,
+            placeholder=get("placeholder", ""),
+            value=get("value", ""),
+            required=get("required", False),
+            label=label,
             confidence=0.9
         )
     
@@ -468,17 +577,28 @@ class PageAnalyzer:
             if "page_purpose" in vision_analysis:
                 result.page_type = vision_analysis["page_purpose"]
             
-            # 增强表单字段信息
-            vision_fields = vision_analysis.get("form_fields", [])
-            for vision_field in vision_fields:
+            # 增强表单字段信息：每个DOM元素的匹配文本和类型名只计算一次，不随视觉字段数重复
+            elements = [
+                (element, (element.text + element.placeholder + element.label).lower(), element.element_type.name.lower())
+                for form in result.forms
+                for element in form.elements
+            ]
+            for vision_field in vision_analysis.get("form_fields", []):
+                # 视觉字段的各项属性也只读取一次
+                get = vision_field.get
+                vision_name = get("name", "").lower()
+                vision_words = vision_name.split()
+                expected_type = _VISION_TYPE_MAPPING.get(get("type", "").lower())
+                purpose = get("purpose", "")
+                importance = get("importance", "medium")
+                
                 # 尝试匹配DOM中的表单字段
-                for form in result.forms:
-                    for element in form.elements:
-                        if self._fields_match(element, vision_field):
-                            # 更新元素信息
-                            element.metadata["purpose"] = vision_field.get("purpose", "")
-                            element.metadata["importance"] = vision_field.get("importance", "medium")
-                            element.confidence = min(element.confidence + 0.2, 1.0)
+                for element, element_text, element_type in elements:
+                    if self._fields_match(element_text, element_type, vision_name, vision_words, expected_type):
+                        # 更新元素信息
+                        element.metadata["purpose"] = purpose
+                        element.metadata["importance"] = importance
+                        element.confidence = min(element.confidence + 0.2, 1.0)
             
             # 添加建议操作
             suggested_actions = vision_analysis.get("suggested_actions", [])
@@ -490,40 +610,33 @@ class PageAnalyzer:
         
         return result
     
-    def _fields_match(self, dom_element: PageElement, vision_field: Dict[str, Any]) -> bool:
+    @staticmethod
+    def _fields_match(
+        element_text: str,
+        element_type: str,
+        vision_name: str,
+        vision_words: List[str],
+        expected_type: Optional[str]
+    ) -> bool:
         """
         判断DOM元素和视觉分析字段是否匹配
         
         参数:
-            dom_element: DOM元素
-            vision_field: 视觉分析字段
+            element_text: DOM元素的文本、占位符和标签拼接后的小写文本
+            element_type: DOM元素类型名称(小写)
+            vision_name: 视觉分析字段名(小写)
+            vision_words: 视觉分析字段名拆分出的单词
+            expected_type: 视觉分析字段类型对应的元素类型名称(小写)，无对应时为None
             
         返回:
             是否匹配
         """
-        vision_name = vision_field.get("name", "").lower()
-        vision_type = vision_field.get("type", "").lower()
-        
-        # 简单的匹配逻辑
-        element_text = (dom_element.text + dom_element.placeholder + dom_element.label).lower()
-        element_type = dom_element.element_type.name.lower()
-        
         # 名称匹配
-        if vision_name in element_text or any(word in element_text for word in vision_name.split()):
+        if vision_name in element_text or any(word in element_text for word in vision_words):
             return True
         
         # 类型匹配
-        type_mapping = {
-            "email": "input_email",
-            "password": "input_password",
-            "text": "input_text",
-            "number": "input_number",
-        }
-        
-        if type_mapping.get(vision_type) == element_type:
-            return True
-        
-        return False
+        return expected_type == element_type
     
     async def suggest_form_completion(
         self,
@@ -594,20 +707,7 @@ class PageAnalyzer:
         # 基于元素类型和标签匹配用户数据
         element_text = (element.text + element.placeholder + element.label).lower()
         
-        # 常见字段映射
-        field_mappings = {
-            "name": ["name", "full_name", "full name", "姓名", "用户名"],
-            "first_name": ["first_name", "first name", "given name", "名"],
-            "last_name": ["last_name", "last name", "family name", "surname", "姓"],
-            "email": ["email", "e-mail", "mail", "邮箱", "电子邮件"],
-            "phone": ["phone", "telephone", "mobile", "手机", "电话"],
-            "address": ["address", "street", "地址"],
-            "city": ["city", "城市"],
-            "country": ["country", "国家"],
-            "company": ["company", "organization", "公司", "组织"],
-        }
-        
-        for data_key, keywords in field_mappings.items():
+        for data_key, keywords in _FIELD_KEYWORDS.items():
             if any(keyword in element_text for keyword in keywords):
                 if data_key in user_data:
                     return {
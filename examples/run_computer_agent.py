@@ -84,7 +84,7 @@ async def demo_basic_functionality():
         
         if screenshot_result.success:
             print("✓ 页面截图成功")
-            print(f"   - 截图大小: {len(screenshot_result.data['screenshot'])} 字符 (base64)")
+            print(f"   - 截图大小: {len(screenshot_result.data['screenshot'])} 字节 (PNG)")
             print()
         
         # 演示用户数据提取
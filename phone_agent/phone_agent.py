@@ -13,7 +13,10 @@ import numpy as np
 from typing import Dict, List, Optional, Union, Any, Callable, Tuple
 from enum import Enum, auto
 from pathlib import Path
+from functools import lru_cache
+from collections import deque
 import os
+import re
 from dataclasses import dataclass, field
 from typing import Optional
 import asyncio
@@ -32,6 +35,83 @@ from dual_agent.common.tool_calling import (
     send_message_to_computer_agent, ToolMessage, PHONE_AGENT_TOOLS
 )
 
+# 表单字段关键词的中英文对应关系：(英文标记词, 需要追加的中文关键词)，按顺序取第一个命中的分类
+_FIELD_KEYWORD_ALIASES = (
+    (('name', 'custname', 'customer'), ('姓名', '名字', '客户姓名', '用户姓名')),
+    (('email', 'mail', 'custemail'), ('邮箱', '邮件', '电子邮件', 'email')),
+    (('phone', 'tel', 'telephone', 'custtel'), ('电话', '手机', '联系方式', '电话号码')),
+    (('comment', 'message', 'comments'), ('评论', '留言', '消息', '内容')),
+)
+
+# 表明用户在谈论表单操作的关键词
+_FORM_KEYWORDS = ("填写", "表单", "输入", "名字", "姓名", "邮箱", "email", "电话", "手机", "地址", "提交", "填表", "开始填")
+
+# 表单数据提取用到的正则，模块加载时编译一次，避免每条用户输入都重新解析
+_URL_RE = re.compile(r'https?://[^\s]+')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RES = (
+    re.compile(r'(?:电话|手机|联系方式)(?:是|为|号码是)([0-9]{4,15})'),
+    re.compile(r'\b(?:\+?86[-.\\s]?)?1[3-9]\d{9}\b'),  # 中国手机号
+    re.compile(r'\b([0-9]{6,15})\b'),  # 备选：任何6-15位数字
+)
+_PHONE_SEPARATOR_RE = re.compile(r'[-.\\s()]+')
+_NAME_RES = (
+    re.compile(r'(?:我叫|我的名字是|名字是|姓名是|我是)([^，,。\\s]{1,10})'),
+    re.compile(r'(?:叫|名字)([^，,。\\s]{1,10})'),
+    re.compile(r'姓名([^，,。\\s]{1,10})'),
+    re.compile(r'名字([^，,。\\s]{1,10})'),
+)
+
+def _first_match(pattern: re.Pattern, text: str) -> Optional[str]:
+    """
+    返回文本中第一个匹配，结果与pattern.findall(text)[0]相同，但在首个匹配处就停止扫描
+    
+    参数:
+        pattern: 最多包含一个捕获组的已编译正则
+        text: 待匹配的文本
+        
+    返回:
+        有捕获组时为捕获内容，否则为整个匹配；没有匹配时返回None
+    """
+    match = pattern.search(text)
+    if match is None:
+        return None
+    return match.group(1) if pattern.groups else match.group()
+
+@lru_cache(maxsize=256)
+def _keyword_value_patterns(keyword: str) -> Tuple[re.Pattern, ...]:
+    """
+    编译"关键词后面跟着的值"的提取正则，按关键词缓存
+    
+    参数:
+        keyword: 表单字段关键词
+        
+    返回:
+        按优先级排列的已编译正则
+    """
+    escaped = re.escape(keyword)
+    return (
+        re.compile(rf'{escaped}(?:是|为|：|:)\s*([^，,。\s]{{1,100}})', re.IGNORECASE),
+        re.compile(rf'(?:我的|我是){escaped}([^，,。\s]{{1,100}})', re.IGNORECASE),
+        re.compile(rf'{escaped}([^，,。\s]{{1,100}})', re.IGNORECASE),
+    )
+
+@lru_cache(maxsize=256)
+def _keyword_aliases(keyword_lower: str) -> Tuple[str, ...]:
+    """
+    返回字段关键词对应的中文别名
+    
+    参数:
+        keyword_lower: 小写的字段关键词
+        
+    返回:
+        需要追加的中文关键词，未命中任何分类时返回空元组
+    """
+    for markers, aliases in _FIELD_KEYWORD_ALIASES:
+        if any(marker in keyword_lower for marker in markers):
+            return aliases
+    return ()
+
 class PhoneAgentState(Enum):
     IDLE = auto()
     LISTENING = auto()
@@ -44,6 +124,7 @@ class PhoneAgentState(Enum):
 class PhoneAgentConfig:
     vad_threshold: float = 0.5
     vad_sampling_rate: int = 16000
+    vad_compile_model: bool = False
     asr_provider: ASRProvider = ASRProvider.SILICONFLOW
     asr_api_key: Optional[str] = None
     asr_model_name: str = "FunAudioLLM/SenseVoiceSmall"
@@ -57,6 +138,7 @@ class PhoneAgentConfig:
     device_index: int = 0
     disable_thinking_while_listening: bool = False
     debug: bool = False
+    log_maxlen: int = 1024  # 内存中保留的日志条数上限，0表示不保留
 
 class PhoneAgent:
     """电话Agent，负责处理语音交互"""
@@ -66,21 +148,26 @@ class PhoneAgent:
         self.debug = config.debug
         self.state = PhoneAgentState.IDLE
         self.session_id = str(uuid.uuid4())
-        self.logs = []
+        # 日志（有界，避免长时间会话内存持续增长）
+        self.logs = deque(maxlen=config.log_maxlen)
         
-        self.log(f"Initializing VAD with threshold: {config.vad_threshold}")
+        self.log("Initializing VAD with threshold: %s", config.vad_threshold)
         self.vad = SileroVAD(
             threshold=config.vad_threshold, 
             sampling_rate=config.vad_sampling_rate,
             noise_threshold=0.03,  # 提高噪声阈值，减少误检
             min_speech_duration_ms=300,  # 增加最小语音持续时间
-            min_silence_duration_ms=600   # 增加最小静默时间
+            min_silence_duration_ms=600,  # 增加最小静默时间
+            compile_model=config.vad_compile_model
         )
+        # 编译模型时预热VAD，避免首个音频块承担编译开销（eager模式无需预热）
+        if config.vad_compile_model:
+            self.vad.warmup(iterations=2)
         
-        self.log(f"Initializing ASR. Provider: {config.asr_provider.name}, Model: {config.asr_model_name}")
+        self.log("Initializing ASR. Provider: %s, Model: %s", config.asr_provider.name, config.asr_model_name)
         self.asr = StreamingASR(provider=config.asr_provider, model_size_or_name=config.asr_model_name, language=config.language)
         
-        self.log(f"Initializing Thinking Engine. Fast: {self.config.fast_think_model_name}, Deep: {self.config.deep_think_model_name}")
+        self.log("Initializing Thinking Engine. Fast: %s, Deep: %s", self.config.fast_think_model_name, self.config.deep_think_model_name)
         self.thinking_engine = MixedThinkingEngine(
             fast_model_name=config.fast_think_model_name, 
             deep_model_name=config.deep_think_model_name,
@@ -88,7 +175,7 @@ class PhoneAgent:
             debug=config.debug
         )
         
-        self.log(f"Initializing TTS with provider: {config.tts_provider.name}")
+        self.log("Initializing TTS with provider: %s", config.tts_provider.name)
         self.tts = TTSEngine(provider=config.tts_provider, voice=config.tts_voice, debug=config.debug)
         
         # 初始化工具调用处理器
@@ -106,17 +193,39 @@ class PhoneAgent:
         
         # 添加控制属性
         self.stop_event = asyncio.Event()
+        self.stopped_event = asyncio.Event()
         self.is_running = False
         
         # 存储当前页面信息，用于Agent间通信
         self.current_page_info = None
         self.current_form_fields = []  # 存储当前页面的实际表单字段
 
-    def log(self, message: str):
+    def log(self, message: str, *args: Any):
+        """
+        记录日志
+        
+        参数:
+            message: 日志消息，可包含%格式占位符
+            args: 占位符参数；日志以(时间, 消息, 参数)保存，只在输出或读取时才格式化
+        """
         if self.debug:
             timestamp = time.strftime("%H:%M:%S")
-            print(f"[{timestamp}][PhoneAgent] {message}")
-        self.logs.append((time.time(), message))
+            print(f"[{timestamp}][PhoneAgent] {message % args if args else message}")
+        # 不保留日志时连时间戳都不取
+        if self.logs.maxlen:
+            self.logs.append((time.time(), message, args))
+    
+    def get_logs(self) -> List[Tuple[float, str]]:
+        """
+        获取格式化后的日志
+        
+        返回:
+            (时间戳, 日志消息)列表
+        """
+        return [
+            (timestamp, message % args if args else message)
+            for timestamp, message, args in self.logs
+        ]
 
     async def start(self):
         """启动Phone Agent"""
@@ -124,6 +233,8 @@ class PhoneAgent:
         self.log("Starting Phone Agent...")
         self.is_running = True
         self.stop_event.clear()
+        self.stopped_event.clear()
+        tool_task = None
         
         try:
             # 启动工具调用处理器
@@ -138,11 +249,18 @@ class PhoneAgent:
             await self._audio_processing_loop()
                 
         except Exception as e:
-            self.log(f"Error in Phone Agent: {e}")
+            self.log("Error in Phone Agent: %s", e)
             print(f"❌ Phone Agent出错: {e}")
         finally:
             self.is_running = False
             self.tool_handler.stop()
+            if tool_task is not None:
+                # stop()会唤醒监听循环，直接等待任务结束即可
+                try:
+                    await tool_task
+                except asyncio.CancelledError:
+                    pass
+            self.stopped_event.set()
             self.log("Phone Agent stopped")
             print("🛑 Phone Agent已停止")
 
@@ -171,7 +289,7 @@ class PhoneAgent:
                         print(f"🌐 更新页面信息: {page_info.get('title', '未知页面')}")
                         
         except Exception as e:
-            self.log(f"Error handling computer response: {e}")
+            self.log("Error handling computer response: %s", e)
             print(f"❌ 处理Computer Agent响应时出错: {e}")
     
     async def _convert_to_user_friendly_message(self, technical_message: str, additional_data: dict) -> str:
@@ -205,10 +323,9 @@ class PhoneAgent:
             return converted_message.strip()
             
         except Exception as e:
-            self.log(f"LLM消息转换失败: {e}")
+            self.log("LLM消息转换失败: %s", e)
             # 降级处理：简单移除URL
-            import re
-            clean_message = re.sub(r'https?://[^\s]+', '', technical_message).strip()
+            clean_message = _URL_RE.sub('', technical_message).strip()
             return clean_message if clean_message else "操作完成"
     
     async def _handle_computer_status(self, message: ToolMessage):
@@ -224,7 +341,7 @@ class PhoneAgent:
                     await self._speak_response(f"遇到问题：{text}")
                     
         except Exception as e:
-            self.log(f"Error handling computer status: {e}")
+            self.log("Error handling computer status: %s", e)
     
     async def _handle_computer_error(self, message: ToolMessage):
         """处理来自Computer Agent的错误消息"""
@@ -237,7 +354,7 @@ class PhoneAgent:
                 await self._speak_response(f"抱歉，出现了问题：{text}")
                 
         except Exception as e:
-            self.log(f"Error handling computer error: {e}")
+            self.log("Error handling computer error: %s", e)
     
     async def _handle_page_analysis(self, message: ToolMessage):
         """处理来自Computer Agent的页面分析消息（支持各种网页类型）"""
@@ -310,7 +427,7 @@ class PhoneAgent:
                     await self._speak_response(user_friendly_text)
                     
         except Exception as e:
-            self.log(f"Error handling page analysis: {e}")
+            self.log("Error handling page analysis: %s", e)
             print(f"❌ 处理页面分析消息时出错: {e}")
     
     async def _send_to_computer_agent(self, user_text: str, task_id: Optional[str] = None):
@@ -335,7 +452,7 @@ class PhoneAgent:
                 print(f"❌ 消息发送失败: {result.get('error')}")
                 
         except Exception as e:
-            self.log(f"Error sending message to computer agent: {e}")
+            self.log("Error sending message to computer agent: %s", e)
             print(f"❌ 发送消息给Computer Agent时出错: {e}")
     
     async def _speak_greeting(self):
@@ -363,7 +480,7 @@ class PhoneAgent:
             # 默认问候语（当没有页面信息时） - 不预设任何业务场景
             greeting = "您好！我是您的AI助手。我正在等待Computer Agent分析当前页面，请稍等片刻，然后告诉我您想要做什么。"
         
-        self.log(f"Greeting: {greeting}")
+        self.log("Greeting: %s", greeting)
         print(f"🤖 AI说: {greeting}")
         
         try:
@@ -377,7 +494,7 @@ class PhoneAgent:
                 # 即使TTS失败，也要等一下模拟说话时间
                 await asyncio.sleep(3)
         except Exception as e:
-            self.log(f"Error generating greeting: {e}")
+            self.log("Error generating greeting: %s", e)
             # 回退到等待时间
             await asyncio.sleep(3)
 
@@ -425,10 +542,10 @@ class PhoneAgent:
         self.log("=== 音频设备信息 ===")
         try:
             default_input = p.get_default_input_device_info()
-            self.log(f"默认输入设备: {default_input['name']} (设备{default_input['index']})")
+            self.log("默认输入设备: %s (设备%s)", default_input['name'], default_input['index'])
             print(f"🎤 使用麦克风: {default_input['name']}")
         except Exception as e:
-            self.log(f"无法获取默认输入设备: {e}")
+            self.log("无法获取默认输入设备: %s", e)
         
         # 显示可用输入设备
         self.log("可用输入设备:")
@@ -436,13 +553,13 @@ class PhoneAgent:
             try:
                 device_info = p.get_device_info_by_index(i)
                 if device_info['maxInputChannels'] > 0:
-                    self.log(f"  设备{i}: {device_info['name']} (通道: {device_info['maxInputChannels']})")
+                    self.log("  设备%s: %s (通道: %s)", i, device_info['name'], device_info['maxInputChannels'])
             except:
                 pass
         
         # 打开麦克风输入流
         try:
-            self.log(f"正在打开麦克风 (设备索引: {self.config.device_index})")
+            self.log("正在打开麦克风 (设备索引: %s)", self.config.device_index)
             stream_in = p.open(
                 format=format,
                 channels=channels,
@@ -451,10 +568,10 @@ class PhoneAgent:
                 input_device_index=self.config.device_index,
                 frames_per_buffer=audio_chunk_size
             )
-            self.log(f"✅ 麦克风已成功打开 (设备 {self.config.device_index})")
+            self.log("✅ 麦克风已成功打开 (设备 %s)", self.config.device_index)
             print(f"✅ 麦克风已就绪，VAD阈值: {self.config.vad_threshold}")
         except Exception as e:
-            self.log(f"❌ 打开麦克风失败: {e}")
+            self.log("❌ 打开麦克风失败: %s", e)
             print(f"❌ 麦克风打开失败: {e}")
             p.terminate()
             return
@@ -469,7 +586,7 @@ class PhoneAgent:
         # 音频缓冲区用于累积到VAD所需的块大小
         audio_buffer = np.array([], dtype=np.float32)
         
-        self.log(f"VAD参数: 块大小={vad_chunk_size}, 最小语音帧数={min_speech_frames}, 最小静默帧数={min_silence_frames}")
+        self.log("VAD参数: 块大小=%s, 最小语音帧数=%s, 最小静默帧数=%s", vad_chunk_size, min_speech_frames, min_silence_frames)
         print("🎤 请开始说话，系统正在监听...")
         
         frame_count = 0
@@ -504,22 +621,23 @@ class PhoneAgent:
                             try:
                                 await self._check_computer_messages()
                             except Exception as msg_error:
-                                self.log(f"检查Computer Agent消息时出错: {msg_error}")
+                                self.log("检查Computer Agent消息时出错: %s", msg_error)
                         
                         # 转换为torch tensor用于VAD
                         audio_tensor = torch.from_numpy(vad_chunk)
                         
                         # VAD检测 - 确保使用正确的输入格式
                         try:
-                            speech_prob = self.vad.model(audio_tensor, rate).item()
+                            with torch.inference_mode():
+                                speech_prob = self.vad.model(audio_tensor, rate).item()
                         except Exception as vad_error:
-                            self.log(f"VAD检测错误: {vad_error}")
+                            self.log("VAD检测错误: %s", vad_error)
                             # 使用简单的音量检测作为备选
                             speech_prob = 1.0 if volume > 0.01 else 0.0
                         
                         # 调试: 当检测到较高语音概率时显示
                         if speech_prob > self.config.vad_threshold * 0.5:  # 显示接近阈值的检测
-                            self.log(f"🎯 语音概率: {speech_prob:.3f} (阈值: {self.config.vad_threshold})")
+                            self.log("🎯 语音概率: %.3f (阈值: %s)", speech_prob, self.config.vad_threshold)
                         
                         if speech_prob > self.config.vad_threshold:
                             # 检测到语音
@@ -540,7 +658,7 @@ class PhoneAgent:
                                 # 如果静默时间足够长，结束录音
                                 if silence_count >= min_silence_frames and len(speech_frames) >= min_speech_frames:
                                     duration_ms = len(speech_frames) * vad_chunk_size / rate * 1000
-                                    self.log(f"🔇 语音结束，处理录音 (时长: {duration_ms:.1f}ms)...")
+                                    self.log("🔇 语音结束，处理录音 (时长: %.1fms)...", duration_ms)
                                     print(f"🔇 语音结束，处理录音 (时长: {duration_ms:.1f}ms)")
                                     
                                     # 合并音频帧
@@ -561,7 +679,7 @@ class PhoneAgent:
                                     silence_count = 0
                 
                 except Exception as e:
-                    self.log(f"音频处理循环错误: {e}")
+                    self.log("音频处理循环错误: %s", e)
                     await asyncio.sleep(0.1)
                 
         finally:
@@ -597,13 +715,13 @@ class PhoneAgent:
                 await asyncio.sleep(0.1)
                 
             except Exception as e:
-                self.log(f"Error in text simulation: {e}")
+                self.log("Error in text simulation: %s", e)
                 await asyncio.sleep(1)
     
     async def _process_text_input(self, text):
         """处理文本输入（模拟语音处理）"""
         try:
-            self.log(f"👤 User said: {text}")
+            self.log("👤 User said: %s", text)
             
             # 添加用户消息到对话历史
             self.thinking_engine.add_message("user", text)
@@ -626,7 +744,7 @@ class PhoneAgent:
             analysis_text = deep_response.strip() if deep_response.strip() else fast_response.strip()
             
             if response_text.strip():
-                self.log(f"🤖 AI response: {response_text}")
+                self.log("🤖 AI response: %s", response_text)
                 print(f"🤖 AI说: {response_text}")
                 
                 # 播放AI回应（模拟）
@@ -641,7 +759,7 @@ class PhoneAgent:
                 print("🤖 AI说: 我没有理解您的意思，请再说一遍。")
             
         except Exception as e:
-            self.log(f"Error processing text input: {e}")
+            self.log("Error processing text input: %s", e)
             print(f"❌ 处理输入时出错: {e}")
 
     async def _process_user_speech(self, audio_tensor):
@@ -658,13 +776,13 @@ class PhoneAgent:
             transcription_result = await self.asr.process_audio_segment(audio_tensor)
             
             print(f"🔍 ASR结果: {transcription_result}")
-            self.log(f"ASR result: {transcription_result}")
+            self.log("ASR result: %s", transcription_result)
             
             user_text = transcription_result.get("text", "").strip()
             
             if user_text:
                 print(f"👤 用户说: {user_text}")
-                self.log(f"👤 User said: {user_text}")
+                self.log("👤 User said: %s", user_text)
                 
                 # 添加用户消息到对话历史
                 self.thinking_engine.add_message("user", user_text)
@@ -694,8 +812,8 @@ class PhoneAgent:
                 if speech_text:
                     print(f"🎙️ 语音输出: {speech_text}")
                     print(f"📋 分析理解: {analysis_text[:100]}...")
-                    self.log(f"🤖 Speech output: {speech_text}")
-                    self.log(f"🤖 Analysis: {analysis_text}")
+                    self.log("🤖 Speech output: %s", speech_text)
+                    self.log("🤖 Analysis: %s", analysis_text)
                     
                     # 播放简短的AI回应
                     print("🔊 正在生成语音回应...")
@@ -719,11 +837,11 @@ class PhoneAgent:
                 # 检查ASR是否真的失败了
                 if isinstance(transcription_result, dict) and "error" in transcription_result:
                     print(f"ASR错误: {transcription_result['error']}")
-                    self.log(f"ASR error: {transcription_result['error']}")
+                    self.log("ASR error: %s", transcription_result['error'])
             
         except Exception as e:
             print(f"❌ 处理语音时出错: {e}")
-            self.log(f"Error processing user speech: {e}")
+            self.log("Error processing user speech: %s", e)
             import traceback
             traceback.print_exc()
             print("=" * 50)
@@ -744,7 +862,7 @@ class PhoneAgent:
                 estimated_duration = len(text) * 0.1  # 假设每个字符0.1秒
                 await asyncio.sleep(max(1.0, estimated_duration))
         except Exception as e:
-            self.log(f"Error generating speech: {e}")
+            self.log("Error generating speech: %s", e)
             # 回退到等待时间
             await asyncio.sleep(2.0)
 
@@ -773,7 +891,7 @@ class PhoneAgent:
             estimated_duration = len(audio_data) / 16000  # 粗略估计
             await asyncio.sleep(max(1.0, estimated_duration))
         except Exception as e:
-            self.log(f"Error playing audio: {e}")
+            self.log("Error playing audio: %s", e)
             # 回退到模拟播放
             await asyncio.sleep(2.0)
 
@@ -783,9 +901,7 @@ class PhoneAgent:
             import uuid
             print("🔍 检查是否需要发送额外的深度分析信息...")
             
-            # 扩展的表单相关关键词
-            form_keywords = ["填写", "表单", "输入", "名字", "姓名", "邮箱", "email", "电话", "手机", "地址", "提交", "填表", "开始填"]
-            has_form_keyword = any(keyword in user_text for keyword in form_keywords)
+            has_form_keyword = any(keyword in user_text for keyword in _FORM_KEYWORDS)
             
             # 使用更智能的信息提取
             extracted_data = self._extract_form_data_from_text(user_text)
@@ -814,29 +930,30 @@ class PhoneAgent:
                 
                 await self.message_queue.send_to_computer(message)
                 print(f"📤 已发送深度分析指令给Computer Agent")
-                self.log(f"📤 Sent deep analysis instruction to Computer Agent: {user_text}")
+                self.log("📤 Sent deep analysis instruction to Computer Agent: %s", user_text)
             else:
                 print("ℹ️ 无需发送额外的深度分析信息")
                 
         except Exception as e:
-            self.log(f"Error sending additional computer instructions: {e}")
+            self.log("Error sending additional computer instructions: %s", e)
             print(f"❌ 发送额外Computer Agent指令时出错: {e}")
     
     def _extract_form_data_from_text(self, text):
         """从文本中智能提取表单数据，基于实际页面的表单字段"""
-        import re
+        if not text:
+            return {}
         
         extracted = {}
-        text_lower = text.lower()
         
-        print(f"🔍 基于实际表单字段提取数据，当前字段数: {len(self.current_form_fields)}")
+        self.log("🔍 基于实际表单字段提取数据，当前字段数: %s", len(self.current_form_fields))
         
         if not self.current_form_fields:
-            print("⚠️ 没有表单字段信息，使用基础提取模式")
+            self.log("⚠️ 没有表单字段信息，使用基础提取模式")
             # 如果没有表单字段信息，使用基础提取模式
             return self._basic_form_data_extraction(text)
         
-        # 基于实际表单字段进行提取
+        # 基于实际表单字段进行提取（文本只转换一次小写，所有字段共用）
+        text_lower = text.lower()
         for field in self.current_form_fields:
             field_id = field.get("id", "").lower()
             field_label = field.get("label", "").lower()
@@ -852,134 +969,108 @@ class PhoneAgent:
             if field_id:
                 keywords.append(field_id)
             
-            print(f"🎯 检查字段 {field_id}: {keywords}")
+            self.log("🎯 检查字段 %s: %s", field_id, keywords)
             
             # 根据字段类型和关键词匹配用户输入
-            field_value = self._extract_field_value_by_keywords(text, keywords, field_type)
+            field_value = self._extract_field_value_by_keywords(text, keywords, field_type, text_lower)
             
             if field_value:
                 # 使用字段ID作为键名
                 extracted[field_id] = field_value
-                print(f"✅ 提取到字段 {field_id}: {field_value}")
+                self.log("✅ 提取到字段 %s: %s", field_id, field_value)
         
         if extracted:
-            print(f"📊 基于实际表单字段提取到数据: {extracted}")
+            self.log("📊 基于实际表单字段提取到数据: %s", extracted)
         else:
-            print("ℹ️ 未能从用户输入中提取到匹配的表单数据")
+            self.log("ℹ️ 未能从用户输入中提取到匹配的表单数据")
         
         return extracted
     
-    def _extract_field_value_by_keywords(self, text, keywords, field_type):
-        """根据关键词和字段类型提取值"""
-        import re
+    def _extract_field_value_by_keywords(self, text, keywords, field_type, text_lower=None):
+        """
+        根据关键词和字段类型提取值
         
-        print(f"      🎯 字段匹配尝试: 关键词={keywords}, 类型={field_type}, 文本='{text}'")
+        参数:
+            text: 用户输入文本
+            keywords: 字段关键词列表
+            field_type: 字段类型
+            text_lower: 调用方已转换好的小写文本，省略时在此计算
+            
+        返回:
+            提取到的值，未提取到时返回None
+        """
+        self.log("🎯 字段匹配尝试: 关键词=%s, 类型=%s, 文本='%s'", keywords, field_type, text)
         
-        # 增强关键词列表，添加中英文对应关系
-        enhanced_keywords = list(keywords)
+        # 增强关键词列表，添加中英文对应关系（dict保持顺序并去重，同一分类的别名只追加一次）
+        enhanced_keywords = dict.fromkeys(keywords)
         for keyword in keywords:
-            keyword_lower = keyword.lower()
-            # 姓名字段的中英文对应
-            if any(name_word in keyword_lower for name_word in ['name', 'custname', 'customer']):
-                enhanced_keywords.extend(['姓名', '名字', '客户姓名', '用户姓名'])
-            # 邮箱字段的中英文对应
-            elif any(email_word in keyword_lower for email_word in ['email', 'mail', 'custemail']):
-                enhanced_keywords.extend(['邮箱', '邮件', '电子邮件', 'email'])
-            # 电话字段的中英文对应
-            elif any(phone_word in keyword_lower for phone_word in ['phone', 'tel', 'telephone', 'custtel']):
-                enhanced_keywords.extend(['电话', '手机', '联系方式', '电话号码'])
-            # 评论字段的中英文对应
-            elif any(comment_word in keyword_lower for comment_word in ['comment', 'message', 'comments']):
-                enhanced_keywords.extend(['评论', '留言', '消息', '内容'])
+            enhanced_keywords.update(dict.fromkeys(_keyword_aliases(keyword.lower())))
+        enhanced_keywords = list(enhanced_keywords)
         
-        print(f"      🔍 增强关键词列表: {enhanced_keywords}")
+        self.log("🔍 增强关键词列表: %s", enhanced_keywords)
         
-        # 特定字段类型的处理
-        if "email" in field_type.lower():
+        # 特定字段类型的处理（类型只转换一次小写）
+        field_type = field_type.lower()
+        if "email" in field_type:
             # 邮箱字段
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_pattern, text)
-            if emails:
-                print(f"      ✅ 邮箱字段匹配成功: {emails[0]}")
-                return emails[0]
+            email = _first_match(_EMAIL_RE, text)
+            if email:
+                self.log("✅ 邮箱字段匹配成功: %s", email)
+                return email
         
-        elif "tel" in field_type.lower() or "phone" in field_type.lower():
+        elif "tel" in field_type or "phone" in field_type:
             # 电话字段
-            phone_patterns = [
-                r'(?:电话|手机|联系方式)(?:是|为|号码是)([0-9]{4,15})',
-                r'\b(?:\+?86[-.\\s]?)?1[3-9]\d{9}\b',  # 中国手机号
-                r'\b([0-9]{6,15})\b'  # 一般数字
-            ]
-            for pattern in phone_patterns:
-                phones = re.findall(pattern, text)
-                if phones:
-                    result = re.sub(r'[-.\\s()]+', '', phones[0])
-                    print(f"      ✅ 电话字段匹配成功: {result}")
+            for pattern in _PHONE_RES:
+                phone = _first_match(pattern, text)
+                if phone:
+                    result = _PHONE_SEPARATOR_RE.sub('', phone)
+                    self.log("✅ 电话字段匹配成功: %s", result)
                     return result
         
         # 根据增强的关键词匹配
+        if text_lower is None:
+            text_lower = text.lower()
         for keyword in enhanced_keywords:
-            if keyword and keyword in text.lower():
-                print(f"      🔍 关键词'{keyword}'在文本中找到，尝试提取值...")
+            if keyword and keyword in text_lower:
+                self.log("🔍 关键词'%s'在文本中找到，尝试提取值...", keyword)
                 # 尝试提取关键词后的值
-                patterns = [
-                    rf'{re.escape(keyword)}(?:是|为|：|:)\s*([^，,。\s]{{1,100}})',
-                    rf'(?:我的|我是){re.escape(keyword)}([^，,。\s]{{1,100}})',
-                    rf'{re.escape(keyword)}([^，,。\s]{{1,100}})'
-                ]
-                
-                for i, pattern in enumerate(patterns):
-                    print(f"        尝试模式 {i+1}: {pattern}")
-                    matches = re.findall(pattern, text, re.IGNORECASE)
-                    if matches:
-                        value = matches[0].strip()
+                for i, pattern in enumerate(_keyword_value_patterns(keyword)):
+                    self.log("尝试模式 %s: %s", i + 1, pattern.pattern)
+                    value = _first_match(pattern, text)
+                    if value is not None:
+                        value = value.strip()
                         if value and len(value) > 0:
-                            print(f"        ✅ 模式匹配成功，提取值: {value}")
+                            self.log("✅ 模式匹配成功，提取值: %s", value)
                             return value
                     else:
-                        print(f"        ❌ 模式不匹配")
+                        self.log("❌ 模式不匹配")
         
-        print(f"      ❌ 无法提取字段值")
+        self.log("❌ 无法提取字段值")
         return None
     
     def _basic_form_data_extraction(self, text):
         """基础表单数据提取（当没有表单字段信息时的备选方案）"""
-        import re
-        
         extracted = {}
-        text_lower = text.lower()
         
         # 只提取最基础的信息
         # 邮箱提取
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            extracted["email"] = emails[0]
+        email = _first_match(_EMAIL_RE, text)
+        if email:
+            extracted["email"] = email
         
         # 电话号码提取
-        phone_patterns = [
-            r'(?:电话|手机|联系方式)(?:是|为|号码是)([0-9]{4,15})',
-            r'\b(?:\+?86[-.\\s]?)?1[3-9]\d{9}\b',  # 中国手机号
-            r'\b([0-9]{6,15})\b'  # 备选：任何6-15位数字
-        ]
-        for pattern in phone_patterns:
-            phones = re.findall(pattern, text)
-            if phones:
-                phone = re.sub(r'[-.\\s()]+', '', phones[0])
+        for pattern in _PHONE_RES:
+            phone = _first_match(pattern, text)
+            if phone:
+                phone = _PHONE_SEPARATOR_RE.sub('', phone)
                 extracted["phone"] = phone
                 break
         
         # 姓名提取
-        name_patterns = [
-            r'(?:我叫|我的名字是|名字是|姓名是|我是)([^，,。\\s]{1,10})',
-            r'(?:叫|名字)([^，,。\\s]{1,10})',
-            r'姓名([^，,。\\s]{1,10})',                         # 新增：姓名张三
-            r'名字([^，,。\\s]{1,10})',                         # 新增：名字张三
-        ]
-        for pattern in name_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                name = matches[0].strip()
+        for pattern in _NAME_RES:
+            name = _first_match(pattern, text)
+            if name is not None:
+                name = name.strip()
                 if len(name) <= 10 and name:  # 合理的名字长度
                     extracted["name"] = name
                 break
@@ -990,112 +1081,109 @@ class PhoneAgent:
         """检查来自Computer Agent的消息"""
         try:
             # 检查消息队列中是否有来自Computer Agent的消息（非阻塞）
+            # 队列是延迟创建的，在首次发送前检查时也要先确保已初始化
+            self.message_queue._ensure_queues_initialized()
             while True:
-                try:
-                    # 尝试立即获取消息（非阻塞）
-                    message = await asyncio.wait_for(
-                        self.message_queue.receive_from_computer(), 
-                        timeout=0.1
-                    )
-                    
-                    print(f"📥 收到Computer Agent消息: {message.type.name}")
-                    self.log(f"📥 Received message from Computer Agent: {message.content}")
+                # 队列为空时直接返回：不再为每条消息包一层wait_for超时，也不会在空队列上阻塞0.1秒
+                if self.message_queue.computer_to_phone.empty():
+                    break
+                
+                message = await self.message_queue.receive_from_computer()
+                
+                print(f"📥 收到Computer Agent消息: {message.type.name}")
+                self.log("📥 Received message from Computer Agent: %s", message.content)
+                
+                # 根据消息类型处理
+                if message.type == MessageType.INFO:
+                    # Computer Agent信息消息（页面分析结果等）
+                    text = message.content.get("text", "")
+                    data = message.content.get("data", {})
                     
-                    # 根据消息类型处理
-                    if message.type == MessageType.INFO:
-                        # Computer Agent信息消息（页面分析结果等）
-                        text = message.content.get("text", "")
-                        data = message.content.get("data", {})
+                    if data:
+                        # 解析页面信息
+                        page_title = data.get("title", "未知页面")
+                        page_url = data.get("url", "")
+                        forms_count = data.get("forms_count", 0)
                         
-                        if data:
-                            # 解析页面信息
-                            page_title = data.get("title", "未知页面")
-                            page_url = data.get("url", "")
-                            forms_count = data.get("forms_count", 0)
+                        # 检查是否是表单填写结果
+                        filled_count = data.get("filled_count")
+                        if filled_count is not None:
+                            # 这是表单填写结果，播报给用户
+                            total_count = data.get("total_count", 0)
+                            if filled_count > 0:
+                                await self._speak_response(f"好的，已成功填写{filled_count}个字段")
+                            else:
+                                await self._speak_response("抱歉，没有找到可填写的表单字段")
+                            print(f"📢 已播报表单填写结果给用户")
+                        elif page_title != "未知页面":
+                            # 提取和存储详细的表单字段信息
+                            form_fields_info = data.get("form_fields", [])
+                            self.current_form_fields = []
+                            field_names = []
                             
-                            # 检查是否是表单填写结果
-                            filled_count = data.get("filled_count")
-                            if filled_count is not None:
-                                # 这是表单填写结果，播报给用户
-                                total_count = data.get("total_count", 0)
-                                if filled_count > 0:
-                                    await self._speak_response(f"好的，已成功填写{filled_count}个字段")
-                                else:
-                                    await self._speak_response("抱歉，没有找到可填写的表单字段")
-                                print(f"📢 已播报表单填写结果给用户")
-                            elif page_title != "未知页面":
-                                # 提取和存储详细的表单字段信息
-                                form_fields_info = data.get("form_fields", [])
-                                self.current_form_fields = []
-                                field_names = []
-                                
-                                for form_info in form_fields_info:
-                                    for field in form_info.get("fields", []):
-                                        field_data = {
-                                            "id": field.get("id", ""),
-                                            "type": field.get("type", ""),
-                                            "label": field.get("label", ""),
-                                            "placeholder": field.get("placeholder", ""),
-                                            "required": field.get("required", False)
-                                        }
-                                        self.current_form_fields.append(field_data)
-                                        # 收集字段名用于显示
-                                        display_name = field.get("label") or field.get("placeholder") or field.get("id")
-                                        if display_name:
-                                            field_names.append(display_name)
-                                
-                                print(f"📋 更新表单字段信息: {field_names}")
-                                
-                                # 更新Phone Agent的上下文信息
-                                self.current_page_info = {
-                                    "title": page_title,
-                                    "url": page_url,
-                                    "forms_count": forms_count,
-                                    "message": text,
-                                    "form_fields": form_fields_info
-                                }
-                                
-                                print(f"🌐 页面信息已更新: {page_title} ({forms_count}个表单)")
-                                self.log(f"Page info updated: {page_title}, forms: {forms_count}")
-                                
-                                # 如果有表单，主动告知用户实际的字段信息
-                                if forms_count > 0 and field_names:
-                                    field_list = "、".join(field_names[:5])  # 最多显示5个字段
-                                    if len(field_names) > 5:
-                                        field_list += f"等{len(field_names)}个字段"
-                                    context_message = f"我看到Computer Agent已经打开了页面'{page_title}'，该页面有{forms_count}个表单，包含这些字段：{field_list}。请告诉我您要填写的信息。"
-                                    # 将此信息添加到思考引擎的上下文中
-                                    self.thinking_engine.add_message("system", context_message)
-                                    print(f"🔄 已更新AI上下文: {context_message}")
-                                elif forms_count > 0:
-                                    context_message = f"我看到Computer Agent已经打开了页面'{page_title}'，该页面有{forms_count}个表单可以填写。"
-                                    # 将此信息添加到思考引擎的上下文中
-                                    self.thinking_engine.add_message("system", context_message)
-                                    print(f"🔄 已更新AI上下文: {context_message}")
-                        else:
-                            # 普通文本信息，检查是否需要播报
-                            if "填写" in text or "完成" in text or "成功" in text:
-                                await self._speak_response(text)
-                                print(f"📢 已播报Computer Agent信息给用户: {text}")
-                        
-                    elif message.type == MessageType.STATUS:
-                        # Computer Agent状态更新
-                        status = message.content.get("status", "")
-                        self.log(f"Computer Agent status: {status}")
-                        
-                    elif message.type == MessageType.ACTION:
-                        # Computer Agent执行结果
-                        result = message.content.get("result", "")
-                        if result:
-                            # 向用户播报结果
-                            await self._speak_response(f"操作完成：{result}")
+                            for form_info in form_fields_info:
+                                for field in form_info.get("fields", []):
+                                    field_data = {
+                                        "id": field.get("id", ""),
+                                        "type": field.get("type", ""),
+                                        "label": field.get("label", ""),
+                                        "placeholder": field.get("placeholder", ""),
+                                        "required": field.get("required", False)
+                                    }
+                                    self.current_form_fields.append(field_data)
+                                    # 收集字段名用于显示
+                                    display_name = field.get("label") or field.get("placeholder") or field.get("id")
+                                    if display_name:
+                                        field_names.append(display_name)
+                            
+                            print(f"📋 更新表单字段信息: {field_names}")
+                            
+                            # 更新Phone Agent的上下文信息
+                            self.current_page_info = {
+                                "title": page_title,
+                                "url": page_url,
+                                "forms_count": forms_count,
+                                "message": text,
+                                "form_fields": form_fields_info
+                            }
+                            
+                            print(f"🌐 页面信息已更新: {page_title} ({forms_count}个表单)")
+                            self.log("Page info updated: %s, forms: %s", page_title, forms_count)
+                            
+                            # 如果有表单，主动告知用户实际的字段信息
+                            if forms_count > 0 and field_names:
+                                field_list = "、".join(field_names[:5])  # 最多显示5个字段
+                                if len(field_names) > 5:
+                                    field_list += f"等{len(field_names)}个字段"
+                                context_message = f"我看到Computer Agent已经打开了页面'{page_title}'，该页面有{forms_count}个表单，包含这些字段：{field_list}。请告诉我您要填写的信息。"
+                                # 将此信息添加到思考引擎的上下文中
+                                self.thinking_engine.add_message("system", context_message)
+                                print(f"🔄 已更新AI上下文: {context_message}")
+                            elif forms_count > 0:
+                                context_message = f"我看到Computer Agent已经打开了页面'{page_title}'，该页面有{forms_count}个表单可以填写。"
+                                # 将此信息添加到思考引擎的上下文中
+                                self.thinking_engine.add_message("system", context_message)
+                                print(f"🔄 已更新AI上下文: {context_message}")
+                    else:
+                        # 普通文本信息，检查是否需要播报
+                        if "填写" in text or "完成" in text or "成功" in text:
+                            await self._speak_response(text)
+                            print(f"📢 已播报Computer Agent信息给用户: {text}")
                     
-                except asyncio.TimeoutError:
-                    # 没有新消息，跳出循环
-                    break
+                elif message.type == MessageType.STATUS:
+                    # Computer Agent状态更新
+                    status = message.content.get("status", "")
+                    self.log("Computer Agent status: %s", status)
+                    
+                elif message.type == MessageType.ACTION:
+                    # Computer Agent执行结果
+                    result = message.content.get("result", "")
+                    if result:
+                        # 向用户播报结果
+                        await self._speak_response(f"操作完成：{result}")
                 
         except Exception as e:
-            self.log(f"Error checking computer messages: {e}")
+            self.log("Error checking computer messages: %s", e)
             print(f"❌ 检查Computer Agent消息时出错: {e}")
 
     async def stop(self):
@@ -1103,11 +1191,12 @@ class PhoneAgent:
         self.log("Stopping Phone Agent...")
         self.stop_event.set()
         
-        # 等待运行循环结束
-        timeout = 5.0
-        start_time = time.time()
-        while self.is_running and (time.time() - start_time) < timeout:
-            await asyncio.sleep(0.1)
+        # 等待运行循环结束（事件通知，不再每0.1秒轮询一次is_running）
+        if self.is_running:
+            try:
+                await asyncio.wait_for(self.stopped_event.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                pass
             
         if self.is_running:
             self.log("Warning: Phone Agent did not stop gracefully within timeout")
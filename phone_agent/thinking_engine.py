@@ -7,8 +7,10 @@
 
 import asyncio
 import json
+import re
 import time
 import uuid
+from types import MappingProxyType
 from typing import Dict, List, Optional, Union, Any, Callable, Tuple
 from enum import Enum, auto
 import os
@@ -22,6 +24,202 @@ try:
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
+# 尝试导入pyahocorasick，加速配料词的多模式匹配
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def _ordered_union(patterns, flags=0):
+    """
+    把按优先级排列的多个正则合并为一个正则
+    
+    依次尝试每个模式，返回第一个能在文本中匹配的模式的最左匹配，
+    与逐个search并在首次命中后break等价，但只需一次match调用
+    
+    参数:
+        patterns: 正则字符串序列，每个模式恰好包含一个捕获组
+        flags: 正则标志
+        
+    返回:
+        编译后的正则，使用match(text)匹配，m.group(m.lastindex)为命中模式的捕获内容
+    """
+    return re.compile('|'.join(f'(?:.*?{p})' for p in patterns), flags | re.DOTALL)
+
+
+def _first_capture(union, text):
+    """
+    用_ordered_union生成的正则匹配文本
+    
+    参数:
+        union: _ordered_union生成的正则
+        text: 待匹配的文本
+        
+    返回:
+        第一个命中模式的捕获内容，都不匹配时返回None
+    """
+    match = union.match(text)
+    return match.group(match.lastindex) if match else None
+
+
+# 快思考阶段表单数据提取使用的正则（导入时编译一次，避免每轮对话重复查找re缓存）
+# 文本在匹配前已把全角冒号、逗号统一为半角，模式中只需写半角字符
+# 姓名提取 - 更灵活的模式（按优先级合并为一个正则，下同）
+_NAME_RE = _ordered_union((
+    r'(?:我叫|我的名字是|名字是|姓名是|我是)([^,。\s]{1,10})',
+    r'(?:叫|名字)([^,。\s]{1,10})',
+    r'(?:姓名|名字)(?:填写|填入|是|为)([^,。\s]{1,10})',  # 姓名填写张三
+    r'(?:填写|填入)(?:姓名|名字)([^,。\s]{1,10})',     # 填写姓名张三
+    r'([^,。\s]{1,10})(?:是我的名字|是我的姓名)',      # 张三是我的名字
+    r'姓名([^,。\s]{1,10})',                         # 姓名张三
+    r'名字([^,。\s]{1,10})',                         # 名字张三
+))
+
+# 标准邮箱格式
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# 用户明确说明的邮箱
+_EMAIL_STATEMENT_RE = _ordered_union((
+    r'(?:邮箱是|邮箱为|email是|email为|电子邮箱是)([^\s,。]+)',
+    r'(?:邮箱|email):([^\s,。]+)',
+    r'(?:填写|填入)(?:邮箱|email)([^\s,。]+)',
+), re.IGNORECASE)
+
+# 标准电话格式（整个号码作为捕获组）
+_PHONE_RE = _ordered_union((
+    r'(\b(?:\+?86[-.\\s]?)?1[3-9]\d{9}\b)',  # 中国手机号
+    r'(\b(?:\+?1[-.\\s]?)?\(?[0-9]{3}\)?[-.\\s]?[0-9]{3}[-.\\s]?[0-9]{4}\b)',  # 美国电话
+), re.IGNORECASE)
+
+# 用户明确说明的电话
+_PHONE_STATEMENT_RE = _ordered_union((
+    r'(?:电话是|电话为|手机是|手机为|联系方式是)([0-9]+)',
+    r'(?:电话|手机|联系方式):([0-9]+)',
+    r'(?:填写|填入)(?:电话|手机)([0-9]+)',
+    r'([0-9]{4,15})(?:是我的电话|是我的手机)',
+), re.IGNORECASE)
+
+# 电话号码中的分隔符
+_PHONE_SEPARATOR_RE = re.compile(r'[-.\\s()]+')
+
+# Pizza尺寸
+_SIZE_RE = _ordered_union((
+    r'(?:披萨|pizza)(?:尺寸|大小|size)(?:是|选择|要|为)?(小号|中号|大号|small|medium|large)',
+    r'(?:选择|要|想要)(小号|中号|大号|small|medium|large)(?:的)?(?:披萨|pizza)?',
+    r'(?:尺寸|大小|size)(?:是|选择|要|为)?(小号|中号|大号|small|medium|large)',
+    r'(小号|中号|大号|small|medium|large)(?:披萨|pizza|的披萨)?',
+    r'(?:我想要|我要)(?:一个)?(小号|中号|大号|small|medium|large)',
+), re.IGNORECASE)
+
+# 尺寸值标准化
+_SIZE_CANON = {
+    '小号': 'small', '中号': 'medium', '大号': 'large',
+    'small': 'small', 'medium': 'medium', 'large': 'large'
+}
+
+# 配料名称标准化（只读视图，正则和自动机都由它构建，防止运行时被意外修改）
+_TOPPING_CANON = MappingProxyType({
+    '培根': 'bacon', 'bacon': 'bacon',
+    '奶酪': 'cheese', 'cheese': 'cheese',
+    '洋葱': 'onion', 'onion': 'onion',
+    '蘑菇': 'mushroom', 'mushroom': 'mushroom'
+})
+
+# Pizza配料：原有各配料模式捕获的文本都只在含有配料词时才能标准化出结果，
+# 因此直接用一个配料词的交替正则扫描一遍全文（长词在前，互为前缀时优先匹配较长的词）
+_TOPPING_RE = re.compile(
+    '|'.join(map(re.escape, sorted(_TOPPING_CANON, key=len, reverse=True))), re.IGNORECASE
+)
+
+
+def _build_topping_automaton():
+    """
+    构建配料词的Aho-Corasick自动机
+    
+    返回:
+        自动机对象，在小写文本上一次扫描找出所有配料词；pyahocorasick不可用时返回None
+    """
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for word, value in _TOPPING_CANON.items():
+        automaton.add_word(word, value)
+    automaton.make_automaton()
+    return automaton
+
+
+_TOPPING_AUTOMATON = _build_topping_automaton()
+
+# 送达时间 - 明确的时间格式
+_DELIVERY_TIME_CLOCK_PATTERNS = (
+    r'(?:送达时间|delivery time|配送时间)(?:是|为|选择)?([0-9]{1,2}:[0-9]{2})',
+    r'(?:时间|time)(?:是|为|选择)?([0-9]{1,2}:[0-9]{2})',
+    r'([0-9]{1,2}:[0-9]{2})(?:送达|配送)',
+)
+
+# 送达时间 - 简单时点表达
+_DELIVERY_TIME_HOUR_PATTERNS = (
+    r'(?:送达时间|delivery time|配送时间)(?:是|为|选择)?([0-9]{1,2}点)',
+    r'(?:时间|time)(?:是|为|选择)?([0-9]{1,2}点)',
+    r'([0-9]{1,2}点)(?:送达|配送)',
+    r'(?:选择|要|在)([0-9]{1,2}点)',
+)
+
+# 送达时间 - 通用时间提取
+_DELIVERY_TIME_FREE_PATTERNS = (
+    r'(?:送达时间|delivery time|配送时间)(?:是|为|选择)?([^,。]+)',
+)
+
+# 三类模式按顺序合并为一个正则，按命中的捕获组序号区分类别，
+# 只有通用时间提取的结果才需要再做标准化判断
+_DELIVERY_TIME_RE = _ordered_union(
+    _DELIVERY_TIME_CLOCK_PATTERNS + _DELIVERY_TIME_HOUR_PATTERNS + _DELIVERY_TIME_FREE_PATTERNS
+)
+_DELIVERY_TIME_LAST_CLOCK_GROUP = len(_DELIVERY_TIME_CLOCK_PATTERNS)
+_DELIVERY_TIME_LAST_HOUR_GROUP = _DELIVERY_TIME_LAST_CLOCK_GROUP + len(_DELIVERY_TIME_HOUR_PATTERNS)
+
+# "12点"形式的整点时间
+_HOUR_RE = re.compile(r'([0-9]{1,2})点')
+
+# 配送说明
+_DELIVERY_INSTRUCTIONS_RE = _ordered_union((
+    r'(?:配送说明|delivery instructions|送货说明)(?:是|为)?([^,。]+)',
+    r'(?:说明|instructions|备注|comments?)([^,。]+)',
+))
+
+# 评论/消息内容（仅限明确相关的字段）
+_MESSAGE_RE = _ordered_union((
+    r'(?:评论是|留言是|消息内容是)([^。,]{5,100})',
+    r'(?:评论|留言):([^。,]{5,100})',
+))
+
+# 快思考阶段判断用户在进行表单相关操作的关键词
+_FORM_KEYWORDS = (
+    "填写", "表单", "输入", "名字", "姓名", "邮箱", "email", "电话", "手机", "地址", "提交", "填表", "开始填",
+    "披萨", "pizza", "尺寸", "size", "small", "medium", "large", "小号", "中号", "大号",
+    "配料", "topping", "toppings", "培根", "bacon", "奶酪", "cheese", "洋葱", "onion", "蘑菇", "mushroom",
+    "送达", "delivery", "配送", "时间", "说明", "instructions", "备注", "comments"
+)
+
+# 各组正则必然包含的锚点子串：文本中没有任何锚点时整组正则都不可能匹配，直接跳过
+_NAME_ANCHORS = ('叫', '名字', '姓名', '我是')
+_DIGIT_RE = re.compile(r'[0-9]')
+_SIZE_ANCHORS = ('小号', '中号', '大号', 'small', 'medium', 'large')
+_DELIVERY_TIME_ANCHORS = (':', '点', '送达时间', '配送时间', 'delivery time')
+_DELIVERY_INSTRUCTIONS_ANCHORS = ('说明', 'instructions', '备注', 'comment')
+_EMAIL_ANCHORS = ('@', 'email', '邮箱')
+_MESSAGE_ANCHORS = ('评论', '留言', '消息内容')
+
+# 除数字外所有锚点的并集（在小写文本上检查）：文本中既没有数字也没有任何锚点时，
+# 任何字段都提取不到，直接返回。逐个子串查找比合并成一个忽略大小写的正则更快
+_ALL_ANCHORS = tuple(dict.fromkeys(
+    _NAME_ANCHORS + _EMAIL_ANCHORS + _SIZE_ANCHORS + tuple(_TOPPING_CANON)
+    + _DELIVERY_TIME_ANCHORS + ('：',) + _DELIVERY_INSTRUCTIONS_ANCHORS + _MESSAGE_ANCHORS
+))
+
 
 class ThinkingMode(Enum):
     """思考模式枚举"""
@@ -109,12 +307,19 @@ class MixedThinkingEngine:
 - 根据实际页面内容调整交互方式
 - 不要假设任何特定的业务场景"""
         self.conversation_history = [{"role": "system", "content": self.system_prompt}]
-        self.log(f"思考引擎初始化完成，提供商: {provider.name}, API: {self.api_base}")
-        self.log(f"快思考模型: {self.fast_model_name}, 慢思考模型: {self.deep_model_name}")
+        self.log("思考引擎初始化完成，提供商: %s, API: %s", provider.name, self.api_base)
+        self.log("快思考模型: %s, 慢思考模型: %s", self.fast_model_name, self.deep_model_name)
 
-    def log(self, message: str):
+    def log(self, message: str, *args: Any):
+        """
+        输出调试日志
+        
+        参数:
+            message: 日志消息，可包含%格式占位符
+            args: 占位符参数，只在调试模式下才格式化
+        """
         if self.debug:
-            print(f"[{time.strftime('%H:%M:%S')}][ThinkingEngine] {message}")
+            print(f"[{time.strftime('%H:%M:%S')}][ThinkingEngine] {message % args if args else message}")
 
     def add_message(self, role: str, content: str):
         self.conversation_history.append({"role": role, "content": content})
@@ -179,7 +384,7 @@ class MixedThinkingEngine:
         """带工具调用的快思考"""
         try:
             print(f"⚡ 启动快思考 (模型: {self.fast_model_name})...")
-            self.log(f"启动快思考 (模型: {self.fast_model_name})...")
+            self.log("启动快思考 (模型: %s)...", self.fast_model_name)
             
             response = await self.client.chat.completions.create(
                 model=self.fast_model_name,
@@ -200,12 +405,12 @@ class MixedThinkingEngine:
             if tool_calls:
                 print(f"🔧 快思考生成了 {len(tool_calls)} 个工具调用")
                 
-            self.log(f"快思考完成: {content}")
+            self.log("快思考完成: %s", content)
             return content.strip(), tool_calls
             
         except Exception as e:
             print(f"❌ 快思考出错: {e}")
-            self.log(f"快思考出错: {e}")
+            self.log("快思考出错: %s", e)
             import traceback
             traceback.print_exc()
             return "嗯...", None
@@ -214,7 +419,7 @@ class MixedThinkingEngine:
         """带工具调用的深度思考"""
         try:
             print(f"🧠 启动深度思考 (模型: {self.deep_model_name})...")
-            self.log(f"启动深度思考 (模型: {self.deep_model_name})...")
+            self.log("启动深度思考 (模型: %s)...", self.deep_model_name)
             
             # 为深度思考添加更详细的系统提示
             enhanced_messages = messages.copy()
@@ -246,12 +451,12 @@ class MixedThinkingEngine:
             if tool_calls:
                 print(f"🔧 深度思考生成了 {len(tool_calls)} 个工具调用")
                 
-            self.log(f"深度思考完成: {content}")
+            self.log("深度思考完成: %s", content)
             return content.strip(), tool_calls
             
         except Exception as e:
             print(f"❌ 深度思考出错: {e}")
-            self.log(f"深度思考出错: {e}")
+            self.log("深度思考出错: %s", e)
             import traceback
             traceback.print_exc()
             return "让我想想...啊，抱歉，我刚刚走神了。", None
@@ -284,7 +489,7 @@ class MixedThinkingEngine:
                         
         except Exception as e:
             print(f"❌ 处理工具调用时出错: {e}")
-            self.log(f"处理工具调用失败: {e}")
+            self.log("处理工具调用失败: %s", e)
 
     async def _fast_think_simple(self, prompt: str) -> Tuple[str, str]:
         """简单快思考 - 用于消息转换等简单任务"""
@@ -307,14 +512,14 @@ class MixedThinkingEngine:
             return content.strip(), content.strip()
             
         except Exception as e:
-            self.log(f"简单快思考失败: {e}")
+            self.log("简单快思考失败: %s", e)
             return "", ""
 
     async def _fast_think(self, messages: List[Dict[str, str]]) -> str:
         """快思考路径 - 优化用于低延迟快速响应"""
         try:
             print(f"⚡ 启动快思考 (模型: {self.fast_model_name})...")
-            self.log(f"启动快思考 (模型: {self.fast_model_name})...")
+            self.log("启动快思考 (模型: %s)...", self.fast_model_name)
             response = await self.client.chat.completions.create(
                 model=self.fast_model_name,
                 messages=messages,
@@ -332,11 +537,11 @@ class MixedThinkingEngine:
                     content += chunk.choices[0].delta.content
             
             print(f"⚡ 快思考完成: '{content[:50]}...'")
-            self.log(f"快思考完成: {content}")
+            self.log("快思考完成: %s", content)
             return content.strip()
         except Exception as e:
             print(f"❌ 快思考出错: {e}")
-            self.log(f"快思考出错: {e}")
+            self.log("快思考出错: %s", e)
             import traceback
             traceback.print_exc()
             return "嗯..."
@@ -345,7 +550,7 @@ class MixedThinkingEngine:
         """深度思考路径 - 优化用于复杂推理和任务规划"""
         try:
             print(f"🧠 启动深度思考 (模型: {self.deep_model_name})...")
-            self.log(f"启动深度思考 (模型: {self.deep_model_name})...")
+            self.log("启动深度思考 (模型: %s)...", self.deep_model_name)
             
             # 为深度思考添加更详细的系统提示
             enhanced_messages = messages.copy()
@@ -362,11 +567,11 @@ class MixedThinkingEngine:
             )
             content = response.choices[0].message.content
             print(f"🧠 深度思考完成: '{content[:50]}...'")
-            self.log(f"深度思考完成: {content}")
+            self.log("深度思考完成: %s", content)
             return content.strip()
         except Exception as e:
             print(f"❌ 深度思考出错: {e}")
-            self.log(f"深度思考出错: {e}")
+            self.log("深度思考出错: %s", e)
             import traceback
             traceback.print_exc()
             return "让我想想...啊，抱歉，我刚刚走神了。"
@@ -386,29 +591,22 @@ class MixedThinkingEngine:
             filler = response.choices[0].message.content.strip(' "\'')
             return filler
         except Exception as e:
-            self.log(f"填充语生成出错: {e}")
+            self.log("填充语生成出错: %s", e)
             return "嗯..."
 
     async def _extract_and_send_form_data_fast(self, message_queue, user_text: str, fast_response: str):
         """快思考完成后立即提取表单数据并发送给Computer Agent"""
         try:
             import uuid
-            print("🚀 快思考完成，立即检查表单信息...")
+            self.log("🚀 快思考完成，立即检查表单信息...")
             
-            # 扩展的表单相关关键词
-            form_keywords = [
-                "填写", "表单", "输入", "名字", "姓名", "邮箱", "email", "电话", "手机", "地址", "提交", "填表", "开始填",
-                "披萨", "pizza", "尺寸", "size", "small", "medium", "large", "小号", "中号", "大号",
-                "配料", "topping", "toppings", "培根", "bacon", "奶酪", "cheese", "洋葱", "onion", "蘑菇", "mushroom",
-                "送达", "delivery", "配送", "时间", "说明", "instructions", "备注", "comments"
-            ]
-            has_form_keyword = any(keyword in user_text for keyword in form_keywords)
+            has_form_keyword = any(keyword in user_text for keyword in _FORM_KEYWORDS)
             
             # 使用智能信息提取（简化版，避免提及不存在的字段）
             extracted_data = self._extract_basic_form_data_from_text(user_text)
             
             if has_form_keyword or extracted_data:
-                print(f"📝 快思考阶段检测到表单相关操作或数据: {extracted_data}")
+                self.log("📝 快思考阶段检测到表单相关操作或数据: %s", extracted_data)
                 
                 # 立即发送消息给Computer Agent
                 from dual_agent.common.messaging import A2AMessage, MessageType, MessageSource
@@ -428,290 +626,137 @@ class MixedThinkingEngine:
                 )
                 
                 await message_queue.send_to_computer(message)
-                print(f"⚡ 已从快思考阶段发送表单操作指令给Computer Agent")
-                self.log(f"⚡ Sent fast form instruction to Computer Agent: {user_text}")
+                self.log("⚡ Sent fast form instruction to Computer Agent: %s", user_text)
                 
-                # 如果提取到了具体数据，记录确认信息
-                if extracted_data:
+                # 如果提取到了具体数据，记录确认信息（仅调试模式下拼接摘要）
+                if extracted_data and self.debug:
                     data_summary = ", ".join([f"{k}: {v}" for k, v in extracted_data.items()])
-                    print(f"📢 快速确认: 正在处理 {data_summary}")
+                    self.log("📢 快速确认: 正在处理 %s", data_summary)
                 
         except Exception as e:
-            self.log(f"快思考阶段发送Computer Agent指令时出错: {e}")
+            self.log("快思考阶段发送Computer Agent指令时出错: %s", e)
             print(f"❌ 快思考阶段发送Computer Agent指令时出错: {e}")
     
     def _extract_basic_form_data_from_text(self, text):
         """从文本中提取基础表单数据（避免提及不存在的字段）"""
-        import re
-        
         extracted = {}
         text_lower = text.lower()
+        if not any(anchor in text_lower for anchor in _ALL_ANCHORS) and not _DIGIT_RE.search(text):
+            return extracted
         
-        print(f"🔍 快思考阶段提取表单数据，输入文本: '{text}'")
+        # 全角冒号、逗号统一为半角（一对一替换，不改变其余内容）
+        text = text.replace('：', ':').replace('，', ',')
+        text_lower = text_lower.replace('：', ':').replace('，', ',')
         
-        # 姓名提取 - 更灵活的模式
-        name_patterns = [
-            r'(?:我叫|我的名字是|名字是|姓名是|我是)([^，,。\s]{1,10})',
-            r'(?:叫|名字)([^，,。\s]{1,10})',
-            r'(?:姓名|名字)(?:填写|填入|是|为)([^，,。\s]{1,10})',  # 新增：姓名填写张三
-            r'(?:填写|填入)(?:姓名|名字)([^，,。\s]{1,10})',     # 新增：填写姓名张三
-            r'([^，,。\s]{1,10})(?:是我的名字|是我的姓名)',      # 新增：张三是我的名字
-            r'姓名([^，,。\s]{1,10})',                         # 新增：姓名张三
-            r'名字([^，,。\s]{1,10})',                         # 新增：名字张三
-        ]
-        for i, pattern in enumerate(name_patterns):
-            print(f"   尝试姓名模式 {i+1}: {pattern}")
-            matches = re.findall(pattern, text)
-            if matches:
-                name = matches[0].strip()
+        # 姓名提取
+        if any(anchor in text for anchor in _NAME_ANCHORS):
+            name = _first_capture(_NAME_RE, text)
+            if name:
+                name = name.strip()
                 if len(name) <= 10 and name:  # 合理的名字长度
                     extracted["name"] = name
                     extracted["custname"] = name
-                    print(f"   ✅ 匹配成功，提取姓名: {name}")
-                break
-            else:
-                print(f"   ❌ 模式不匹配")
         
         # 邮箱提取
-        print(f"   📧 开始邮箱提取...")
-        # 先尝试标准邮箱格式
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            extracted["email"] = emails[0]
-            extracted["custemail"] = emails[0]
-            print(f"   ✅ 提取标准邮箱: {emails[0]}")
-        else:
-            print(f"   ❌ 未找到标准邮箱格式")
-            
-            # 如果没有找到标准格式，尝试提取用户明确说明的邮箱
-            email_statement_patterns = [
-                r'(?:邮箱是|邮箱为|email是|email为|电子邮箱是)([^\s,，。]+)',
-                r'(?:邮箱|email)[:：]([^\s,，。]+)',
-                r'(?:填写|填入)(?:邮箱|email)([^\s,，。]+)',
-            ]
-            
-            for i, pattern in enumerate(email_statement_patterns):
-                print(f"   尝试邮箱声明模式 {i+1}: {pattern}")
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    email_value = matches[0].strip()
+        if any(anchor in text_lower for anchor in _EMAIL_ANCHORS):
+            # 先尝试标准邮箱格式
+            email = _EMAIL_RE.search(text)
+            if email:
+                extracted["email"] = email.group()
+                extracted["custemail"] = email.group()
+            else:
+                # 如果没有找到标准格式，尝试提取用户明确说明的邮箱
+                email_value = _first_capture(_EMAIL_STATEMENT_RE, text)
+                if email_value:
+                    email_value = email_value.strip()
                     if email_value:
                         extracted["email"] = email_value
                         extracted["custemail"] = email_value
-                        print(f"   ✅ 提取声明邮箱: {email_value}")
-                    break
-                else:
-                    print(f"   ❌ 邮箱声明模式不匹配")
-            
-            if "email" not in extracted:
-                print(f"   ❌ 未找到任何邮箱信息")
         
         # 电话号码提取
-        print(f"   🔍 开始电话号码提取...")
-        phone_patterns = [
-            r'\b(?:\+?86[-.\\s]?)?1[3-9]\d{9}\b',  # 中国手机号
-            r'\b(?:\+?1[-.\\s]?)?\(?[0-9]{3}\)?[-.\\s]?[0-9]{3}[-.\\s]?[0-9]{4}\b',  # 美国电话
-        ]
-        
-        phone_found = False
-        for i, pattern in enumerate(phone_patterns):
-            print(f"   尝试标准电话模式 {i+1}: {pattern}")
-            phones = re.findall(pattern, text, re.IGNORECASE)
-            if phones:
-                phone = re.sub(r'[-.\\s()]+', '', phones[0])
+        if _DIGIT_RE.search(text):
+            phone = _first_capture(_PHONE_RE, text)
+            if phone:
+                phone = _PHONE_SEPARATOR_RE.sub('', phone)
                 extracted["phone"] = phone
                 extracted["custtel"] = phone
-                print(f"   ✅ 提取标准电话: {phone}")
-                phone_found = True
-                break
             else:
-                print(f"   ❌ 标准电话模式不匹配")
-        
-        # 如果没有找到标准格式，尝试提取用户明确说明的电话
-        if not phone_found:
-            phone_statement_patterns = [
-                r'(?:电话是|电话为|手机是|手机为|联系方式是)([0-9]+)',
-                r'(?:电话|手机|联系方式)[:：]([0-9]+)',
-                r'(?:填写|填入)(?:电话|手机)([0-9]+)',
-                r'([0-9]{4,15})(?:是我的电话|是我的手机)',
-            ]
-            
-            for i, pattern in enumerate(phone_statement_patterns):
-                print(f"   尝试电话声明模式 {i+1}: {pattern}")
-                phones = re.findall(pattern, text, re.IGNORECASE)
-                if phones:
-                    phone = re.sub(r'[-.\\s()]+', '', phones[0])
+                # 如果没有找到标准格式，尝试提取用户明确说明的电话
+                phone = _first_capture(_PHONE_STATEMENT_RE, text)
+                if phone:
+                    phone = _PHONE_SEPARATOR_RE.sub('', phone)
                     if len(phone) >= 4:  # 至少4位数字
                         extracted["phone"] = phone
                         extracted["custtel"] = phone
-                        print(f"   ✅ 提取声明电话: {phone}")
-                        phone_found = True
-                    break
-                else:
-                    print(f"   ❌ 电话声明模式不匹配")
-        
-        if not phone_found:
-            print(f"   ❌ 未找到任何电话信息")
         
         # Pizza尺寸提取
-        print(f"   🍕 开始Pizza尺寸提取...")
-        size_patterns = [
-            r'(?:披萨|pizza)(?:尺寸|大小|size)(?:是|选择|要|为)?(小号|中号|大号|small|medium|large)',
-            r'(?:选择|要|想要)(小号|中号|大号|small|medium|large)(?:的)?(?:披萨|pizza)?',
-            r'(?:尺寸|大小|size)(?:是|选择|要|为)?(小号|中号|大号|small|medium|large)',
-            r'(小号|中号|大号|small|medium|large)(?:披萨|pizza|的披萨)?',
-            r'(?:我想要|我要)(?:一个)?(小号|中号|大号|small|medium|large)',
-        ]
-        
-        for i, pattern in enumerate(size_patterns):
-            print(f"   尝试尺寸模式 {i+1}: {pattern}")
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                size_value = matches[0].strip().lower()
-                print(f"   🎯 匹配到尺寸值: {size_value}")
+        if any(anchor in text_lower for anchor in _SIZE_ANCHORS):
+            size_value = _first_capture(_SIZE_RE, text)
+            if size_value:
                 # 标准化尺寸值
-                size_mapping = {
-                    '小号': 'small', '中号': 'medium', '大号': 'large',
-                    'small': 'small', 'medium': 'medium', 'large': 'large'
-                }
-                if size_value in size_mapping:
-                    extracted["size"] = size_mapping[size_value]
+                size = _SIZE_CANON.get(size_value.strip().lower())
+                if size:
                     # 不要重复添加 pizza_size，避免重复处理
-                    print(f"   ✅ 提取Pizza尺寸: {size_mapping[size_value]}")
-                break
-            else:
-                print(f"   ❌ 尺寸模式不匹配")
+                    extracted["size"] = size
         
         # Pizza配料提取
-        print(f"   🥓 开始Pizza配料提取...")
-        toppings_patterns = [
-            r'(?:配料|topping|toppings?)(?:是|要|选择|加)([^,，。]+)',
-            r'(?:加|要|选择)(?:配料|topping)?([^,，。]*(?:培根|bacon|奶酪|cheese|洋葱|onion|蘑菇|mushroom)[^,，。]*)',
-            r'(培根|bacon|奶酪|cheese|洋葱|onion|蘑菇|mushroom)(?:配料)?',
-            r'(?:和|加上|还有|以及)([^,，。]*(?:培根|bacon|奶酪|cheese|洋葱|onion|蘑菇|mushroom)[^,，。]*)',
-        ]
-        
-        toppings = []
-        for i, pattern in enumerate(toppings_patterns):
-            print(f"   尝试配料模式 {i+1}: {pattern}")
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                topping_text = match.strip().lower()
-                print(f"   🔍 分析配料文本: '{topping_text}'")
-                # 标准化配料名称
-                topping_mapping = {
-                    '培根': 'bacon', 'bacon': 'bacon',
-                    '奶酪': 'cheese', 'cheese': 'cheese', 'extra cheese': 'cheese',
-                    '洋葱': 'onion', 'onion': 'onion', 
-                    '蘑菇': 'mushroom', 'mushroom': 'mushroom'
-                }
-                for key, value in topping_mapping.items():
-                    if key in topping_text and value not in toppings:
-                        toppings.append(value)
-                        print(f"   ✅ 找到配料: {key} -> {value}")
+        # dict.fromkeys按首次出现的顺序去重
+        if _TOPPING_AUTOMATON is not None:
+            toppings = list(dict.fromkeys(value for _, value in _TOPPING_AUTOMATON.iter(text_lower)))
+        else:
+            toppings = list(dict.fromkeys(_TOPPING_CANON[match.lower()] for match in _TOPPING_RE.findall(text)))
         
         if toppings:
-            extracted["toppings"] = toppings
             # 不要重复添加 pizza_toppings，避免重复处理
-            print(f"   🍕 提取Pizza配料: {toppings}")
-        else:
-            print(f"   ❌ 未找到Pizza配料")
+            extracted["toppings"] = toppings
         
         # 送达时间提取
-        print(f"   ⏰ 开始送达时间提取...")
-        delivery_time_patterns = [
-            # 明确的时间格式
-            r'(?:送达时间|delivery time|配送时间)(?:是|为|选择)?([0-9]{1,2}[:\：][0-9]{2})',
-            r'(?:时间|time)(?:是|为|选择)?([0-9]{1,2}[:\：][0-9]{2})',
-            r'([0-9]{1,2}[:\：][0-9]{2})(?:送达|配送)',
-            
-            # 简单时点表达
-            r'(?:送达时间|delivery time|配送时间)(?:是|为|选择)?([0-9]{1,2}点)',
-            r'(?:时间|time)(?:是|为|选择)?([0-9]{1,2}点)',
-            r'([0-9]{1,2}点)(?:送达|配送)',
-            r'(?:选择|要|在)([0-9]{1,2}点)',
-            
-            # 通用时间提取
-            r'(?:送达时间|delivery time|配送时间)(?:是|为|选择)?([^,，。]+)',
-        ]
-        
-        for i, pattern in enumerate(delivery_time_patterns):
-            print(f"   尝试时间模式 {i+1}: {pattern}")
-            matches = re.findall(pattern, text)
-            if matches:
-                time_value = matches[0].strip()
+        if any(anchor in text for anchor in _DELIVERY_TIME_ANCHORS):
+            match = _DELIVERY_TIME_RE.match(text)
+            if match and match.group(match.lastindex):
+                group = match.lastindex
+                time_value = match.group(group).strip()
                 
                 # 标准化时间格式
-                if "点" in time_value:
+                if group <= _DELIVERY_TIME_LAST_CLOCK_GROUP:
+                    # "12:30"形式无需处理
+                    normalized_time = time_value
+                elif group <= _DELIVERY_TIME_LAST_HOUR_GROUP:
+                    # 捕获内容为"12点"，直接转换为"12:00"
+                    normalized_time = f"{time_value[:-1]}:00"
+                elif "点" in time_value:
                     # 将"12点"转换为"12:00"
-                    hour = re.findall(r'([0-9]{1,2})点', time_value)
+                    hour = _HOUR_RE.search(time_value)
                     if hour:
-                        normalized_time = f"{hour[0]}:00"
+                        normalized_time = f"{hour.group(1)}:00"
                     else:
                         normalized_time = time_value
                 elif "选择" in time_value:
-                    # 去除"选择"等前缀词
-                    clean_time = time_value.replace("选择", "").strip()
-                    if "点" in clean_time:
-                        hour = re.findall(r'([0-9]{1,2})点', clean_time)
-                        if hour:
-                            normalized_time = f"{hour[0]}:00"
-                        else:
-                            normalized_time = clean_time
-                    else:
-                        normalized_time = clean_time
+                    # 去除"选择"等前缀词（走到这里说明文本中没有"点"，无需再转换整点时间）
+                    normalized_time = time_value.replace("选择", "").strip()
                 else:
                     normalized_time = time_value
                 
                 extracted["delivery_time"] = normalized_time
                 extracted["preferred_delivery_time"] = normalized_time  # 添加这个字段以匹配实际网页
-                print(f"   ✅ 提取送达时间: {time_value} -> 标准化: {normalized_time}")
-                break
-            else:
-                print(f"   ❌ 时间模式不匹配")
 
         # 配送说明提取
-        print(f"   📝 开始配送说明提取...")
-        delivery_instructions_patterns = [
-            r'(?:配送说明|delivery instructions|送货说明)(?:是|为)?([^,，。]+)',
-            r'(?:说明|instructions|备注|comments?)([^,，。]+)',
-        ]
-        
-        for i, pattern in enumerate(delivery_instructions_patterns):
-            print(f"   尝试说明模式 {i+1}: {pattern}")
-            matches = re.findall(pattern, text)
-            if matches:
-                instructions = matches[0].strip()
-                extracted["delivery_instructions"] = instructions
+        if any(anchor in text for anchor in _DELIVERY_INSTRUCTIONS_ANCHORS):
+            instructions = _first_capture(_DELIVERY_INSTRUCTIONS_RE, text)
+            if instructions is not None:
                 # 不要重复添加 comments，避免重复处理
-                print(f"   ✅ 提取配送说明: {instructions}")
-                break
-            else:
-                print(f"   ❌ 说明模式不匹配")
+                extracted["delivery_instructions"] = instructions.strip()
         
         # 评论/消息内容提取（仅限明确相关的字段）
-        print(f"   💬 开始消息内容提取...")
-        message_patterns = [
-            r'(?:评论是|留言是|消息内容是)([^。，,]{5,100})',
-            r'(?:评论|留言)[:：]([^。，,]{5,100})',
-        ]
-        for i, pattern in enumerate(message_patterns):
-            print(f"   尝试消息模式 {i+1}: {pattern}")
-            matches = re.findall(pattern, text)
-            if matches:
-                message = matches[0].strip()
+        if any(anchor in text for anchor in _MESSAGE_ANCHORS):
+            message = _first_capture(_MESSAGE_RE, text)
+            if message:
+                message = message.strip()
                 if message:
                     extracted["message"] = message
                     extracted["comments"] = message
-                    print(f"   ✅ 提取消息: {message}")
-                break
-            else:
-                print(f"   ❌ 消息模式不匹配")
         
-        if extracted:
-            print(f"📊 快思考阶段提取到基础表单数据: {extracted}")
-        else:
-            print(f"⚠️ 快思考阶段未提取到任何表单数据")
+        # 只在调试模式下输出，避免每轮对话格式化和写入stdout
+        self.log("快思考阶段提取表单数据: %r -> %s", text, extracted)
         
-        return extracted 
\ No newline at end of file
+        return extracted
@@ -24,7 +24,9 @@ class SileroVAD:
         min_speech_duration_ms: int = 250,
         min_silence_duration_ms: int = 500,
         window_size_samples: int = 512,
-        noise_threshold: float = 0.02  # 新增：噪声阈值
+        noise_threshold: float = 0.02,  # 新增：噪声阈值
+        compile_model: bool = False,
+        quantize: bool = False
     ):
         """
         初始化Silero VAD
@@ -37,6 +39,9 @@ class SileroVAD:
             min_silence_duration_ms: 最小静默持续时长(毫秒)
             window_size_samples: 处理窗口大小
             noise_threshold: 音频噪声阈值，低于此值的音频被认为是噪声
+            compile_model: 是否使用torch.compile编译模型（首次推理前应调用warmup）
+            quantize: 在CPU上运行时是否尝试对Linear/LSTM层做int8动态量化（默认关闭，
+                      官方TorchScript模型不含可替换的层，量化不生效时保持全精度模型）
         """
         self.threshold = threshold
         self.sampling_rate = sampling_rate
@@ -56,6 +61,30 @@ class SileroVAD:
         
         self.model = self.model.to(device)
         
+        # CPU推理时可选int8动态量化，减少权重内存带宽
+        if quantize and device == "cpu":
+            try:
+                quantized = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8
+                )
+                # TorchScript模型的子模块是RecursiveScriptModule而不是nn.Linear/nn.LSTM，
+                # quantize_dynamic会原样返回，只有确实替换了层时才使用量化模型
+                if any(type(old) is not type(new) for old, new in zip(self.model.modules(), quantized.modules())):
+                    self.model = quantized
+                else:
+                    self.log("模型中没有可量化的层，使用全精度模型")
+            except Exception as e:
+                self.log(f"模型量化失败，使用全精度模型: {e}")
+        
+        # 保留未编译的模型，编译失败时回退
+        self._eager_model = self.model
+        if compile_model and hasattr(torch, "compile"):
+            try:
+                self.model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False)
+            except Exception as e:
+                self.log(f"模型编译失败，使用eager模式: {e}")
+                self.model = self._eager_model
+        
         # 获取模型的辅助函数
         (
             self.get_speech_timestamps,
@@ -71,7 +100,27 @@ class SileroVAD:
     
     def reset_state(self) -> None:
         """重置VAD状态"""
-        self.model.reset_states()
+        self._eager_model.reset_states()
+    
+    def warmup(self, iterations: int = 2) -> None:
+        """
+        使用静音数据预热模型，使编译和首次推理的开销不落在实时音频上
+        
+        参数:
+            iterations: 预热推理次数
+        """
+        dummy_audio = torch.zeros(self.window_size_samples)
+        try:
+            with torch.inference_mode():
+                for _ in range(iterations):
+                    self.model(dummy_audio, self.sampling_rate)
+        except Exception as e:
+            if self.model is self._eager_model:
+                raise
+            self.log(f"编译模型推理失败，回退到eager模式: {e}")
+            self.model = self._eager_model
+        finally:
+            self.reset_state()
     
     def is_speech(self, audio_chunk: torch.Tensor) -> bool:
         """
@@ -95,7 +144,8 @@ class SileroVAD:
             return False
         
         # 运行VAD模型
-        speech_prob = self.model(audio_chunk, self.sampling_rate).item()
+        with torch.inference_mode():
+            speech_prob = self.model(audio_chunk, self.sampling_rate).item()
         
         # 对于低能量音频，提高阈值要求
         effective_threshold = self.threshold
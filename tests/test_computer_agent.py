@@ -19,7 +19,7 @@ sys.path.insert(0, str(project_root))
 
 # 导入被测试模块
 from dual_agent.computer_agent.browser_automation import (
-    BrowserAutomation, BrowserType, ActionResult
+    BrowserAutomation, BrowserType, ActionResult, ensure_b64
 )
 from dual_agent.computer_agent.page_analyzer import (
     PageAnalyzer, LLMProvider, ElementType, PageElement, PageAnalysis
@@ -109,6 +109,9 @@ async def test_browser_screenshot(mock_browser):
     
     assert result.success, f"截图应该成功: {result.message}"
     assert "screenshot" in result.data, "结果应该包含截图数据"
+    assert result.data["screenshot"] == b"fake_screenshot_data", "进程内应该直接传递原始字节"
+    assert result.data["screenshot_b64"] is None, "base64编码应该按需计算"
+    assert ensure_b64(result.data) == "ZmFrZV9zY3JlZW5zaG90X2RhdGE="
 
 @pytest.mark.asyncio
 async def test_browser_content_extraction(mock_browser):
@@ -118,17 +121,20 @@ async def test_browser_content_extraction(mock_browser):
     mock_browser.page_title = "测试页面"
     
     # Mock页面评估结果
-    mock_browser.page.evaluate = AsyncMock(side_effect=[
-        "页面文本内容",  # text_content
-        [],  # form_elements
-        []   # clickable_elements
-    ])
+    mock_browser.page.evaluate = AsyncMock(return_value={
+        "html": "<html><body>页面文本内容</body></html>",
+        "text": "页面文本内容",
+        "forms": [],
+        "clickables": []
+    })
     
     result = await mock_browser.extract_page_content()
     
     assert result.success, f"内容提取应该成功: {result.message}"
     assert "url" in result.data, "结果应该包含URL"
     assert "title" in result.data, "结果应该包含标题"
+    assert result.data["text"] == "页面文本内容"
+    assert mock_browser.page.evaluate.await_count == 1, "页面内容应该一次往返提取完成"
 
 
 # ========== 页面分析器测试 ==========
@@ -209,6 +215,66 @@ async def test_page_analyzer_dom_analysis(mock_page_analyzer, mock_browser):
     assert len(analysis.forms[0].elements) == 2, "表单应该有2个元素"
     assert len(analysis.interactive_elements) == 1, "应该发现1个可交互元素"
 
+@pytest.mark.asyncio
+async def test_page_analyzer_vision_cache(mock_page_analyzer, mock_browser):
+    """测试结构相同的页面复用视觉分析结果"""
+    mock_browser.is_initialized = True
+    mock_page_analyzer.llm_client = MagicMock()
+    mock_page_analyzer._analyze_page_visually = AsyncMock(
+        return_value={"page_purpose": "注册表单", "confidence": 0.9}
+    )
+
+    def page_data(value, name="email"):
+        return {
+            "url": "https://example.com/signup?step=1",
+            "title": "注册",
+            "text": "",
+            "forms": [{
+                "id": "signup", "action": "/submit", "method": "post",
+                "elements": [{
+                    "tag": "input", "type": "email", "name": name, "id": name,
+                    "placeholder": "", "value": value, "required": True, "label": "邮箱"
+                }]
+            }],
+            "clickable_elements": []
+        }
+
+    mock_browser.take_screenshot = AsyncMock(return_value=ActionResult(True, "成功", {"screenshot": b"screen"}))
+    mock_browser.extract_page_content = AsyncMock(side_effect=[
+        ActionResult(True, "成功", page_data("")),
+        ActionResult(True, "成功", page_data("a@b.com")),
+        ActionResult(True, "成功", page_data("", name="phone")),
+    ])
+
+    first = await mock_page_analyzer.analyze_page(mock_browser)
+    second = await mock_page_analyzer.analyze_page(mock_browser)
+
+    assert mock_page_analyzer._analyze_page_visually.await_count == 1, "只有输入值变化时应该命中缓存"
+    assert mock_browser.take_screenshot.await_count == 1, "命中缓存时不应该截图"
+    assert first.page_type == second.page_type == "注册表单"
+    assert second.forms[0].elements[0].value == "a@b.com", "DOM分析仍然使用当前页面数据"
+
+    await mock_page_analyzer.analyze_page(mock_browser)
+    assert mock_page_analyzer._analyze_page_visually.await_count == 2, "表单结构变化时应该重新分析"
+    assert mock_browser.take_screenshot.await_count == 2
+
+@pytest.mark.asyncio
+async def test_page_analyzer_vision_cache_skips_raw_response(mock_page_analyzer, mock_browser):
+    """测试JSON解析失败的视觉分析结果不会被缓存"""
+    mock_browser.is_initialized = True
+    mock_page_analyzer.llm_client = MagicMock()
+    mock_page_analyzer._analyze_page_visually = AsyncMock(return_value={"raw_response": "无法解析"})
+    mock_browser.take_screenshot = AsyncMock(return_value=ActionResult(True, "成功", {"screenshot": b"screen"}))
+    mock_browser.extract_page_content = AsyncMock(return_value=ActionResult(True, "成功", {
+        "url": "https://example.com/signup", "title": "注册", "text": "",
+        "forms": [], "clickable_elements": []
+    }))
+
+    await mock_page_analyzer.analyze_page(mock_browser)
+    await mock_page_analyzer.analyze_page(mock_browser)
+
+    assert mock_page_analyzer._analyze_page_visually.await_count == 2, "解析失败的结果不应该被缓存"
+
 @pytest.mark.asyncio
 async def test_page_analyzer_form_completion_suggestion(mock_page_analyzer):
     """测试表单填写建议"""
@@ -260,6 +326,22 @@ async def test_page_analyzer_form_completion_suggestion(mock_page_analyzer):
     form_suggestion = suggestions["form_actions"][0]
     assert len(form_suggestion["actions"]) >= 1, "应该至少有1个填写操作"
 
+def test_page_analysis_uses_slots():
+    """测试页面分析数据类使用__slots__"""
+    from dual_agent.computer_agent.page_analyzer import FormInfo
+    name_element = PageElement(
+        id="custname", element_type=ElementType.INPUT_TEXT,
+        selector='[name="custname"]', label="Customer Name"
+    )
+    page_analysis = PageAnalysis(
+        url="https://example.com",
+        title="测试页面",
+        forms=[FormInfo(id="f", action="/post", method="POST", elements=[name_element])]
+    )
+    
+    assert not hasattr(name_element, "__dict__"), "页面元素应该使用__slots__"
+    assert not hasattr(page_analysis, "__dict__")
+
 
 # ========== Computer Agent集成测试 ==========
 
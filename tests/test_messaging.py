@@ -0,0 +1,182 @@
+"""
+A2A消息通信测试模块
+
+测试消息的序列化、反序列化和消息队列的传递功能
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# 将项目根目录添加到Python路径中
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 导入被测试模块
+from dual_agent.common.messaging import (
+    A2AMessage, A2AMessageQueue, MessageSource, MessageType, Part, PartType,
+    create_info_message, create_action_message, create_error_message,
+    create_status_message
+)
+
+
+# ========== 消息序列化测试 ==========
+
+@pytest.fixture
+def sample_message():
+    """创建带有内容部分的示例消息"""
+    message = create_info_message(
+        "测试消息", "task_1", MessageSource.PHONE, data={"name": "张三"}
+    )
+    message.parts.append(Part(part_type=PartType.DATA, content={"k": 1}, mime_type="application/json"))
+    return message
+
+def test_message_to_dict(sample_message):
+    """测试消息转换为字典"""
+    data = sample_message.to_dict()
+
+    assert data["source"] == "phone", "来源应该序列化为小写名称"
+    assert data["type"] == "info", "类型应该序列化为小写名称"
+    assert data["parts"][0]["part_type"] == "data", "内容部分类型应该序列化为小写名称"
+    assert data["content"]["data"] == {"name": "张三"}
+
+def test_message_json_roundtrip(sample_message):
+    """测试JSON序列化往返"""
+    restored = A2AMessage.from_json(sample_message.to_json())
+
+    assert restored.message_id == sample_message.message_id
+    assert restored.source is MessageSource.PHONE
+    assert restored.type is MessageType.INFO
+    assert restored.content == sample_message.content
+    assert restored.parts[0].part_type is PartType.DATA
+
+def test_message_bytes_roundtrip(sample_message):
+    """测试字节串序列化往返"""
+    payload = sample_message.to_bytes()
+
+    assert isinstance(payload, bytes), "to_bytes应该返回字节串"
+    assert A2AMessage.from_json(payload).to_dict() == sample_message.to_dict()
+
+def test_message_from_dict_accepts_upper_case():
+    """测试反序列化兼容大写的枚举名称"""
+    message = A2AMessage.from_dict({
+        "source": "COMPUTER",
+        "type": "status",
+        "content": {"status": "ok"},
+        "task_id": "task_2",
+    })
+
+    assert message.source is MessageSource.COMPUTER
+    assert message.type is MessageType.STATUS
+
+def test_message_uses_slots(sample_message):
+    """测试消息对象不携带实例__dict__"""
+    assert not hasattr(sample_message, "__dict__")
+    assert not hasattr(sample_message.parts[0], "__dict__")
+
+
+# ========== 消息队列测试 ==========
+
+@pytest.mark.asyncio
+async def test_queue_passes_message_objects_in_process(sample_message):
+    """测试进程内传递时不做序列化，直接传递消息对象"""
+    queue = A2AMessageQueue()
+
+    await queue.send_to_computer(sample_message)
+    received = await queue.receive_from_phone()
+
+    assert received is sample_message, "进程内应该直接传递同一个消息对象"
+
+@pytest.mark.asyncio
+async def test_queue_serialize_on_send(sample_message):
+    """测试启用序列化时消息经过编码后仍能正确还原"""
+    queue = A2AMessageQueue(serialize_on_send=True)
+
+    await queue.send_to_phone(sample_message)
+    received = await queue.receive_from_computer()
+
+    assert received is not sample_message
+    assert received.to_dict() == sample_message.to_dict()
+
+@pytest.mark.asyncio
+async def test_queue_dispatches_sync_and_async_handlers(sample_message):
+    """测试同步和异步消息处理回调都能被调用"""
+    queue = A2AMessageQueue()
+    received = []
+
+    async def async_handler(message):
+        received.append(("async", message.message_id))
+
+    queue.register_computer_message_handler(lambda message: received.append(("sync", message.message_id)))
+    queue.register_computer_message_handler(async_handler)
+
+    await queue.send_to_computer(sample_message)
+    await queue.receive_from_phone()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert ("sync", sample_message.message_id) in received
+    assert ("async", sample_message.message_id) in received
+
+@pytest.mark.asyncio
+async def test_queue_delivers_by_priority():
+    """测试错误和操作消息优先于积压的状态消息，同优先级保持发送顺序"""
+    queue = A2AMessageQueue()
+    status_1 = create_status_message("处理中", "task_1", MessageSource.COMPUTER)
+    status_2 = create_status_message("仍在处理", "task_1", MessageSource.COMPUTER)
+    action = create_action_message("click", "task_1", MessageSource.COMPUTER)
+    error = create_error_message("失败", "task_1", MessageSource.COMPUTER)
+
+    for message in (status_1, status_2, action, error):
+        await queue.send_to_phone(message)
+
+    received = [await queue.receive_from_computer() for _ in range(4)]
+
+    assert received == [error, action, status_1, status_2]
+
+@pytest.mark.asyncio
+async def test_queue_send_many():
+    """测试批量发送消息"""
+    queue = A2AMessageQueue()
+    messages = [
+        create_info_message(f"消息{i}", "task_1", MessageSource.PHONE) for i in range(3)
+    ]
+
+    await queue.send_many_to_phone(messages)
+    received = [await queue.receive_from_computer() for _ in range(3)]
+
+    assert received == messages, "同优先级的批量消息应该保持发送顺序"
+    assert all(message.source is MessageSource.COMPUTER for message in received)
+    assert list(queue.message_history) == messages
+
+@pytest.mark.asyncio
+async def test_clear_queues(sample_message):
+    """测试清空队列后队列为空且join不会阻塞"""
+    queue = A2AMessageQueue()
+    for _ in range(10):
+        await queue.send_to_computer(sample_message)
+        await queue.send_to_phone(sample_message)
+
+    queue.clear_queues()
+
+    assert queue.phone_to_computer.empty()
+    assert queue.computer_to_phone.empty()
+    await asyncio.wait_for(queue.phone_to_computer.join(), timeout=1)
+
+@pytest.mark.asyncio
+async def test_queue_history_is_bounded():
+    """测试消息历史有上限且快照返回最近的消息"""
+    queue = A2AMessageQueue(history_maxlen=3)
+    messages = [
+        create_info_message(f"消息{i}", "task_1", MessageSource.PHONE) for i in range(5)
+    ]
+
+    await queue.send_many_to_computer(messages)
+
+    assert queue.history_snapshot() == messages[2:], "超出上限后应该丢弃最早的消息"
+    assert queue.history_snapshot(2) == messages[3:]
+
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])
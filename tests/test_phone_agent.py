@@ -126,6 +126,14 @@ async def test_thinking_engine_filler_generation(mock_thinking_engine):
     assert isinstance(filler, str), "应该生成字符串类型的填充语"
     assert len(filler) > 0, "填充语不应为空"
 
+def test_thinking_engine_extracts_message_content():
+    """测试"消息内容是"开头的语句能提取出留言"""
+    engine = MixedThinkingEngine(api_key="test-key")
+    
+    extracted = engine._extract_basic_form_data_from_text("消息内容是请尽快送达谢谢大家")
+    
+    assert extracted == {"message": "请尽快送达谢谢大家", "comments": "请尽快送达谢谢大家"}
+
 
 # ========== TTS测试 ==========
 
@@ -0,0 +1,148 @@
+"""
+工具调用通信测试模块
+
+测试ToolCallHandler之间的消息传递和监听循环
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# 将项目根目录添加到Python路径中
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 导入被测试模块
+from dual_agent.common.tool_calling import (
+    MessageType, ToolCallHandler, ToolMessage, register_agent_handler
+)
+
+
+@pytest.fixture
+def handlers():
+    """创建并注册一对工具调用处理器"""
+    sender = ToolCallHandler("test_sender")
+    receiver = ToolCallHandler("test_receiver")
+    register_agent_handler("test_sender", sender)
+    register_agent_handler("test_receiver", receiver)
+    return sender, receiver
+
+@pytest.mark.asyncio
+async def test_messages_delivered_in_order(handlers):
+    """测试消息按发送顺序送达，缓冲区满时自动扩容"""
+    sender, receiver = handlers
+    received = []
+
+    async def on_input(message):
+        received.append(message.content["index"])
+
+    receiver.register_handler(MessageType.USER_INPUT, on_input)
+    listen_task = asyncio.create_task(receiver.start_listening())
+
+    for i in range(600):
+        await sender.send_message("test_receiver", MessageType.USER_INPUT, {"index": i})
+    await asyncio.sleep(0.05)
+
+    assert received == list(range(600))
+    assert receiver.pending_count() == 0
+
+    receiver.stop()
+    await asyncio.wait_for(listen_task, timeout=1)
+
+@pytest.mark.asyncio
+async def test_stop_wakes_idle_listener(handlers):
+    """测试stop()能立即唤醒空闲的监听循环"""
+    _, receiver = handlers
+    listen_task = asyncio.create_task(receiver.start_listening())
+    await asyncio.sleep(0)
+
+    receiver.stop()
+
+    await asyncio.wait_for(listen_task, timeout=0.1)
+
+@pytest.mark.asyncio
+async def test_sent_message_uses_slots(handlers):
+    """测试发送的消息不携带实例__dict__，且ID唯一"""
+    sender, _ = handlers
+
+    first = await sender.send_message("test_receiver", MessageType.USER_INPUT, {})
+    second = await sender.send_message("test_receiver", MessageType.USER_INPUT, {})
+
+    assert not hasattr(first, "__dict__")
+    assert first.message_id != second.message_id
+    assert first.message_id.startswith("test_sender-")
+
+@pytest.mark.asyncio
+async def test_fast_path_keeps_order_and_serializes_handlers(handlers):
+    """测试空闲时直接派发的消息与积压消息仍按顺序逐个处理"""
+    sender, receiver = handlers
+    events = []
+
+    async def on_input(message):
+        index = message.content["index"]
+        events.append(("start", index))
+        await asyncio.sleep(0.01)
+        events.append(("end", index))
+
+    receiver.register_handler(MessageType.USER_INPUT, on_input)
+    listen_task = asyncio.create_task(receiver.start_listening())
+    await asyncio.sleep(0)
+
+    for i in range(3):
+        await sender.send_message("test_receiver", MessageType.USER_INPUT, {"index": i})
+    await asyncio.sleep(0.1)
+
+    assert events == [(kind, i) for i in range(3) for kind in ("start", "end")]
+
+    receiver.stop()
+    await asyncio.wait_for(listen_task, timeout=1)
+
+@pytest.mark.asyncio
+async def test_send_many_delivers_batch_in_order(handlers):
+    """测试批量发送的消息按顺序送达"""
+    sender, receiver = handlers
+    received = []
+
+    async def on_result(message):
+        received.append((message.message_type, message.content["index"]))
+
+    receiver.register_handler(MessageType.TASK_RESULT, on_result)
+    receiver.register_handler(MessageType.TASK_COMPLETION, on_result)
+    listen_task = asyncio.create_task(receiver.start_listening())
+    await asyncio.sleep(0)
+
+    sent = await sender.send_many("test_receiver", [
+        (MessageType.TASK_RESULT, {"index": 0}),
+        (MessageType.TASK_COMPLETION, {"index": 1}),
+    ], task_id="task_1")
+    assert len({message.message_id for message in sent}) == 2
+    await asyncio.sleep(0.05)
+
+    assert received == [(MessageType.TASK_RESULT, 0), (MessageType.TASK_COMPLETION, 1)]
+
+    receiver.stop()
+    await asyncio.wait_for(listen_task, timeout=1)
+
+def test_tool_message_to_bytes():
+    """测试消息序列化为JSON字节串"""
+    message = ToolMessage("id_1", MessageType.FORM_DATA, "phone_agent", "computer_agent",
+                          {"name": "张三"}, 1.5, "task_1")
+
+    payload = message.to_bytes()
+
+    assert isinstance(payload, bytes)
+    assert json.loads(payload) == {
+        "message_id": "id_1",
+        "message_type": "form_data",
+        "sender": "phone_agent",
+        "recipient": "computer_agent",
+        "content": {"name": "张三"},
+        "timestamp": 1.5,
+        "task_id": "task_1",
+    }
+
+
+if __name__ == "__main__":
+    pytest.main(["-xvs", __file__])